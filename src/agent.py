@@ -2,19 +2,28 @@ from dotenv import load_dotenv
 
 from livekit import agents, rtc
 from livekit.agents import AgentServer, AgentSession, Agent, room_io, JobContext, cli,WorkerOptions,JobProcess
-from livekit.plugins import (
-    openai,
-    noise_cancellation,
-    silero,
-)
+import asyncio
 import logging
 import os
 from pathlib import Path
 import datetime
-from agent_config.get_agent import fetch_agent, get_agentTools, create_history
-from agent_config.session_factory import getAgentSession
-from agent_config.create_session_report import create_SessionReport
+from agent_config.history_spool import get_history_spool
+from agent_config.bootstrap import bootstrap_session
+from agent_config.backend_client import init_backend_client, get_backend_client
+from agent_config.config_cache import INVALIDATION_TOPIC, handle_invalidation, cache_stats
+from agent_config.session_factory import getAgentSession, release_session_models
+from agent_config.model_registry import ModelRegistry, register_plugins
+from agent_config.transcript_recorder import TranscriptRecorder, salvage_orphaned_transcripts
+from agent_config.session_metrics import SessionMetrics, prometheus_options
+from agent_config.greeting_cache import get_greeting_cache
+from agent_config.tts_cache import get_phrase_cache
+from agent_config.worker_load import WorkerLoad, start_loop_lag_probe
+from agent_config.loop_watchdog import start_loop_watchdog
+from agent_config.log_pipeline import install_log_pipeline, get_log_pipeline, bind_log_context
 from tools.function_context import FunctionContext
+from tools.registry import get_tool_registry
+from tools.guarded_tool import breaker_stats
+from tools.prefetch import SessionPrefetcher
 
 # Load environment variables from src/.env.local
 load_dotenv(".env.local")
@@ -22,32 +31,72 @@ logger = logging.getLogger("voice-agent")
 logger.setLevel(logging.INFO)
 
 class Assistant(Agent):
-    def __init__(self, system_prompt: str, greeting_prompt: str, tools: list = None) -> None:
+    def __init__(
+        self,
+        system_prompt: str,
+        greeting_prompt: str,
+        tools: list = None,
+        metrics: SessionMetrics = None,
+        agent_id: str = "",
+        voice: str = "",
+    ) -> None:
         super().__init__(instructions=system_prompt, tools=tools)
         self.greeting_prompt = greeting_prompt
+        self.metrics = metrics
+        self.agent_id = agent_id
+        self.voice = voice
 
     async def on_enter(self):
         """Called when the agent enters the room. Greets the user."""
+        if self.metrics:
+            self.metrics.greeting_requested()
+        # Pipelines with a TTS play the greeting from the audio cache, skipping the LLM round trip
+        audio = get_greeting_cache().audio(self.session, self.agent_id, self.voice, self.greeting_prompt)
+        if audio is not None:
+            await self.session.say(self.greeting_prompt, audio=audio, allow_interruptions=False)
+            return
         await self.session.generate_reply(
             instructions="say: " + self.greeting_prompt,
             allow_interruptions=False,
         )
 
 def prewarm(proc: JobProcess):
-    """Prewarm VAD model for faster startup."""
-    proc.userdata["vad"] = silero.VAD.load()
+    """Prewarm local models, the pooled backend client and the calendar service for faster startup."""
+    # Formatting, redaction and log I/O move to a background thread
+    install_log_pipeline()
+    proc.userdata["models"] = ModelRegistry().load()
+    proc.userdata["backend"] = init_backend_client()
+    # e.g. the calendar's credentials and dateparser, for the tool providers that declare a costly warm-up
+    proc.userdata["tools"] = get_tool_registry().prewarm()
 
 async def entrypoint(ctx:JobContext):
 
     agent_id = ctx.job.metadata if ctx.job.metadata else None
+    bind_log_context(room=ctx.room.name, session=ctx.job.id)
     logger.info(f"Starting agent session for room {ctx.room.name} with agent {agent_id}")
 
     logger.info(f"Job metadata: {ctx.job.metadata}")
 
+    # Reports this job's event-loop lag to the worker's load function
+    start_loop_lag_probe()
+    # Opt-in (LOOP_WATCHDOG=1): names the callbacks that block the loop
+    watchdog = start_loop_watchdog(ctx.room.name)
+
+    @ctx.room.on("data_received")
+    def _on_data_received(packet: rtc.DataPacket):
+        # Backend pushes agent/tool config changes so cached entries are dropped early
+        if packet.topic == INVALIDATION_TOPIC:
+            handle_invalidation(packet.data)
     
-    await ctx.connect()
-     # Wait for the first participant to join
-    participant = await ctx.wait_for_participant()
+    # Uploads history left behind by earlier jobs, including ones from crashed workers
+    history_spool = get_history_spool()
+    history_spool.start()
+    salvage_task = asyncio.ensure_future(salvage_orphaned_transcripts(history_spool, {ctx.job.id}))
+
+    # Connects, waits for the participant and fetches agent/tool config concurrently
+    models = ModelRegistry.from_proc(ctx.proc)
+    boot = await bootstrap_session(ctx, lambda agent: getAgentSession(agent, models))
+    participant = boot.participant
 
     is_sip_participant = (
         participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_SIP or
@@ -60,26 +109,52 @@ async def entrypoint(ctx:JobContext):
 
     logger.info(f"Room name: {ctx.room.name}, Room SID: {ctx.room.sid}")
     logger.info(f"Participant identity: {participant.identity}, Name: {participant.name}, Kind: {participant.kind}")
-    logger.info(f"Participant attributes: {participant.attributes}")
+    # attribute values carry the caller's phone number
+    logger.debug(f"Participant attributes: {sorted(participant.attributes)}")
 
-    agent_id = participant.attributes.get("agent_id") or ctx.job.metadata
-    agent = await fetch_agent(agent_id)
+    agent = boot.agent
 
     if not agent:
+        agent_id = participant.attributes.get("agent_id") or ctx.job.metadata
         logger.error(f"Agent {agent_id} not found")
         return
 
-    session = getAgentSession(agent)
+    bind_log_context(agent=agent.id)
+    session = boot.session
+    tools = boot.tools
+
+    async def release_models(_reason: str = "") -> None:
+        # hand the model clients back to the warm pool however the job ends,
+        # including when session.start or the shutdown handler raises
+        release_session_models(session)
 
-    tools = await get_agentTools(agent)
+    ctx.add_shutdown_callback(release_models)
 
     start_time = datetime.datetime.now()
 
+    # Streams the conversation to disk as it happens instead of walking the session report at shutdown
+    recorder = TranscriptRecorder(session, ctx.job.id, {
+        "agent_id": agent.id,
+        "date": start_time.date().isoformat(),
+        "time": start_time.time().isoformat(),
+        "started_at": start_time.timestamp(),
+    })
+    recorder.start()
+
+    # Per-turn latency histograms, exported on /metrics and attached to the history record
+    session_metrics = SessionMetrics(session, ctx.room.name)
+    session_metrics.start()
+
+    # Warms free/busy and the org schedule in the background while the greeting plays
+    prefetcher = SessionPrefetcher((tool.info.name for tool in tools), user_id=agent.user_id)
+    prefetcher.start()
+
     session.function_context = FunctionContext(
         phone_number=caller_phone_number,
         room_name=ctx.room.name,
         participant=participant,
         user_id=agent.user_id,
+        prefetcher=prefetcher,
     )
 
     async def shutdown_handler():
@@ -87,38 +162,78 @@ async def entrypoint(ctx:JobContext):
         end_time = datetime.datetime.now()
         duration = int((end_time - start_time).total_seconds())
 
-        # Use make_session_report to capture session details including conversation history
-
-        conversation = create_SessionReport(ctx, session)
+        conversation = await recorder.finalize()
+        session_metrics.stop()
+        await prefetcher.aclose()
+        release_session_models(session)
+        turn_metrics = session_metrics.summary()
+        logger.info(f"Session latency metrics: {turn_metrics}")
         
         logger.info(f"Gathered session history: duration={duration}s, conversation_messages={len(conversation)}")
         
-        await create_history({
+        # Persist locally first so a slow or unreachable backend cannot lose the call
+        await history_spool.enqueue({
             "agent_id": agent.id,
             "date": start_time.date().isoformat(),
             "time": start_time.time().isoformat(),
             "duration": duration,
             "summary": None,
-            "conversation": conversation
-        })
+            "conversation": conversation,
+            "metrics": turn_metrics,
+        }, idempotency_key=ctx.job.id)
+        recorder.discard()
+        await asyncio.gather(salvage_task, return_exceptions=True)
+        await history_spool.flush(timeout=float(os.getenv("HISTORY_SHUTDOWN_FLUSH_TIMEOUT", "5")))
+        logger.info(f"History spool stats: {history_spool.stats()}")
+        logger.info(f"Backend client metrics: {get_backend_client().metrics.snapshot()}")
+        logger.info(f"Config cache stats: {cache_stats()}")
+        logger.info(f"Tool circuit breakers: {breaker_stats()}")
+        logger.info(f"Prefetch stats: {prefetcher.stats()}")
+        logger.info(f"Model pool stats: {models.pool.stats()}")
+        logger.info(f"Greeting cache stats: {get_greeting_cache().stats()}")
+        logger.info(f"TTS phrase cache stats: {get_phrase_cache().stats()}")
+        if watchdog is not None:
+            watchdog.unwatch(ctx.room.name)
+            logger.info(f"Event loop watchdog stats: {watchdog.stats()}")
+        log_pipeline = get_log_pipeline()
+        if log_pipeline is not None:
+            logger.info(f"Log pipeline stats: {log_pipeline.stats()}")
+            # job processes exit without running atexit hooks
+            await asyncio.to_thread(log_pipeline.flush, 2.0)
 
     ctx.add_shutdown_callback(shutdown_handler)
 
-    my_assistant = Assistant(agent.system_prompt, agent.greeting_prompt, tools=tools)
+    profile = session.profile
+    my_assistant = Assistant(
+        agent.system_prompt,
+        agent.greeting_prompt,
+        tools=tools,
+        metrics=session_metrics,
+        agent_id=agent.id,
+        voice=f"{profile.tts_model}:{profile.tts_voice}" if profile.pipeline == "custom" else agent.voice,
+    )
 
-    await session.start(
-        room=ctx.room,
-        agent=my_assistant,
-        room_options=room_io.RoomOptions(
-            audio_input=room_io.AudioInputOptions(
-                noise_cancellation=lambda params: noise_cancellation.BVCTelephony() if params.participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_SIP else noise_cancellation.BVC(),
+    try:
+        await session.start(
+            room=ctx.room,
+            agent=my_assistant,
+            room_options=room_io.RoomOptions(
+                audio_input=room_io.AudioInputOptions(
+                    noise_cancellation=models.noise_cancellation_for,
+                ),
             ),
-        ),
-    )
+        )
+    except BaseException:
+        release_session_models(session)
+        raise
 
 if __name__ == "__main__":
+    # Job processes import this module too; only the worker's main process registers the plugins
+    register_plugins()
     cli.run_app(WorkerOptions(
         entrypoint_fnc=entrypoint, 
         prewarm_fnc=prewarm, 
-        agent_name='voice-ai-agent'
+        agent_name='voice-ai-agent',
+        **WorkerLoad().options(),
+        **prometheus_options(),
     ))
\ No newline at end of file
@@ -0,0 +1,221 @@
+import os
+import time
+import asyncio
+import logging
+import importlib.util
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+
+import httpx
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(".env.local")
+
+logger = logging.getLogger("backend-client")
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+@dataclass
+class BackendClientMetrics:
+    """Counters for requests sent through the pooled backend client."""
+    requests: int = 0
+    errors: int = 0
+    connections_opened: int = 0
+    tls_handshakes: int = 0
+    total_latency: float = 0.0
+
+    @property
+    def connections_reused(self) -> int:
+        """Requests that were served over an already open connection."""
+        return max(self.requests - self.connections_opened, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        avg_latency = self.total_latency / self.requests if self.requests else 0.0
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "tls_handshakes": self.tls_handshakes,
+            "avg_latency_ms": round(avg_latency * 1000, 2),
+        }
+
+
+class BackendClient:
+    """
+    Keep-alive pooled HTTP client for the backend API.
+
+    One instance is shared by every session in a worker process so that
+    backend calls reuse open connections instead of paying a TCP+TLS
+    handshake each time. Pool limits and timeouts come from the environment:
+
+        BACKEND_MAX_CONNECTIONS      (default 20)
+        BACKEND_MAX_KEEPALIVE        (default 10)
+        BACKEND_KEEPALIVE_EXPIRY     seconds (default 60)
+        BACKEND_TIMEOUT              seconds (default 10)
+        BACKEND_CONNECT_TIMEOUT      seconds (default 5)
+        BACKEND_HTTP2                "0" to disable, used only if `h2` is installed
+    """
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.api_url = (api_url or os.getenv("API_URL", "http://127.0.0.1:8000")).rstrip("/")
+        self.secret_key = secret_key if secret_key is not None else os.getenv("API_SECRET_KEY")
+
+        self.limits = httpx.Limits(
+            max_connections=max_connections or _env_int("BACKEND_MAX_CONNECTIONS", 20),
+            max_keepalive_connections=max_keepalive_connections or _env_int("BACKEND_MAX_KEEPALIVE", 10),
+            keepalive_expiry=keepalive_expiry or _env_float("BACKEND_KEEPALIVE_EXPIRY", 60.0),
+        )
+        self.timeout = httpx.Timeout(
+            timeout or _env_float("BACKEND_TIMEOUT", 10.0),
+            connect=connect_timeout or _env_float("BACKEND_CONNECT_TIMEOUT", 5.0),
+        )
+
+        if http2 is None:
+            http2 = os.getenv("BACKEND_HTTP2", "1") != "0"
+        # httpx only speaks HTTP/2 when the optional `h2` package is present
+        self.http2 = bool(http2) and importlib.util.find_spec("h2") is not None
+
+        self.metrics = BackendClientMetrics()
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        headers = {"Content-Type": "application/json"}
+        if self.secret_key:
+            headers["Authorization"] = f"Bearer {self.secret_key}"
+
+        return httpx.AsyncClient(
+            base_url=self.api_url,
+            headers=headers,
+            limits=self.limits,
+            timeout=self.timeout,
+            http2=self.http2,
+            transport=self._transport,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        The underlying httpx client.
+
+        Pooled connections belong to the event loop that opened them, so the
+        client is rebuilt if it is used from a different loop than before.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if self._client is None or (loop is not None and self._loop is not None and loop is not self._loop):
+            if self._client is not None:
+                logger.debug("Event loop changed, rebuilding backend client")
+                self._close_stale(self._client, self._loop)
+            self._client = self._build_client()
+            self._loop = loop
+        elif self._loop is None:
+            self._loop = loop
+        return self._client
+
+    @staticmethod
+    def _close_stale(client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Close a client left behind by a previous event loop so its pooled sockets are released."""
+        if loop is not None and loop.is_running():
+            # the sockets belong to that loop, so close them there
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        # the old loop is gone; closing the transport on this loop drops the sockets
+        task = asyncio.ensure_future(client.aclose())
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.metrics.connections_opened += 1
+        elif event_name == "connection.start_tls.complete":
+            self.metrics.tls_handshakes += 1
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Send a request to the backend using the shared connection pool.
+
+        Args:
+            method: HTTP method.
+            path: Path relative to API_URL (e.g. "/agents/get/123").
+            **kwargs: Passed through to `httpx.AsyncClient.request`.
+
+        Returns:
+            httpx.Response: The raw response; callers decide how to handle status codes.
+        """
+        extensions = kwargs.pop("extensions", {})
+        extensions.setdefault("trace", self._trace)
+
+        start = time.perf_counter()
+        self.metrics.requests += 1
+        try:
+            response = await self.client.request(method, path, extensions=extensions, **kwargs)
+        except Exception:
+            self.metrics.errors += 1
+            raise
+        finally:
+            self.metrics.total_latency += time.perf_counter() - start
+
+        if response.status_code >= 500:
+            self.metrics.errors += 1
+        return response
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+_backend_client: Optional[BackendClient] = None
+
+
+def init_backend_client(**kwargs) -> BackendClient:
+    """
+    Create the process-wide backend client. Called from `prewarm` so the
+    pool exists before the first job lands on this process.
+    """
+    global _backend_client
+    _backend_client = BackendClient(**kwargs)
+    # build the httpx client eagerly; it binds to the job's loop on first use
+    _ = _backend_client.client
+    logger.info(f"Backend client ready for {_backend_client.api_url} (http2={_backend_client.http2})")
+    return _backend_client
+
+
+def get_backend_client() -> BackendClient:
+    """Return the process-wide backend client, creating it if prewarm did not run."""
+    if _backend_client is None:
+        return init_backend_client()
+    return _backend_client
@@ -0,0 +1,147 @@
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Callable, Awaitable, TypeVar
+
+from livekit import rtc
+from livekit.agents import AgentSession, JobContext
+
+from .get_agent import Agent, fetch_agent, get_agentTools
+from .session_factory import release_session_models
+
+logger = logging.getLogger("voice-agent")
+
+T = TypeVar("T")
+
+
+class BootstrapTimings:
+    """
+    Records how long each bootstrap stage took and when it finished relative
+    to job start, so the time-to-first-greeting breakdown can be logged.
+    """
+
+    def __init__(self, room_name: str) -> None:
+        self.room_name = room_name
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self.marks: Dict[str, float] = {}
+
+    async def timed(self, stage: str, aw: Awaitable[T]) -> T:
+        start = time.perf_counter()
+        try:
+            return await aw
+        finally:
+            self.durations[stage] = time.perf_counter() - start
+            self.mark(stage)
+
+    def mark(self, stage: str) -> None:
+        self.marks[stage] = time.perf_counter() - self.started
+
+    def watch_first_speech(self, session: AgentSession) -> None:
+        """Mark the moment the agent first starts speaking (the greeting)."""
+
+        def _on_state_changed(ev) -> None:
+            if ev.new_state == "speaking":
+                session.off("agent_state_changed", _on_state_changed)
+                self.mark("first_greeting_audio")
+                logger.info(f"Time to first greeting for room {self.room_name}: {self.summary()}")
+
+        session.on("agent_state_changed", _on_state_changed)
+
+    def summary(self) -> str:
+        parts = []
+        for stage, at in self.marks.items():
+            duration = self.durations.get(stage)
+            if duration is not None:
+                parts.append(f"{stage}={duration * 1000:.0f}ms@{at * 1000:.0f}ms")
+            else:
+                parts.append(f"{stage}@{at * 1000:.0f}ms")
+        return " ".join(parts)
+
+
+@dataclass
+class BootstrapResult:
+    participant: rtc.RemoteParticipant
+    agent: Optional[Agent]
+    session: Optional[AgentSession] = None
+    tools: list = field(default_factory=list)
+    timings: Optional[BootstrapTimings] = None
+
+
+async def _build_session(session_factory: Callable[[Agent], AgentSession], agent: Agent) -> AgentSession:
+    return session_factory(agent)
+
+
+async def bootstrap_session(
+    ctx: JobContext,
+    session_factory: Callable[[Agent], AgentSession],
+) -> BootstrapResult:
+    """
+    Prepare everything `entrypoint` needs before `session.start`, overlapping
+    independent work instead of running it strictly in sequence:
+
+    1. The agent config fetch for the agent id in the job metadata starts
+       immediately and runs while the room connects and the participant joins.
+    2. Once the agent is known, the tool config fetch and session/model
+       construction run concurrently.
+
+    Args:
+        ctx: The job context.
+        session_factory: Builds the AgentSession for an agent (e.g. getAgentSession).
+
+    Returns:
+        BootstrapResult: The participant, agent config, session and tools.
+        `agent` is None when the agent could not be found.
+    """
+    timings = BootstrapTimings(ctx.room.name)
+    metadata_agent_id = ctx.job.metadata or None
+
+    agent_task: Optional[asyncio.Task] = None
+    if metadata_agent_id:
+        agent_task = asyncio.ensure_future(timings.timed("agent_config", fetch_agent(metadata_agent_id)))
+
+    try:
+        await timings.timed("connect", ctx.connect())
+        # Wait for the first participant to join
+        participant = await timings.timed("participant_join", ctx.wait_for_participant())
+    except BaseException:
+        if agent_task:
+            agent_task.cancel()
+        raise
+
+    agent_id = participant.attributes.get("agent_id") or metadata_agent_id
+    if agent_task and agent_id == metadata_agent_id:
+        agent = await agent_task
+    else:
+        if agent_task:
+            # the participant asked for a different agent than the dispatch metadata
+            agent_task.cancel()
+            await asyncio.gather(agent_task, return_exceptions=True)
+        agent = await timings.timed("agent_config", fetch_agent(agent_id))
+
+    if not agent:
+        return BootstrapResult(participant=participant, agent=None, timings=timings)
+
+    tools, session = await asyncio.gather(
+        timings.timed("tools", get_agentTools(agent)),
+        timings.timed("session", _build_session(session_factory, agent)),
+        return_exceptions=True,
+    )
+    for result in (tools, session):
+        if isinstance(result, BaseException):
+            if not isinstance(session, BaseException):
+                # the session never starts, so its pooled model clients go straight back
+                release_session_models(session)
+            raise result
+
+    logger.info(f"Bootstrap for room {ctx.room.name}: {timings.summary()}")
+    timings.watch_first_speech(session)
+
+    return BootstrapResult(
+        participant=participant,
+        agent=agent,
+        session=session,
+        tools=tools,
+        timings=timings,
+    )
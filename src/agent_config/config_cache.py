@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Awaitable, Callable, Union
+
+import httpx
+
+logger = logging.getLogger("config-cache")
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    fetched_at: float
+    negative: bool = False
+
+
+class ConfigCache:
+    """
+    In-process LRU cache for backend configuration (agents, tool sets).
+
+    - Entries younger than `ttl` are served directly.
+    - Entries between `ttl` and `ttl + stale_ttl` are served stale while a
+      background task refreshes them (stale-while-revalidate).
+    - A 404 from the loader is cached as a negative entry for `negative_ttl`.
+    - Concurrent misses for the same key share a single backend request.
+
+    Defaults come from CONFIG_CACHE_TTL, CONFIG_CACHE_STALE_TTL,
+    CONFIG_CACHE_NEGATIVE_TTL and CONFIG_CACHE_MAX_SIZE.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        max_size: Optional[int] = None,
+    ) -> None:
+        self.name = name
+        self.ttl = ttl if ttl is not None else _env_float("CONFIG_CACHE_TTL", 60.0)
+        self.stale_ttl = stale_ttl if stale_ttl is not None else _env_float("CONFIG_CACHE_STALE_TTL", 300.0)
+        self.negative_ttl = negative_ttl if negative_ttl is not None else _env_float("CONFIG_CACHE_NEGATIVE_TTL", 30.0)
+        self.max_size = max_size if max_size is not None else int(_env_float("CONFIG_CACHE_MAX_SIZE", 256))
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refresh_tasks: set = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+
+    async def get(self, key: str, loader: Callable[[str], Awaitable[Any]]) -> Optional[Any]:
+        """
+        Return the cached value for `key`, loading it with `loader` on a miss.
+
+        Args:
+            key: Cache key (agent_id or tool_id).
+            loader: Coroutine function that fetches the value from the backend.
+
+        Returns:
+            The cached value, or None if the backend reported the key as not found.
+
+        Raises:
+            Any non-404 error raised by the loader on a cold miss.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if entry.negative:
+                if age < self.negative_ttl:
+                    self.negative_hits += 1
+                    self._entries.move_to_end(key)
+                    return None
+            elif age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            elif age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._refresh(key, loader)
+                return entry.value
+
+        self.misses += 1
+        return await self._load(key, loader)
+
+    def _inflight_task(self, key: str) -> Optional[asyncio.Task]:
+        task = self._inflight.get(key)
+        # ignore tasks left behind by a loop that is no longer running
+        if task is not None and task.get_loop() is not asyncio.get_running_loop():
+            self._inflight.pop(key, None)
+            return None
+        return task
+
+    async def _load(self, key: str, loader: Callable[[str], Awaitable[Any]]) -> Optional[Any]:
+        task = self._inflight_task(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, loader))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: str, loader: Callable[[str], Awaitable[Any]]) -> Optional[Any]:
+        try:
+            value = await loader(key)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                logger.info(f"{self.name} {key} not found, caching negative result")
+                self._store(key, None, negative=True)
+                return None
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        self._store(key, value)
+        return value
+
+    def _refresh(self, key: str, loader: Callable[[str], Awaitable[Any]]) -> None:
+        if self._inflight_task(key) is not None:
+            return
+
+        async def _run() -> None:
+            try:
+                await self._fetch(key, loader)
+                self.refreshes += 1
+            except Exception as e:
+                # keep serving the stale entry until it ages out
+                self.refresh_errors += 1
+                logger.warning(f"Background refresh of {self.name} {key} failed: {e}")
+
+        task = asyncio.ensure_future(_run())
+        self._inflight[key] = task
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    def _store(self, key: str, value: Any, negative: bool = False) -> None:
+        self._entries[key] = _CacheEntry(value=value, fetched_at=time.monotonic(), negative=negative)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def is_warm(self, key: str) -> bool:
+        """True if `get(key)` would be answered without waiting for the backend."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        age = time.monotonic() - entry.fetched_at
+        return age < (self.negative_ttl if entry.negative else self.ttl + self.stale_ttl)
+
+    def invalidate(self, key: str) -> bool:
+        """Drop a single entry. Returns True if it was cached."""
+        return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "negative_hits": self.negative_hits,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "evictions": self.evictions,
+        }
+
+
+# Process-wide caches used by fetch_agent / get_tools
+agent_cache = ConfigCache("agent")
+tool_cache = ConfigCache("tool")
+
+# Data-packet topic the backend publishes to when an agent or tool set changes
+INVALIDATION_TOPIC = "agent-config-invalidate"
+
+
+def handle_invalidation(payload: Union[bytes, str, Dict[str, Any]]) -> None:
+    """
+    Apply an invalidation message pushed by the backend.
+
+    The payload is JSON such as {"agent_id": "..."}, {"tool_id": "..."} or
+    {"all": true}.
+    """
+    try:
+        if isinstance(payload, (bytes, str)):
+            payload = json.loads(payload)
+    except ValueError:
+        logger.warning("Ignoring malformed config invalidation message")
+        return
+
+    if payload.get("all"):
+        agent_cache.clear()
+        tool_cache.clear()
+        logger.info("Config cache cleared by backend")
+        return
+
+    if payload.get("agent_id"):
+        agent_cache.invalidate(payload["agent_id"])
+        logger.info(f"Agent {payload['agent_id']} invalidated by backend")
+    if payload.get("tool_id"):
+        tool_cache.invalidate(payload["tool_id"])
+        logger.info(f"Tool set {payload['tool_id']} invalidated by backend")
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {"agent": agent_cache.stats(), "tool": tool_cache.stats()}
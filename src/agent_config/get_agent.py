@@ -1,11 +1,14 @@
-import os
-import httpx
 from typing import Optional, Dict, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 import logging
 
 from pathlib import Path
+from agent_config.backend_client import get_backend_client
+from agent_config.config_cache import agent_cache, tool_cache
+from agent_config.history_codec import prepare_history
+from agent_config.log_pipeline import fingerprint, register_secret
+from tools.registry import get_tool_registry
 
 # Load environment variables
 load_dotenv(".env.local")
@@ -24,6 +27,9 @@ class Agent:
     user_id: Optional[str] = None
     api_key: Optional[str] = None
     tool_id: Optional[str] = None
+    # session profile name and per-agent overrides, see agent_config.session_profile
+    profile: Optional[str] = None
+    session_settings: Optional[Dict[str, Any]] = None
 
 @dataclass
 class AgentTool:
@@ -32,178 +38,142 @@ class AgentTool:
     appointment_tool: bool
     user_id: str
     created_at: str
+    # the raw payload, so new providers can read flags AgentTool does not map yet
+    config: Dict[str, Any] = field(default_factory=dict)
 
-async def fetch_agent(agent_id: str) -> Agent:
+async def fetch_agent(agent_id: str) -> Optional[Agent]:
     """
-    Fetch agent configuration from the backend API.
+    Fetch agent configuration, served from the in-process config cache when warm.
     
     Args:
         agent_id: The ID of the agent to fetch.
         
     Returns:
-        Agent: The agent configuration object.
+        Agent: The agent configuration object, or None if the backend returned 404.
         
     Raises:
         ValueError: If API_SECRET_KEY is not set.
         httpx.HTTPStatusError: If the API request fails.
     """
+    return await agent_cache.get(agent_id, _load_agent)
+
+async def _load_agent(agent_id: str) -> Agent:
+    """Fetch agent configuration from the backend API, bypassing the cache."""
+    client = get_backend_client()
     
-    # Get API configuration
-    api_url = os.getenv("API_URL", "http://127.0.0.1:8000")
-    secret_key = os.getenv("API_SECRET_KEY")
-    
-    if not secret_key:
+    if not client.secret_key:
         raise ValueError("API_SECRET_KEY is not set in environment variables")
     
-    # Construct endpoint URL
-    url = f"{api_url}/agents/get/{agent_id}"
-    
-    headers = {
-        "Authorization": f"Bearer {secret_key}",
-        "Content-Type": "application/json"
-    }
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        
-        # Map fields if necessary, assuming API returns keys matching Agent fields
-        # Ideally, we should validate this, but for now strict mapping
-        api_key = data.get("api_key")
-        logger.info(f"API Key: {api_key}")
-        logger.info(f"Agent: {data.get('name')}")
-        logger.info(f"Agent Type: {data.get('agent_type')}")
-        logger.info(f"Voice: {data.get('voice')}")
-        logger.info(f"Greeting Prompt: {data.get('greeting_prompt')}")
-        logger.info(f"System Prompt: {data.get('system_prompt')}")
-        logger.info(f"User ID: {data.get('user_id')}")
-
-        return Agent(
-            id=data.get("id", "manual-dispatch"),
-            name=data.get("name", "Assistant"),
-            agent_type=data.get("agent_type", "realtime"), # Ensure backend sends this or default
-            voice=data.get("voice", "alloy"),
-            greeting_prompt=data.get("greeting_prompt",""),
-            system_prompt=data.get("system_prompt",""),
-            user_id=data.get("user_id",""),
-            api_key=data.get("api_key"),
-            tool_id=data.get("tool_id")
-        )
-
-async def get_tools(tool_id: str) -> AgentTool:
+    response = await client.get(f"/agents/get/{agent_id}")
+    response.raise_for_status()
+    data = response.json()
+    
+    # Map fields if necessary, assuming API returns keys matching Agent fields
+    # Ideally, we should validate this, but for now strict mapping
+    # The api_key is never logged and the prompts only as fingerprints
+    register_secret(data.get("api_key"))
+    logger.info(
+        f"Loaded agent {data.get('id')} ({data.get('name')}, {data.get('agent_type')}, voice {data.get('voice')}) "
+        f"for user {data.get('user_id')}: greeting {fingerprint(data.get('greeting_prompt'))}, "
+        f"system prompt {fingerprint(data.get('system_prompt'))}"
+    )
+
+    return Agent(
+        id=data.get("id", "manual-dispatch"),
+        name=data.get("name", "Assistant"),
+        agent_type=data.get("agent_type", "realtime"), # Ensure backend sends this or default
+        voice=data.get("voice", "alloy"),
+        greeting_prompt=data.get("greeting_prompt",""),
+        system_prompt=data.get("system_prompt",""),
+        user_id=data.get("user_id",""),
+        api_key=data.get("api_key"),
+        tool_id=data.get("tool_id"),
+        profile=data.get("profile"),
+        session_settings=data.get("session_settings"),
+    )
+
+async def get_tools(tool_id: str) -> Optional[AgentTool]:
     """
-    Fetch tool configuration from the backend API.
+    Fetch tool configuration, served from the in-process config cache when warm.
     
     Args:
         tool_id: The ID of the tools to fetch.
         
     Returns:
-        AgentTool: The tools configuration object.
+        AgentTool: The tools configuration object, or None if the backend returned 404.
         
     Raises:
         ValueError: If API_SECRET_KEY is not set.
         httpx.HTTPStatusError: If the API request fails.
     """
+    return await tool_cache.get(tool_id, _load_tools)
+
+async def _load_tools(tool_id: str) -> AgentTool:
+    """Fetch tool configuration from the backend API, bypassing the cache."""
+    client = get_backend_client()
     
-    # Get API configuration
-    api_url = os.getenv("API_URL", "http://127.0.0.1:8000")
-    secret_key = os.getenv("API_SECRET_KEY")
-    
-    if not secret_key:
+    if not client.secret_key:
         raise ValueError("API_SECRET_KEY is not set in environment variables")
     
-    # Construct endpoint URL
-    url = f"{api_url}/tools/get/{tool_id}"
-    
-    headers = {
-        "Authorization": f"Bearer {secret_key}",
-        "Content-Type": "application/json"
-    }
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+    response = await client.get(f"/tools/get/{tool_id}")
+    response.raise_for_status()
+    data = response.json()
 
-    
-        logger.info(f"Tool ID: {data.get('id')}")
-        logger.info(f"Tool Name: {data.get('name')}")
-        logger.info(f"Appointment Tool: {data.get('appointment_tool')}")
-        logger.info(f"User ID: {data.get('user_id')}")
-
-        return AgentTool(
-            id=data.get("id"),
-            name=data.get("name"),
-            appointment_tool=data.get("appointment_tool"),
-            user_id=data.get("user_id"),
-            created_at=data.get("created_at")
-        )
-
-# Import necessary for the new function
-from tools.appointment_tool import AppointmentTools
-from tools.defaut.default_tools import DefaultTools
+    logger.info(
+        f"Loaded tools {data.get('id')} ({data.get('name')}) for user {data.get('user_id')}: "
+        f"appointment_tool={data.get('appointment_tool')}"
+    )
+
+    return AgentTool(
+        id=data.get("id"),
+        name=data.get("name"),
+        appointment_tool=data.get("appointment_tool"),
+        user_id=data.get("user_id"),
+        created_at=data.get("created_at"),
+        config=data,
+    )
 
 async def get_agentTools(agent: Agent) -> list:
     """
     Fetch and initialize tools for the agent.
+
+    Which tools an agent gets is decided by the tool providers' config keys
+    (see tools.registry); providers are imported and built once per process,
+    on the first agent that enables them.
     """
-    tools = []
-    
-    # Initialize default tools (e.g. business hours) which are generally available
-    # or check if they should be enabled based on agent config if needed.
-    # For now, we enable them for all agents that have a user_id.
-    if agent.user_id:
-        try:
-             # DefaultTools no longer requires user_id at init
-            def_tools = DefaultTools()
-            # tools.append(def_tools.get_business_hours) # This method was removed
-            tools.extend([def_tools.is_org_open, def_tools.call_forward, def_tools.hangup_call])
-        except Exception as e:
-             logger.error(f"Failed to register default tools for agent {agent.id}: {e}")
-
-    if agent.tool_id:
-        try:
-            agent_tools_config = await get_tools(agent.tool_id)
-            if agent_tools_config.appointment_tool:
-                logger.info(f"Registering appointment tools for agent {agent.id}")
-                appt_tools = AppointmentTools()
-                tools.extend([
-                    appt_tools.check_availability,
-                    appt_tools.book_appointment
-                ])
-        except Exception as e:
-            logger.error(f"Failed to fetch tools for agent {agent.id}: {e}")
-    return tools
-
-async def create_history(data: dict) -> None:
+    return await get_tool_registry().tools_for(agent, get_tools)
+
+async def create_history(data: dict, idempotency_key: Optional[str] = None) -> bool:
     """
     Create a history entry in the backend.
     
     Args:
         data: Dictionary containing history data matching HistoryCreate model.
+        idempotency_key: Sent as the Idempotency-Key header so retried uploads
+            are not stored twice.
+        
+    Returns:
+        bool: True if the backend accepted the record.
     """
-    api_url = os.getenv("API_URL", "http://127.0.0.1:8000")
-    secret_key = os.getenv("API_SECRET_KEY")
+    client = get_backend_client()
     
-    if not secret_key:
+    if not client.secret_key:
         logger.warning("API_SECRET_KEY not set, skipping history creation")
-        return
+        return False
 
-    url = f"{api_url}/history/create"
-    
-    headers = {
-        "Authorization": f"Bearer {secret_key}",
-        "Content-Type": "application/json"
-    }
+    url = "/history/create"
+    body, headers = prepare_history(data)
+    if idempotency_key:
+        headers["Idempotency-Key"] = idempotency_key
     
     try:
-        logger.info(f"Sending history creation request to {url}")
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=data, headers=headers)
-            if response.status_code != 200:
-                logger.error(f"Failed to create history. Status: {response.status_code}, Response: {response.text}")
-            response.raise_for_status()
-            logger.info(f"History created successfully for agent {data.get('agent_id')}")
+        logger.info(f"Sending history creation request to {client.api_url}{url} ({len(body)} bytes, {headers.get('Content-Encoding', 'identity')})")
+        response = await client.post(url, content=body, headers=headers)
+        if response.status_code != 200:
+            logger.error(f"Failed to create history. Status: {response.status_code}, Response: {response.text}")
+        response.raise_for_status()
+        logger.info(f"History created successfully for agent {data.get('agent_id')}")
+        return True
     except Exception as e:
         logger.error(f"Exception during history creation: {e}", exc_info=True)
+        return False
@@ -0,0 +1,161 @@
+import os
+import re
+import mmap
+import struct
+import hashlib
+import uuid
+import logging
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
+
+from livekit import rtc
+from livekit.agents import AgentSession, tts
+
+logger = logging.getLogger("greeting-cache")
+
+# file layout: magic, sample rate, channels, then little-endian int16 PCM
+_MAGIC = b"GRT1"
+_HEADER = struct.Struct("<4sIH")
+_FRAME_MS = 20
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def _safe(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", value)[:64]
+
+
+class _CachedGreeting:
+    """A memory-mapped greeting; frames are sliced out of the mapping on demand."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.sample_rate, self.num_channels = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a greeting cache file")
+        self.size = len(self._mmap)
+
+    def frames(self) -> AsyncIterator[rtc.AudioFrame]:
+        samples = self.sample_rate * _FRAME_MS // 1000
+        step = samples * self.num_channels * 2
+        view = memoryview(self._mmap)[_HEADER.size :]
+
+        async def iterate() -> AsyncIterator[rtc.AudioFrame]:
+            for offset in range(0, len(view), step):
+                chunk = view[offset : offset + step]
+                yield rtc.AudioFrame(chunk, self.sample_rate, self.num_channels, len(chunk) // (2 * self.num_channels))
+
+        return iterate()
+
+
+class GreetingCache:
+    """
+    On-disk cache of synthesized greetings, played with `session.say(audio=...)`.
+
+    Entries are keyed by (agent_id, voice, hash of the greeting text), so a
+    changed greeting or voice is a new entry; older entries of the same
+    agent are deleted when the new one is written. Files are raw PCM with a
+    small header and are memory-mapped, so a hit costs no TTS request and
+    no copy of the audio into the heap. The first call for a key streams
+    the TTS output to the caller and to disk at the same time.
+
+    Configuration:
+        GREETING_CACHE_DIR  directory for the cache files (default .greeting_cache)
+        GREETING_CACHE      set to 0 to always synthesize the greeting
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory or os.getenv("GREETING_CACHE_DIR", ".greeting_cache")
+        self.enabled = os.getenv("GREETING_CACHE", "1").lower() not in ("0", "false", "no")
+        self._loaded: Dict[str, _CachedGreeting] = {}
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _path(self, agent_id: str, voice: str, text: str) -> Tuple[str, str]:
+        prefix = f"{_safe(agent_id)}="
+        name = f"{prefix}{_text_hash(voice)}-{_text_hash(text)}.pcm"
+        return os.path.join(self.directory, name), prefix
+
+    def _load(self, path: str) -> Optional[_CachedGreeting]:
+        cached = self._loaded.get(path)
+        if cached is None and os.path.exists(path):
+            try:
+                cached = self._loaded[path] = _CachedGreeting(path)
+            except (OSError, ValueError, struct.error) as e:
+                self.errors += 1
+                logger.warning(f"Discarding unreadable greeting {path}: {e}")
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return cached
+
+    def _remove_stale(self, prefix: str, keep: str) -> None:
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(prefix) and path != keep and name.endswith(".pcm"):
+                # frames still playing may reference the mapping; it is unmapped once they are gone
+                self._loaded.pop(path, None)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    async def _synthesize(self, engine: tts.TTS, text: str, path: str, prefix: str) -> AsyncIterator[rtc.AudioFrame]:
+        """Yield the TTS frames while writing them to `path`; the file only appears once complete."""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        complete = False
+        with open(tmp, "wb") as f:
+            try:
+                f.write(_HEADER.pack(_MAGIC, engine.sample_rate, engine.num_channels))
+                async with engine.synthesize(text) as stream:
+                    async for audio in stream:
+                        f.write(audio.frame.data.cast("B"))
+                        yield audio.frame
+                complete = True
+            finally:
+                if not complete:
+                    os.remove(tmp)
+        os.replace(tmp, path)
+        self._remove_stale(prefix, keep=path)
+        logger.info(f"Cached greeting audio {os.path.basename(path)} ({os.path.getsize(path)} bytes)")
+
+    def audio(self, session: AgentSession, agent_id: str, voice: str, text: str) -> Optional[AsyncIterator[rtc.AudioFrame]]:
+        """
+        Audio frames for the greeting, from the cache or from the session's TTS
+        (filling the cache). None when the session has no TTS to synthesize
+        with (realtime models) or the cache is disabled.
+        """
+        if not self.enabled or session.tts is None or not text:
+            return None
+        path, prefix = self._path(agent_id, voice, text)
+        cached = self._load(path)
+        if cached is not None:
+            self.hits += 1
+            return cached.frames()
+        self.misses += 1
+        return self._synthesize(session.tts, text, path, prefix)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "mapped_bytes": sum(greeting.size for greeting in self._loaded.values()),
+        }
+
+
+_greeting_cache: Optional[GreetingCache] = None
+
+
+def get_greeting_cache() -> GreetingCache:
+    """Return the process-wide greeting cache, shared by every session."""
+    global _greeting_cache
+    if _greeting_cache is None:
+        _greeting_cache = GreetingCache()
+    return _greeting_cache
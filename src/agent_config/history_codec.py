@@ -0,0 +1,187 @@
+import os
+import gzip
+import json
+import logging
+from typing import Optional, Dict, Any, List, Tuple, Union
+
+logger = logging.getLogger("history-codec")
+
+FORMAT_VERSION = 1
+
+# Interned codes; append only, never renumber (decoders of older payloads depend on them)
+ROLE_CODES = {"system": 0, "developer": 1, "user": 2, "assistant": 3}
+ROLES = {code: role for role, code in ROLE_CODES.items()}
+
+TYPE_MESSAGE = 0
+TYPE_TOOLS = 1
+TYPE_FUNCTION_CALL = 2
+TYPE_FUNCTION_OUTPUT = 3
+TYPE_RAW = 9
+
+ENCODINGS = ("identity", "gzip", "zstd")
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+def _ms(created_at: Optional[float], t0: float) -> int:
+    return int(round(((created_at or t0) - t0) * 1000))
+
+
+def _compact_args(arguments: Any) -> Any:
+    # arguments arrive as a JSON string; embedding the parsed value avoids double escaping
+    if isinstance(arguments, str):
+        try:
+            return json.loads(arguments)
+        except ValueError:
+            return arguments
+    return arguments
+
+
+def _encode_message(item: Dict[str, Any], t0: float) -> List[Any]:
+    content = item.get("content") or []
+    if len(content) == 1 and isinstance(content[0], str):
+        content = content[0]
+    row = [TYPE_MESSAGE, ROLE_CODES.get(item.get("role"), item.get("role")), content, _ms(item.get("created_at"), t0), int(bool(item.get("interrupted")))]
+    if item.get("metrics"):
+        row.append(item["metrics"])
+    return row
+
+
+def _encode_tools(event: Dict[str, Any], t0: float) -> List[Any]:
+    outputs = {output.get("call_id"): output for output in event.get("function_call_outputs") or [] if output}
+    calls = []
+    for call in event.get("function_calls") or []:
+        output = outputs.get(call.get("call_id")) or {}
+        called_at, returned_at = call.get("created_at"), output.get("created_at")
+        duration = _ms(returned_at, called_at) if called_at and returned_at else 0
+        calls.append([call.get("name"), _compact_args(call.get("arguments")), output.get("output"), duration, int(bool(output.get("is_error")))])
+    return [TYPE_TOOLS, _ms(event.get("created_at"), t0), calls]
+
+
+def encode_conversation(conversation: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert a raw conversation (as recorded from session events) to the compact schema.
+
+    Messages become `[0, role_code, content, t_ms, interrupted(, metrics)]` and
+    tool events `[1, t_ms, [[name, args, result, duration_ms, is_error], ...]]`.
+    Item ids, hashes, empty `extra` blobs and absolute timestamps are dropped;
+    times are milliseconds relative to `t0`, the first item's timestamp.
+    Anything the schema does not know about is kept verbatim as `[9, item]`.
+
+    Returns:
+        Dict[str, Any]: `{"v": FORMAT_VERSION, "t0": float, "items": [...]}`
+    """
+    t0 = min((item.get("created_at") for item in conversation if item.get("created_at")), default=0.0)
+    items: List[Any] = []
+    for item in conversation:
+        kind = item.get("type")
+        if kind == "message":
+            items.append(_encode_message(item, t0))
+        elif kind == "function_tools_executed":
+            items.append(_encode_tools(item, t0))
+        elif kind == "function_call":
+            items.append([TYPE_FUNCTION_CALL, _ms(item.get("created_at"), t0), item.get("name"), _compact_args(item.get("arguments"))])
+        elif kind == "function_call_output":
+            items.append([TYPE_FUNCTION_OUTPUT, _ms(item.get("created_at"), t0), item.get("name"), item.get("output"), int(bool(item.get("is_error")))])
+        else:
+            items.append([TYPE_RAW, item])
+    return {"v": FORMAT_VERSION, "t0": t0, "items": items}
+
+
+def _decode_arguments(arguments: Any) -> str:
+    return arguments if isinstance(arguments, str) else json.dumps(arguments)
+
+
+def decode_conversation(payload: Union[Dict[str, Any], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Expand a compact conversation back into item dictionaries.
+
+    Raw (pre-compact) conversations are returned unchanged, so callers can
+    decode any stored history record. Dropped fields are not restored.
+
+    Raises:
+        ValueError: If the payload was written by a newer format version.
+    """
+    if isinstance(payload, list):
+        return payload
+
+    version = payload.get("v")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported history format version: {version}")
+
+    t0 = payload.get("t0") or 0.0
+    conversation = []
+    for row in payload.get("items", []):
+        kind = row[0]
+        if kind == TYPE_MESSAGE:
+            content = row[2] if isinstance(row[2], list) else [row[2]]
+            item = {"type": "message", "role": ROLES.get(row[1], row[1]), "content": content, "created_at": t0 + row[3] / 1000, "interrupted": bool(row[4])}
+            if len(row) > 5:
+                item["metrics"] = row[5]
+            conversation.append(item)
+        elif kind == TYPE_TOOLS:
+            created_at = t0 + row[1] / 1000
+            calls, outputs = [], []
+            for i, (name, arguments, output, duration, is_error) in enumerate(row[2]):
+                call_id = f"call_{i}"
+                calls.append({"type": "function_call", "call_id": call_id, "name": name, "arguments": _decode_arguments(arguments)})
+                outputs.append({"type": "function_call_output", "call_id": call_id, "name": name, "output": output, "is_error": bool(is_error), "duration": duration / 1000})
+            conversation.append({"type": "function_tools_executed", "created_at": created_at, "function_calls": calls, "function_call_outputs": outputs})
+        elif kind == TYPE_FUNCTION_CALL:
+            conversation.append({"type": "function_call", "created_at": t0 + row[1] / 1000, "name": row[2], "arguments": _decode_arguments(row[3])})
+        elif kind == TYPE_FUNCTION_OUTPUT:
+            conversation.append({"type": "function_call_output", "created_at": t0 + row[1] / 1000, "name": row[2], "output": row[3], "is_error": bool(row[4])})
+        elif kind == TYPE_RAW:
+            conversation.append(row[1])
+        else:
+            raise ValueError(f"Unknown history item code: {kind}")
+    return conversation
+
+
+def encode_body(data: Dict[str, Any], encoding: str = "identity") -> Tuple[bytes, Dict[str, str]]:
+    """
+    Serialize a history record into a request body.
+
+    Args:
+        data: The history record.
+        encoding: "identity", "gzip" or "zstd". zstd needs the optional
+            `zstandard` package and falls back to gzip without it.
+
+    Returns:
+        Tuple[bytes, Dict[str, str]]: The body and the headers describing it.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown history encoding: {encoding}")
+
+    body = json.dumps(data, separators=(",", ":"), default=str).encode()
+    headers = {"Content-Type": "application/json"}
+    if encoding == "zstd" and zstandard is None:
+        logger.warning("zstandard is not installed, compressing history with gzip instead")
+        encoding = "gzip"
+
+    if encoding == "gzip":
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    elif encoding == "zstd":
+        body = zstandard.ZstdCompressor(level=3).compress(body)
+        headers["Content-Encoding"] = "zstd"
+    return body, headers
+
+
+def prepare_history(data: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Build the `/history/create` body according to the configured wire format.
+
+    Configuration:
+        HISTORY_FORMAT    "raw" (default) or "compact"
+        HISTORY_ENCODING  "identity" (default), "gzip" or "zstd"
+
+    Both default to the format the backend has always accepted; switch them
+    on once the backend understands the compact schema / Content-Encoding.
+    """
+    if os.getenv("HISTORY_FORMAT", "raw") == "compact" and isinstance(data.get("conversation"), list):
+        data = {**data, "conversation": encode_conversation(data["conversation"])}
+    return encode_body(data, os.getenv("HISTORY_ENCODING", "identity"))
@@ -0,0 +1,281 @@
+import os
+import json
+import time
+import uuid
+import random
+import sqlite3
+import asyncio
+import logging
+import threading
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
+
+from agent_config.get_agent import create_history
+
+logger = logging.getLogger("history-spool")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    claimed_by TEXT,
+    claimed_at REAL
+)
+"""
+
+
+class HistorySpool:
+    """
+    Write-ahead spool for conversation history uploads.
+
+    Records are committed to a SQLite file (WAL mode, shared by every job
+    process on the host) before any network call, then drained by a
+    background uploader with batching, exponential backoff and a stable
+    idempotency key per record. A record claimed by a process that dies is
+    released after the claim lease expires, so pending uploads survive
+    worker restarts.
+
+    Configuration:
+        HISTORY_SPOOL_DIR           directory for the spool file (default .history_spool)
+        HISTORY_SPOOL_BATCH         records uploaded per batch (default 10)
+        HISTORY_SPOOL_POLL          seconds between drain passes (default 5)
+        HISTORY_SPOOL_MAX_BACKOFF   backoff cap in seconds (default 300)
+        HISTORY_SPOOL_MAX_ATTEMPTS  attempts before a record is parked as dead (default 20)
+        HISTORY_SPOOL_LEASE         seconds before another process may retry a claim (default 60)
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        uploader: Optional[Callable[[Dict[str, Any], str], Awaitable[bool]]] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        lease: Optional[float] = None,
+    ) -> None:
+        self.directory = directory or os.getenv("HISTORY_SPOOL_DIR", ".history_spool")
+        self.path = os.path.join(self.directory, "history.sqlite3")
+        self.batch_size = batch_size or int(os.getenv("HISTORY_SPOOL_BATCH", "10"))
+        self.poll_interval = poll_interval or float(os.getenv("HISTORY_SPOOL_POLL", "5"))
+        self.max_backoff = max_backoff or float(os.getenv("HISTORY_SPOOL_MAX_BACKOFF", "300"))
+        self.max_attempts = max_attempts or int(os.getenv("HISTORY_SPOOL_MAX_ATTEMPTS", "20"))
+        self.lease = lease or float(os.getenv("HISTORY_SPOOL_LEASE", "60"))
+
+        self._uploader = uploader or _upload_history
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        self.depth = 0
+        self.uploaded = 0
+        self.failed_attempts = 0
+        self.dead = 0
+        self.last_upload_latency = 0.0
+        self._total_upload_latency = 0.0
+
+    # -- sqlite access (always called from a worker thread) --
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(self.directory, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(_SCHEMA)
+            self._db = db
+        return self._db
+
+    def _execute(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._db_lock:
+            return fn(self._conn())
+
+    def _insert(self, key: str, payload: str) -> int:
+        def run(db: sqlite3.Connection) -> int:
+            now = time.time()
+            db.execute(
+                "INSERT OR IGNORE INTO pending (idempotency_key, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            return db.execute("SELECT COUNT(*) FROM pending WHERE status = 'pending'").fetchone()[0]
+
+        return self._execute(run)
+
+    def _claim(self) -> List[Tuple[int, str, str, int]]:
+        def run(db: sqlite3.Connection) -> List[Tuple[int, str, str, int]]:
+            now = time.time()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = db.execute(
+                    """
+                    SELECT id, idempotency_key, payload, attempts FROM pending
+                    WHERE status = 'pending' AND next_attempt_at <= ?
+                      AND (claimed_by IS NULL OR claimed_at < ?)
+                    ORDER BY id LIMIT ?
+                    """,
+                    (now, now - self.lease, self.batch_size),
+                ).fetchall()
+                db.executemany(
+                    "UPDATE pending SET claimed_by = ?, claimed_at = ? WHERE id = ?",
+                    [(self._owner, now, row[0]) for row in rows],
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            return rows
+
+        return self._execute(run)
+
+    def _complete(self, row_id: int) -> None:
+        self._execute(lambda db: db.execute("DELETE FROM pending WHERE id = ?", (row_id,)))
+
+    def _retry(self, row_id: int, attempts: int) -> bool:
+        """Schedule the next attempt; returns False if the record was parked as dead."""
+        if attempts >= self.max_attempts:
+            self._execute(
+                lambda db: db.execute(
+                    "UPDATE pending SET status = 'dead', attempts = ?, claimed_by = NULL WHERE id = ?",
+                    (attempts, row_id),
+                )
+            )
+            return False
+
+        backoff = min(self.max_backoff, 2 ** attempts) * random.uniform(0.5, 1.0)
+        self._execute(
+            lambda db: db.execute(
+                "UPDATE pending SET attempts = ?, next_attempt_at = ?, claimed_by = NULL WHERE id = ?",
+                (attempts, time.time() + backoff, row_id),
+            )
+        )
+        return True
+
+    def _count(self) -> int:
+        return self._execute(
+            lambda db: db.execute("SELECT COUNT(*) FROM pending WHERE status = 'pending'").fetchone()[0]
+        )
+
+    # -- async API --
+
+    async def enqueue(self, record: Dict[str, Any], idempotency_key: Optional[str] = None) -> str:
+        """
+        Durably store a history record for upload.
+
+        Returns:
+            str: The idempotency key sent with every upload attempt of this record.
+        """
+        key = idempotency_key or uuid.uuid4().hex
+        payload = json.dumps(record, default=str)
+        self.depth = await asyncio.to_thread(self._insert, key, payload)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return key
+
+    async def _upload(self, row: Tuple[int, str, str, int]) -> bool:
+        row_id, key, payload, attempts = row
+        start = time.perf_counter()
+        try:
+            ok = await self._uploader(json.loads(payload), key)
+        except Exception as e:
+            logger.error(f"History upload {key} raised: {e}")
+            ok = False
+        latency = time.perf_counter() - start
+
+        if ok:
+            self.uploaded += 1
+            self.last_upload_latency = latency
+            self._total_upload_latency += latency
+            await asyncio.to_thread(self._complete, row_id)
+            return True
+
+        self.failed_attempts += 1
+        if not await asyncio.to_thread(self._retry, row_id, attempts + 1):
+            self.dead += 1
+            logger.error(f"History record {key} gave up after {attempts + 1} attempts")
+        return False
+
+    async def drain(self) -> int:
+        """
+        Upload every record that is currently due, one batch at a time.
+
+        Returns:
+            int: Number of records uploaded.
+        """
+        uploaded = 0
+        while True:
+            rows = await asyncio.to_thread(self._claim)
+            if not rows:
+                break
+            results = await asyncio.gather(*(self._upload(row) for row in rows))
+            uploaded += sum(results)
+            if not all(results):
+                # the backend is struggling; leave the rest for the next pass
+                break
+
+        self.depth = await asyncio.to_thread(self._count)
+        return uploaded
+
+    async def flush(self, timeout: float) -> int:
+        """Best-effort drain bounded by `timeout`; whatever is left stays spooled."""
+        try:
+            return await asyncio.wait_for(self.drain(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"History flush timed out after {timeout}s, {self.depth} record(s) left in spool")
+            return 0
+
+    def start(self) -> None:
+        """Start the background uploader on the running loop (idempotent)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.drain()
+            except Exception as e:
+                logger.error(f"History uploader pass failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        avg = self._total_upload_latency / self.uploaded if self.uploaded else 0.0
+        return {
+            "queue_depth": self.depth,
+            "uploaded": self.uploaded,
+            "failed_attempts": self.failed_attempts,
+            "dead": self.dead,
+            "last_upload_ms": round(self.last_upload_latency * 1000, 2),
+            "avg_upload_ms": round(avg * 1000, 2),
+        }
+
+
+async def _upload_history(record: Dict[str, Any], idempotency_key: str) -> bool:
+    return await create_history(record, idempotency_key=idempotency_key)
+
+
+_history_spool: Optional[HistorySpool] = None
+
+
+def get_history_spool() -> HistorySpool:
+    """Return the process-wide history spool."""
+    global _history_spool
+    if _history_spool is None:
+        _history_spool = HistorySpool()
+    return _history_spool
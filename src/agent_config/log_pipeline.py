@@ -0,0 +1,329 @@
+import os
+import re
+import time
+import queue
+import atexit
+import hashlib
+import logging
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Dict, Any, List, Iterable, Callable
+
+logger = logging.getLogger("log-pipeline")
+
+# room / agent / session of the job a record was logged from
+_log_fields: ContextVar[Optional[Dict[str, Any]]] = ContextVar("log_fields", default=None)
+
+
+def bind_log_context(**fields: Any) -> None:
+    """
+    Attach fields (room, agent, session) to every record logged from this
+    task and the tasks it starts. The first call in a job creates the field
+    set; later calls add to it, so tasks started in between see them too.
+    """
+    current = _log_fields.get()
+    if current is None:
+        _log_fields.set(dict(fields))
+    else:
+        current.update(fields)
+
+
+def log_fields() -> Dict[str, Any]:
+    return dict(_log_fields.get() or {})
+
+
+def fingerprint(text: Optional[str]) -> str:
+    """Short stable digest of a prompt, so changes can be told apart in the logs without writing it out."""
+    if not text:
+        return "empty"
+    return f"sha256:{hashlib.sha256(text.encode()).hexdigest()[:12]} ({len(text)} chars)"
+
+
+_SECRET_ENV = re.compile(r"KEY|SECRET|TOKEN|PASSWORD", re.IGNORECASE)
+_KEY_VALUE = re.compile(
+    r"""(?i)\b(api[_-]?key|secret(?:[_-]?key)?|token|password|authorization)(["']?\s*[:=]\s*["']?)(?:bearer\s+)?([^\s"',;}]+)"""
+)
+_BEARER = re.compile(r"(?i)\bbearer\s+[A-Za-z0-9._~+/=-]+")
+_REDACTED = "[REDACTED]"
+
+
+class Redactor:
+    """
+    Masks secrets in log messages: the values of secret-looking environment
+    variables, secrets registered at runtime (an agent's api_key), `key=value`
+    pairs with a secret-looking key and bearer tokens.
+    """
+
+    def __init__(self, secrets: Iterable[str] = (), environ: Optional[Dict[str, str]] = None) -> None:
+        self._secrets: List[str] = []
+        environ = os.environ if environ is None else environ
+        for name, value in environ.items():
+            if _SECRET_ENV.search(name):
+                self.add(value)
+        for secret in secrets:
+            self.add(secret)
+
+    def add(self, secret: Optional[str]) -> None:
+        # short values would mask ordinary words
+        if secret and len(secret) >= 8 and secret not in self._secrets:
+            # longest first, so a secret containing another is masked whole
+            self._secrets = sorted([*self._secrets, secret], key=len, reverse=True)
+
+    def __call__(self, text: str) -> str:
+        for secret in self._secrets:
+            if secret in text:
+                text = text.replace(secret, _REDACTED)
+        text = _KEY_VALUE.sub(lambda m: f"{m.group(1)}{m.group(2)}{_REDACTED}", text)
+        return _BEARER.sub(f"Bearer {_REDACTED}", text)
+
+
+def _parse_rules(spec: str) -> Dict[str, float]:
+    rules = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip():
+            rules[name.strip()] = float(value)
+    return rules
+
+
+def _rule(name: str, rules: Dict[str, float], default: float) -> float:
+    # the most specific configured logger wins: "livekit" covers "livekit.agents"
+    while name:
+        if name in rules:
+            return rules[name]
+        name = name.rpartition(".")[0]
+    return rules.get("*", default)
+
+
+@dataclass
+class _LoggerState:
+    sample: float
+    rate: float
+    credit: float = 0.0
+    tokens: float = 0.0
+    refilled: float = 0.0
+    sampled_out: int = 0
+    rate_limited: int = 0
+    pending: int = 0
+
+
+class LogSampler(logging.Filter):
+    """
+    Per-logger sampling and rate limiting, applied on the logging thread
+    before a record is queued. DEBUG/INFO records are kept at the logger's
+    sample rate; every record below ERROR is subject to the logger's rate
+    limit (records per second, bursting up to one second's worth). Errors
+    always pass. The first record let through after a suppression carries
+    `suppressed=<count>`.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__()
+        self.sample_rates = sample_rates if sample_rates is not None else _parse_rules(os.getenv("LOG_SAMPLE_RATES", ""))
+        self.rate_limits = rate_limits if rate_limits is not None else _parse_rules(os.getenv("LOG_RATE_LIMITS", "*=50"))
+        self._clock = clock
+        self._loggers: Dict[str, _LoggerState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, name: str) -> _LoggerState:
+        state = self._loggers.get(name)
+        if state is None:
+            sample, rate = _rule(name, self.sample_rates, 1.0), _rule(name, self.rate_limits, 0.0)
+            # the first record of a logger is always kept
+            state = self._loggers[name] = _LoggerState(
+                sample=sample, rate=rate, credit=1.0 - sample, tokens=rate, refilled=self._clock()
+            )
+        return state
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+        with self._lock:
+            state = self._state(record.name)
+            if record.levelno < logging.WARNING and state.sample < 1.0:
+                state.credit += state.sample
+                if state.credit < 1.0:
+                    state.sampled_out += 1
+                    return False
+                state.credit -= 1.0
+            if state.rate > 0:
+                now = self._clock()
+                state.tokens = min(state.rate, state.tokens + (now - state.refilled) * state.rate)
+                state.refilled = now
+                if state.tokens < 1.0:
+                    state.rate_limited += 1
+                    state.pending += 1
+                    return False
+                state.tokens -= 1.0
+            if state.pending:
+                record.suppressed = state.pending
+                state.pending = 0
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            suppressed = {
+                name: state.sampled_out + state.rate_limited
+                for name, state in self._loggers.items()
+                if state.sampled_out or state.rate_limited
+            }
+            return {
+                "sampled_out": sum(state.sampled_out for state in self._loggers.values()),
+                "rate_limited": sum(state.rate_limited for state in self._loggers.values()),
+                "by_logger": dict(sorted(suppressed.items(), key=lambda item: -item[1])[:5]),
+            }
+
+
+class _ContextQueueHandler(QueueHandler):
+    """Queues records as they are: the message is formatted on the listener thread."""
+
+    def __init__(self, log_queue: "queue.Queue", pipeline: "LogPipeline") -> None:
+        super().__init__(log_queue)
+        self._pipeline = pipeline
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        for name, value in (_log_fields.get() or {}).items():
+            record.__dict__.setdefault(name, value)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._pipeline.dropped += 1
+
+
+class _RedactingListener(QueueListener):
+    def __init__(self, log_queue: "queue.Queue", handlers: List[logging.Handler], redactor: Redactor) -> None:
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self._redact = redactor
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        try:
+            message = record.getMessage()
+        except Exception:
+            message = str(record.msg)
+        record.msg = self._redact(message)
+        record.args = None
+        return record
+
+    def enqueue_sentinel(self) -> None:
+        # the queue may be full; the listener thread is still draining it
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    """
+    Moves log handling off the event loop serving audio.
+
+    The root logger's handlers (the stdout formatter in the worker, the IPC
+    forwarder in job processes) are moved behind a bounded queue drained by
+    a background listener thread. On the logging thread a record is only
+    sampled/rate limited (LogSampler), tagged with the job's room, agent and
+    session fields (bind_log_context) and queued; message formatting, secret
+    redaction (Redactor) and handler I/O happen on the listener thread.
+    The fields are record attributes, so LiveKit's JSON log formatter emits
+    them as top-level keys. When the queue is full, records are dropped and
+    counted rather than blocking the loop.
+
+    Configuration:
+        LOG_PIPELINE      set to 0 to keep synchronous logging (default on)
+        LOG_QUEUE_SIZE    records waiting for the listener (default 10000)
+        LOG_SAMPLE_RATES  fraction of DEBUG/INFO records kept per logger, e.g. "livekit=0.5,default-tools=0.1"
+        LOG_RATE_LIMITS   records per second per logger, "*" for every other logger (default "*=50")
+    """
+
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        sampler: Optional[LogSampler] = None,
+        redactor: Optional[Redactor] = None,
+    ) -> None:
+        self.queue: "queue.Queue" = queue.Queue(queue_size or int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        self.sampler = sampler or LogSampler()
+        self.redactor = redactor or Redactor()
+        self.dropped = 0
+        self._root: Optional[logging.Logger] = None
+        self._handlers: List[logging.Handler] = []
+        self._handler: Optional[_ContextQueueHandler] = None
+        self._listener: Optional[_RedactingListener] = None
+
+    @property
+    def installed(self) -> bool:
+        return self._listener is not None
+
+    def install(self, root: Optional[logging.Logger] = None) -> bool:
+        """Put the queue in front of `root`'s handlers; False if it has none to move."""
+        if self._listener is not None:
+            return True
+        root = root or logging.getLogger()
+        handlers = list(root.handlers)
+        if not handlers:
+            return False
+        self._root, self._handlers = root, handlers
+        self._listener = _RedactingListener(self.queue, handlers, self.redactor)
+        self._handler = _ContextQueueHandler(self.queue, self)
+        self._handler.addFilter(self.sampler)
+        for handler in handlers:
+            root.removeHandler(handler)
+        root.addHandler(self._handler)
+        self._listener.start()
+        return True
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Wait (blocking) until the listener has handled everything queued so far."""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self) -> None:
+        """Drain the queue and log synchronously again."""
+        if self._listener is None:
+            return
+        self._root.removeHandler(self._handler)
+        self._listener.stop()
+        for handler in self._handlers:
+            self._root.addHandler(handler)
+        self._listener = None
+        self._handler = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queued": self.queue.qsize(), "dropped": self.dropped, **self.sampler.stats()}
+
+
+_pipeline: Optional[LogPipeline] = None
+
+
+def get_log_pipeline() -> Optional[LogPipeline]:
+    return _pipeline
+
+
+def install_log_pipeline() -> Optional[LogPipeline]:
+    """Install the process-wide pipeline (once); None when disabled or there is nothing to move."""
+    global _pipeline
+    if os.getenv("LOG_PIPELINE", "1").lower() in ("0", "false", "no"):
+        return None
+    if _pipeline is None:
+        pipeline = LogPipeline()
+        if not pipeline.install():
+            return None
+        _pipeline = pipeline
+        # drain what is still queued when the interpreter exits normally
+        atexit.register(pipeline.stop)
+    return _pipeline
+
+
+def register_secret(secret: Optional[str]) -> None:
+    """Mask `secret` in everything logged from now on, e.g. an agent's api_key."""
+    if _pipeline is not None:
+        _pipeline.redactor.add(secret)
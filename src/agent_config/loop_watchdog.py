@@ -0,0 +1,235 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple, Set, Callable, Deque
+
+from prometheus_client import Counter as PromCounter, Histogram
+
+logger = logging.getLogger("loop-watchdog")
+
+_STALLS = PromCounter(
+    "voice_agent_loop_stalls_total",
+    "Callbacks that blocked the event loop longer than LOOP_WATCHDOG_THRESHOLD",
+    ["culprit"],
+)
+_STALL_SECONDS = Histogram(
+    "voice_agent_loop_stall_seconds",
+    "How long a reported callback blocked the event loop",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0),
+)
+
+# the agent's own code: frames under here name the culprit
+_SRC_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_STACK_LINES = 12
+
+
+def _module_name(filename: str, roots: Tuple[str, ...]) -> str:
+    for root in roots:
+        if filename.startswith(root + os.sep):
+            return os.path.splitext(os.path.relpath(filename, root))[0].replace(os.sep, ".")
+    marker = f"site-packages{os.sep}"
+    if marker in filename:
+        return os.path.splitext(filename.split(marker, 1)[1])[0].replace(os.sep, ".")
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def culprit_of(frames: List[traceback.FrameSummary], roots: Tuple[str, ...] = (_SRC_ROOT,)) -> str:
+    """
+    Name what blocked the loop: the innermost frame of the agent's own code
+    (a tool, a config module) and, when it called into a library, the
+    library module that was running, e.g.
+    `tools.appointment_tool.check_availability -> googleapiclient.http`.
+    """
+    own = next((f for f in reversed(frames) if any(f.filename.startswith(root + os.sep) for root in roots)), None)
+    innermost = frames[-1] if frames else None
+    if own is None:
+        return _module_name(innermost.filename, roots) if innermost else "unknown"
+    name = f"{_module_name(own.filename, roots)}.{own.name}"
+    if innermost is not None and innermost is not own:
+        library = _module_name(innermost.filename, roots)
+        if not library.startswith(_module_name(own.filename, roots)):
+            name += f" -> {library}"
+    return name
+
+
+@dataclass
+class Stall:
+    culprit: str
+    task: str
+    rooms: Tuple[str, ...]
+    stack: List[traceback.FrameSummary]
+    duration: float = 0.0
+
+
+class LoopWatchdog:
+    """
+    Opt-in detector for callbacks that block the job's event loop.
+
+    A heartbeat task ticks on the loop every `interval`; a monitor thread
+    notices when the tick is more than `threshold` late, i.e. while a
+    callback is still running, and captures the loop thread's stack right
+    then. When the loop comes back the stall is recorded with its measured
+    duration, the stack's culprit (see `culprit_of`), the task it ran in and
+    the rooms being served by this process, and logged; the first
+    LOOP_WATCHDOG_STACKS stalls are logged with their stack.
+
+    Configuration:
+        LOOP_WATCHDOG            set to 1 to enable (default off)
+        LOOP_WATCHDOG_THRESHOLD  seconds a callback may block before it is reported (default 0.1)
+        LOOP_WATCHDOG_STACKS     stalls per process logged with their stack (default 20)
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        interval: Optional[float] = None,
+        max_stacks: Optional[int] = None,
+        roots: Tuple[str, ...] = (_SRC_ROOT,),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = threshold or float(os.getenv("LOOP_WATCHDOG_THRESHOLD", "0.1"))
+        self.interval = interval or self.threshold / 4
+        self.max_stacks = max_stacks if max_stacks is not None else int(os.getenv("LOOP_WATCHDOG_STACKS", "20"))
+        self.roots = roots
+        self._clock = clock
+        self._rooms: Set[str] = set()
+        self._lock = threading.Lock()
+        self._pending: Optional[Stall] = None
+        self._beat = clock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.recent: Deque[Stall] = deque(maxlen=50)
+        self.count = 0
+        self.blocked = 0.0
+        self.worst = 0.0
+        self.by_culprit: Counter = Counter()
+        self.by_room: Counter = Counter()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        """Start watching the running loop; call from the loop's thread."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = self._clock()
+        self._stop.clear()
+        self._task = asyncio.ensure_future(self._heartbeat())
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def aclose(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def watch(self, room: str) -> None:
+        """Attribute stalls to `room` while it is being served by this process."""
+        with self._lock:
+            self._rooms.add(room)
+
+    def unwatch(self, room: str) -> None:
+        with self._lock:
+            self._rooms.discard(room)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self._beat = self._clock()
+            await asyncio.sleep(self.interval)
+            late = self._clock() - self._beat - self.interval
+            with self._lock:
+                stall, self._pending = self._pending, None
+            if stall is not None and late > self.threshold:
+                stall.duration = late
+                self._record(stall)
+
+    def _monitor(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self) -> None:
+        """Capture the loop's stack if the heartbeat is overdue (monitor thread)."""
+        if self._clock() - self._beat <= self.interval + self.threshold:
+            return
+        with self._lock:
+            if self._pending is not None:
+                return
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                return
+            stack = traceback.extract_stack(frame)
+            task = asyncio.current_task(self._loop) if self._loop is not None else None
+            self._pending = Stall(
+                culprit=culprit_of(stack, self.roots),
+                task=task.get_name() if task is not None else "-",
+                rooms=tuple(sorted(self._rooms)),
+                stack=stack,
+            )
+
+    def _record(self, stall: Stall) -> None:
+        self.count += 1
+        self.blocked += stall.duration
+        self.worst = max(self.worst, stall.duration)
+        self.by_culprit[stall.culprit] += 1
+        for room in stall.rooms:
+            self.by_room[room] += 1
+        self.recent.append(stall)
+        _STALLS.labels(culprit=stall.culprit).inc()
+        _STALL_SECONDS.observe(stall.duration)
+
+        message = (
+            f"Event loop blocked for {stall.duration * 1000:.0f}ms by {stall.culprit} "
+            f"(task {stall.task}, rooms {', '.join(stall.rooms) or '-'})"
+        )
+        if self.count <= self.max_stacks:
+            message += "\n" + "".join(traceback.format_list(stall.stack[-_STACK_LINES:])).rstrip()
+        logger.warning(message)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stalls": self.count,
+            "blocked_ms": round(self.blocked * 1000),
+            "worst_ms": round(self.worst * 1000),
+            "culprits": dict(self.by_culprit.most_common(5)),
+            "rooms": dict(self.by_room.most_common(5)),
+        }
+
+
+_watchdog: Optional[LoopWatchdog] = None
+
+
+def watchdog_enabled() -> bool:
+    return os.getenv("LOOP_WATCHDOG", "0").lower() in ("1", "true", "yes")
+
+
+def start_loop_watchdog(room: str) -> Optional[LoopWatchdog]:
+    """
+    Start the process-wide watchdog (once) and attribute stalls to `room`.
+    Returns None when LOOP_WATCHDOG is not enabled.
+    """
+    global _watchdog
+    if not watchdog_enabled():
+        return None
+    if _watchdog is None:
+        _watchdog = LoopWatchdog()
+    _watchdog.start()
+    _watchdog.watch(room)
+    return _watchdog
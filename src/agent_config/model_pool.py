@@ -0,0 +1,169 @@
+import os
+import time
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable
+
+logger = logging.getLogger("voice-agent")
+
+
+def api_key_hash(api_key: Optional[str]) -> str:
+    """Stable, non-reversible pool key component so secrets never sit in keys or logs."""
+    if not api_key:
+        return ""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class PoolKey:
+    agent_type: str
+    voice: str
+    api_key_hash: str
+    model: str
+
+
+@dataclass
+class ModelSet:
+    """The model clients one AgentSession is built from; any of them may be None."""
+
+    llm: Any = None
+    stt: Any = None
+    tts: Any = None
+
+    def clients(self) -> list:
+        return [client for client in (self.stt, self.llm, self.tts) if client is not None]
+
+    def prewarm(self) -> None:
+        """Open provider connections (websocket pools, TLS) ahead of first use where supported."""
+        for client in self.clients():
+            prewarm = getattr(client, "prewarm", None)
+            if prewarm is None:
+                continue
+            try:
+                prewarm()
+            except Exception as e:
+                # prewarm needs a running loop; outside a job it is simply skipped
+                logger.debug(f"Prewarm of {type(client).__name__} skipped: {e}")
+
+    async def aclose(self) -> None:
+        await asyncio.gather(
+            *(client.aclose() for client in self.clients() if hasattr(client, "aclose")),
+            return_exceptions=True,
+        )
+
+
+@dataclass
+class _PoolEntry:
+    models: ModelSet
+    created_at: float
+    last_used: float
+    in_use: int = 0
+    checkouts: int = 0
+
+
+@dataclass
+class ModelLease:
+    """A checked-out ModelSet; call `release()` when the session ends."""
+
+    key: PoolKey
+    models: ModelSet
+    warm: bool
+    _pool: "ModelPool" = field(repr=False)
+    _released: bool = field(default=False, repr=False)
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._pool._release(self.key)
+
+
+class ModelPool:
+    """
+    Per-process pool of ready-to-use model clients.
+
+    STT/LLM/TTS clients and realtime models hold no per-session state (each
+    AgentSession opens its own streams from them) and AgentSession never
+    closes them, so one client set can serve every session with the same
+    configuration. Entries are keyed by (agent_type, voice, api key hash,
+    model), prewarmed when created so provider connections are already open
+    when the session starts, and evicted once idle for MODEL_POOL_IDLE_TTL
+    seconds (default 600) or when the pool grows past MODEL_POOL_MAX_SIZE
+    entries (default 8, least recently used idle entry first).
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size or int(os.getenv("MODEL_POOL_MAX_SIZE", "8"))
+        self.idle_ttl = idle_ttl if idle_ttl is not None else float(os.getenv("MODEL_POOL_IDLE_TTL", "600"))
+        self._clock = clock
+        self._entries: "OrderedDict[PoolKey, _PoolEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def checkout(self, key: PoolKey, factory: Callable[[], ModelSet]) -> ModelLease:
+        """Return the pooled clients for `key`, building and prewarming them with `factory` on a miss."""
+        now = self._clock()
+        self._evict_idle(now)
+
+        entry = self._entries.get(key)
+        warm = entry is not None
+        if entry is None:
+            self.misses += 1
+            models = factory()
+            models.prewarm()
+            entry = _PoolEntry(models=models, created_at=now, last_used=now)
+            self._entries[key] = entry
+        else:
+            self.hits += 1
+
+        entry.in_use += 1
+        entry.checkouts += 1
+        entry.last_used = now
+        self._entries.move_to_end(key)
+        self._evict_overflow()
+        return ModelLease(key=key, models=entry.models, warm=warm, _pool=self)
+
+    def _release(self, key: PoolKey) -> None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.in_use = max(entry.in_use - 1, 0)
+            entry.last_used = self._clock()
+
+    def _evict(self, key: PoolKey) -> None:
+        entry = self._entries.pop(key)
+        self.evictions += 1
+        try:
+            asyncio.get_running_loop().create_task(entry.models.aclose())
+        except RuntimeError:
+            pass  # no loop to close on; the clients are dropped with the entry
+
+    def _evict_idle(self, now: float) -> None:
+        for key, entry in list(self._entries.items()):
+            if entry.in_use == 0 and now - entry.last_used >= self.idle_ttl:
+                self._evict(key)
+
+    def _evict_overflow(self) -> None:
+        for key, entry in list(self._entries.items()):
+            if len(self._entries) <= self.max_size:
+                return
+            if entry.in_use == 0:
+                self._evict(key)
+        if len(self._entries) > self.max_size:
+            logger.warning(f"Model pool over capacity: {len(self._entries)}/{self.max_size} entries in use")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "in_use": sum(1 for entry in self._entries.values() if entry.in_use),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
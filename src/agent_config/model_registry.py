@@ -0,0 +1,115 @@
+import logging
+from typing import Optional, Dict, Tuple
+
+from livekit import rtc
+from livekit.agents import JobProcess, vad
+
+from .model_pool import ModelPool
+
+logger = logging.getLogger("voice-agent")
+
+
+def register_plugins() -> None:
+    """
+    Import every plugin a session may use; call in the worker's main process.
+
+    Plugins register on import, which must happen on the main thread, and
+    the turn detector's inference runner must be known before the worker
+    starts; `download-files` also needs them registered. Under the
+    forkserver start method registered plugins are preloaded once and
+    inherited by every job process. Everything else imports them lazily,
+    so importing this module stays cheap.
+    """
+    from livekit.plugins import noise_cancellation, openai, silero  # noqa: F401
+    from livekit.plugins.turn_detector import multilingual  # noqa: F401
+
+
+class ModelRegistry:
+    """
+    Per-process holder for the local models every session needs.
+
+    VAD and noise-cancellation filters are loaded once in `prewarm`. The
+    turn detector needs the job's inference executor, so it is created on
+    first use inside a job and then shared by every later session that runs
+    in the same process. Session profiles with their own VAD settings get a
+    VAD loaded once per distinct setting (`vad_for`). It also owns the warm
+    pool of model clients (`pool`) that `getAgentSession` checks sessions'
+    STT/LLM/TTS out of.
+    """
+
+    def __init__(self) -> None:
+        self._vad: Optional[vad.VAD] = None
+        self._tuned_vads: Dict[Tuple[Tuple[str, float], ...], vad.VAD] = {}
+        self._turn_detector = None
+        self._bvc: Optional[rtc.NoiseCancellationOptions] = None
+        self._bvc_telephony: Optional[rtc.NoiseCancellationOptions] = None
+        self.pool = ModelPool()
+
+    @classmethod
+    def from_proc(cls, proc: JobProcess) -> "ModelRegistry":
+        """Return the registry stored on the process, creating it if prewarm did not."""
+        registry = proc.userdata.get("models")
+        if registry is None:
+            registry = cls()
+            proc.userdata["models"] = registry
+        return registry
+
+    def load(self) -> "ModelRegistry":
+        """Eagerly load everything that does not need a job context."""
+        _ = self.vad
+        _ = self.bvc
+        _ = self.bvc_telephony
+        return self
+
+    @property
+    def vad(self) -> vad.VAD:
+        if self._vad is None:
+            from livekit.plugins import silero
+
+            logger.info("Loading Silero VAD")
+            self._vad = silero.VAD.load()
+        return self._vad
+
+    def vad_for(self, options: Dict[str, float]) -> "vad.VAD":
+        """The shared VAD, or one loaded once per distinct set of profile VAD settings."""
+        if not options:
+            return self.vad
+        key = tuple(sorted(options.items()))
+        tuned = self._tuned_vads.get(key)
+        if tuned is None:
+            from livekit.plugins import silero
+
+            logger.info(f"Loading Silero VAD with {options}")
+            tuned = self._tuned_vads[key] = silero.VAD.load(**options)
+        return tuned
+
+    @property
+    def turn_detector(self):
+        if self._turn_detector is None:
+            from livekit.plugins.turn_detector.multilingual import MultilingualModel
+
+            logger.info("Loading multilingual turn detector")
+            self._turn_detector = MultilingualModel()
+        return self._turn_detector
+
+    @property
+    def bvc(self) -> rtc.NoiseCancellationOptions:
+        if self._bvc is None:
+            from livekit.plugins import noise_cancellation
+
+            self._bvc = noise_cancellation.BVC()
+        return self._bvc
+
+    @property
+    def bvc_telephony(self) -> rtc.NoiseCancellationOptions:
+        if self._bvc_telephony is None:
+            from livekit.plugins import noise_cancellation
+
+            self._bvc_telephony = noise_cancellation.BVCTelephony()
+        return self._bvc_telephony
+
+    def noise_cancellation_for(self, params) -> rtc.NoiseCancellationOptions:
+        """Pick the noise-cancellation filter for a participant (telephony for SIP)."""
+        if params.participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_SIP:
+            return self.bvc_telephony
+        return self.bvc
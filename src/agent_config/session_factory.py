@@ -1,54 +1,128 @@
+from typing import Dict, Any
+
 from livekit.agents import AgentSession, inference
-from livekit.plugins import openai, silero
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
 from .get_agent import Agent
+from .model_registry import ModelRegistry
+from .model_pool import ModelSet, PoolKey, api_key_hash
+from .session_profile import SessionProfile, resolve_profile
+from .tts_cache import CachingTTS
+
+
+def _realtime_models(profile: SessionProfile, voice: str, api_key: str) -> ModelSet:
+    from livekit.plugins import openai
+
+    options = {"model": profile.llm_model} if profile.llm_model else {}
+    return ModelSet(llm=openai.realtime.RealtimeModel(voice=voice, api_key=api_key, **options))
+
+
+def _custom_models(profile: SessionProfile) -> ModelSet:
+    tts = inference.TTS(model=profile.tts_model, voice=profile.tts_voice)
+    if profile.tts_phrase_cache:
+        # repeated sentences (confirmations, fillers, slot answers) are played from the phrase cache
+        tts = CachingTTS(tts, voice=profile.tts_voice or "")
+    return ModelSet(
+        # Speech-to-text (STT) is your agent's ears, turning the user's speech into text that the LLM can understand
+        # See all available models at https://docs.livekit.io/agents/models/stt/
+        stt=inference.STT(model=profile.stt_model, language=profile.stt_language or "en"),
+        # A Large Language Model (LLM) is your agent's brain, processing user input and generating a response
+        # See all available models at https://docs.livekit.io/agents/models/llm/
+        llm=inference.LLM(model=profile.llm_model),
+        # Text-to-speech (TTS) is your agent's voice, turning the LLM's text into speech that the user can hear
+        # See all available models as well as voice selections at https://docs.livekit.io/agents/models/tts/
+        tts=tts,
+    )
+
+
+def _turn_handling(profile: SessionProfile, models: ModelRegistry) -> Dict[str, Any]:
+    """Build AgentSession's turn_handling options from the settings the profile sets."""
+    turn_handling: Dict[str, Any] = {}
+    if profile.turn_detection == "multilingual":
+        # VAD and turn detection are used to determine when the user is speaking and when the agent should respond
+        # See more at https://docs.livekit.io/agents/build/turns
+        turn_handling["turn_detection"] = models.turn_detector
+    elif profile.turn_detection:
+        turn_handling["turn_detection"] = profile.turn_detection
+
+    endpointing = {
+        "min_delay": profile.min_endpointing_delay,
+        "max_delay": profile.max_endpointing_delay,
+    }
+    interruption = {
+        "enabled": profile.allow_interruptions,
+        "min_duration": profile.min_interruption_duration,
+        "min_words": profile.min_interruption_words,
+    }
+    # allow the LLM to generate a response while waiting for the end of turn
+    # See more at https://docs.livekit.io/agents/build/audio/#preemptive-generation
+    preemptive = {"enabled": profile.preemptive_generation}
+    for name, options in (("endpointing", endpointing), ("interruption", interruption), ("preemptive_generation", preemptive)):
+        options = {key: value for key, value in options.items() if value is not None}
+        if options:
+            turn_handling[name] = options
+    return turn_handling
 
-def getAgentSession(agent: Agent) -> AgentSession:
+
+def getAgentSession(agent: Agent, models: ModelRegistry) -> AgentSession:
     """
-    Creates and returns an AgentSession based on the agent configuration type.
-    
+    Creates and returns an AgentSession from the agent's session profile.
+
+    The profile (see `agent_config.session_profile`) picks the pipeline,
+    model ids, VAD, endpointing and interruption settings. Model clients are
+    checked out of the process-wide warm pool (`models.pool`) instead of
+    being constructed per call; the lease is stored on the session as
+    `model_lease` and must be released when the session ends.
+
     Args:
         agent: Agent configuration object.
-                      
+        models: Process-wide registry holding the prewarmed VAD, turn detector and model pool.
+
     Returns:
         AgentSession: Configured agent session.
     """
-    
-    if agent.agent_type == "realtime":
-        return AgentSession(
-            llm=openai.realtime.RealtimeModel(
-                voice=agent.voice,
-                api_key=agent.api_key,
-            ),
-            vad=silero.VAD.load(),
+    profile = resolve_profile(agent)
+
+    if profile.pipeline == "realtime":
+        voice = agent.voice or "alloy"
+        lease = models.pool.checkout(
+            PoolKey("realtime", voice, api_key_hash(agent.api_key), profile.llm_model or "default"),
+            lambda: _realtime_models(profile, voice, agent.api_key),
         )
-    if agent.agent_type == "custom":
-        return AgentSession(
-            # Speech-to-text (STT) is your agent's ears, turning the user's speech into text that the LLM can understand
-            # See all available models at https://docs.livekit.io/agents/models/stt/
-            stt=inference.STT(model="assemblyai/universal-streaming", language="en"),
-            # A Large Language Model (LLM) is your agent's brain, processing user input and generating a response
-            # See all available models at https://docs.livekit.io/agents/models/llm/
-            llm=inference.LLM(model="openai/gpt-4.1-mini"),
-            # Text-to-speech (TTS) is your agent's voice, turning the LLM's text into speech that the user can hear
-            # See all available models as well as voice selections at https://docs.livekit.io/agents/models/tts/
-            tts=inference.TTS(
-                model="cartesia/sonic-3", voice="9626c31c-bec5-4cca-baa8-f8ba9e84c8bc"
+    else:
+        lease = models.pool.checkout(
+            PoolKey(
+                "custom",
+                profile.tts_voice or "",
+                "",
+                "|".join(
+                    (
+                        profile.stt_model,
+                        profile.stt_language or "en",
+                        profile.llm_model,
+                        profile.tts_model,
+                        "cached" if profile.tts_phrase_cache else "",
+                    )
+                ),
             ),
-            # VAD and turn detection are used to determine when the user is speaking and when the agent should respond
-            # See more at https://docs.livekit.io/agents/build/turns
-            turn_detection=MultilingualModel(),
-            vad=silero.VAD.load(),
-            # allow the LLM to generate a response while waiting for the end of turn
-            # See more at https://docs.livekit.io/agents/build/audio/#preemptive-generation
-            preemptive_generation=True,
+            lambda: _custom_models(profile),
         )
 
-    # Fallback default
-    return AgentSession(
-        llm=openai.realtime.RealtimeModel(
-            voice=agent.voice or "alloy",
-            api_key=agent.openai_api_key,
-        ),
-        vad=silero.VAD.load(),
-    )
+    options: Dict[str, Any] = {
+        name: client
+        for name, client in (("stt", lease.models.stt), ("llm", lease.models.llm), ("tts", lease.models.tts))
+        if client is not None
+    }
+    turn_handling = _turn_handling(profile, models)
+    if turn_handling:
+        options["turn_handling"] = turn_handling
+    session = AgentSession(vad=models.vad_for(profile.vad_options), **options)
+
+    session.model_lease = lease
+    session.profile = profile
+    return session
+
+
+def release_session_models(session: AgentSession) -> None:
+    """Hand a session's model clients back to the warm pool; safe to call more than once."""
+    lease = getattr(session, "model_lease", None)
+    if lease is not None:
+        lease.release()
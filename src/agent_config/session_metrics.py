@@ -0,0 +1,185 @@
+import os
+import time
+import bisect
+from typing import Optional, Dict, Any, List, Tuple
+
+from livekit.agents import AgentSession
+from prometheus_client import Counter, Histogram
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+# Process-wide series, served by the worker's /metrics endpoint (see PROMETHEUS_PORT in agent.py)
+_EOU_TO_FIRST_TOKEN = Histogram(
+    "voice_agent_eou_to_first_token_seconds",
+    "End of user speech to first LLM token",
+    buckets=LATENCY_BUCKETS,
+)
+_EOU_TO_FIRST_AUDIO = Histogram(
+    "voice_agent_eou_to_first_audio_seconds",
+    "End of user speech to first TTS audio of the reply",
+    buckets=LATENCY_BUCKETS,
+)
+_TOOL_DURATION = Histogram(
+    "voice_agent_tool_duration_seconds",
+    "Function tool execution time",
+    ["tool"],
+    buckets=LATENCY_BUCKETS,
+)
+_TIME_TO_GREETING = Histogram(
+    "voice_agent_time_to_greeting_seconds",
+    "Agent entering the session to the greeting starting to play",
+    buckets=LATENCY_BUCKETS,
+)
+_INTERRUPTIONS = Counter("voice_agent_interruptions_total", "Agent replies interrupted by the caller")
+
+
+class LatencyHistogram:
+    """Per-session histogram with the same buckets as the exported series."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.samples: List[float] = []
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        bisect.insort(self.samples, value)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        return self.samples[min(len(self.samples) - 1, int(p / 100 * len(self.samples)))]
+
+    def summary(self) -> Dict[str, Any]:
+        labels = [f"le_{b:g}" for b in self.buckets] + ["le_inf"]
+        return {
+            "count": len(self.samples),
+            "p50": _round(self.percentile(50)),
+            "p95": _round(self.percentile(95)),
+            "max": _round(self.samples[-1] if self.samples else None),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 4) if value is not None else None
+
+
+class SessionMetrics:
+    """
+    Per-turn latency instrumentation for one AgentSession.
+
+    Reads the per-turn timings livekit attaches to each ChatMessage
+    (`end_of_turn_delay` on user turns, `llm_node_ttft` / `tts_node_ttfb` /
+    `e2e_latency` on agent turns) plus tool and agent-state events, and
+    records:
+
+        eou_to_first_token  end of user speech -> first LLM token
+        eou_to_first_audio  end of user speech -> first TTS audio byte
+        tool.<name>         function tool execution time
+        interruptions       agent replies cut off by the caller
+        time_to_greeting    Assistant.on_enter -> greeting starts playing
+
+    Every sample goes to a per-session histogram (attached to the history
+    record through `summary()`) and to the process-wide Prometheus series.
+    """
+
+    def __init__(self, session: AgentSession, room_name: str = "") -> None:
+        self._session = session
+        self.room_name = room_name
+        self.eou_to_first_token = LatencyHistogram()
+        self.eou_to_first_audio = LatencyHistogram()
+        self.tools: Dict[str, LatencyHistogram] = {}
+        self.interruptions = 0
+        self.turns = 0
+        self.time_to_greeting: Optional[float] = None
+
+        self._user_turn_delay: Optional[float] = None
+        self._greeting_requested: Optional[float] = None
+
+    def start(self) -> None:
+        self._session.on("conversation_item_added", self._on_item_added)
+        self._session.on("function_tools_executed", self._on_tools_executed)
+        self._session.on("agent_state_changed", self._on_state_changed)
+
+    def stop(self) -> None:
+        self._session.off("conversation_item_added", self._on_item_added)
+        self._session.off("function_tools_executed", self._on_tools_executed)
+        self._session.off("agent_state_changed", self._on_state_changed)
+
+    def greeting_requested(self) -> None:
+        """Call from `Agent.on_enter` right before the greeting is generated."""
+        self._greeting_requested = time.perf_counter()
+
+    def _on_state_changed(self, ev) -> None:
+        if ev.new_state == "speaking" and self._greeting_requested is not None and self.time_to_greeting is None:
+            self.time_to_greeting = time.perf_counter() - self._greeting_requested
+            _TIME_TO_GREETING.observe(self.time_to_greeting)
+
+    def _on_item_added(self, ev) -> None:
+        item = ev.item
+        if getattr(item, "type", None) != "message":
+            return
+        metrics = item.metrics or {}
+
+        if item.role == "user":
+            if "end_of_turn_delay" in metrics:
+                self._user_turn_delay = metrics["end_of_turn_delay"] + metrics.get("on_user_turn_completed_delay", 0.0)
+            return
+        if item.role != "assistant":
+            return
+
+        if item.interrupted:
+            self.interruptions += 1
+            _INTERRUPTIONS.inc()
+
+        # replies without a preceding user turn (greeting, tool follow-ups) have no end of speech
+        turn_delay, self._user_turn_delay = self._user_turn_delay, None
+        if turn_delay is None:
+            return
+        self.turns += 1
+
+        if "llm_node_ttft" in metrics:
+            first_token = turn_delay + metrics["llm_node_ttft"]
+            self.eou_to_first_token.observe(first_token)
+            _EOU_TO_FIRST_TOKEN.observe(first_token)
+
+        first_audio = metrics.get("e2e_latency")
+        if first_audio is None and "llm_node_ttft" in metrics and "tts_node_ttfb" in metrics:
+            first_audio = turn_delay + metrics["llm_node_ttft"] + metrics["tts_node_ttfb"]
+        if first_audio is not None:
+            self.eou_to_first_audio.observe(first_audio)
+            _EOU_TO_FIRST_AUDIO.observe(first_audio)
+
+    def _on_tools_executed(self, ev) -> None:
+        outputs = {output.call_id: output for output in ev.function_call_outputs if output is not None}
+        for call in ev.function_calls:
+            output = outputs.get(call.call_id)
+            if output is None:
+                continue
+            duration = max(output.created_at - call.created_at, 0.0)
+            self.tools.setdefault(call.name, LatencyHistogram()).observe(duration)
+            _TOOL_DURATION.labels(tool=call.name).observe(duration)
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregated per-session metrics, stored on the history record."""
+        return {
+            "turns": self.turns,
+            "interruptions": self.interruptions,
+            "time_to_greeting": _round(self.time_to_greeting),
+            "eou_to_first_token": self.eou_to_first_token.summary(),
+            "eou_to_first_audio": self.eou_to_first_audio.summary(),
+            "tools": {name: hist.summary() for name, hist in self.tools.items()},
+        }
+
+
+def prometheus_options() -> Dict[str, Any]:
+    """
+    WorkerOptions kwargs that expose /metrics on the worker.
+
+    PROMETHEUS_PORT enables the endpoint. Job processes only show up in it
+    when PROMETHEUS_MULTIPROC_DIR is set as well (livekit reads that one
+    directly from the environment).
+    """
+    port = os.getenv("PROMETHEUS_PORT")
+    return {"prometheus_port": int(port)} if port else {}
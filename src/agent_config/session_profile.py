@@ -0,0 +1,178 @@
+import json
+import logging
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache
+from typing import Optional, Dict, Any
+
+from .get_agent import Agent
+
+logger = logging.getLogger("voice-agent")
+
+PIPELINES = ("realtime", "custom")
+TURN_DETECTION_MODES = ("multilingual", "vad", "stt", "realtime_llm")
+
+
+@dataclass(frozen=True)
+class SessionProfile:
+    """
+    Declarative description of how an AgentSession is built.
+
+    `pipeline` selects a realtime model or an STT -> LLM -> TTS pipeline.
+    Any latency setting left as None keeps the livekit default, so a profile
+    only states what it actually tunes.
+
+    Fields:
+        stt_model / stt_language / llm_model / tts_model / tts_voice:
+            inference model ids (custom pipeline). For realtime, `llm_model`
+            is the realtime model id and the voice comes from the agent.
+        vad_activation_threshold / vad_min_speech_duration / vad_min_silence_duration:
+            Silero VAD settings.
+        turn_detection: "multilingual" (turn detector model), "vad", "stt" or "realtime_llm".
+        min_endpointing_delay / max_endpointing_delay: seconds of silence before
+            the user's turn is considered complete.
+        allow_interruptions / min_interruption_duration / min_interruption_words:
+            barge-in handling.
+        preemptive_generation: start the LLM before end of turn is confirmed.
+        tts_phrase_cache: serve repeated sentences from the phrase cache
+            (custom pipeline, see `agent_config.tts_cache`).
+    """
+
+    name: str
+    pipeline: str = "realtime"
+    stt_model: Optional[str] = None
+    stt_language: Optional[str] = None
+    llm_model: Optional[str] = None
+    tts_model: Optional[str] = None
+    tts_voice: Optional[str] = None
+    vad_activation_threshold: Optional[float] = None
+    vad_min_speech_duration: Optional[float] = None
+    vad_min_silence_duration: Optional[float] = None
+    turn_detection: Optional[str] = None
+    min_endpointing_delay: Optional[float] = None
+    max_endpointing_delay: Optional[float] = None
+    allow_interruptions: Optional[bool] = None
+    min_interruption_duration: Optional[float] = None
+    min_interruption_words: Optional[int] = None
+    preemptive_generation: Optional[bool] = None
+    tts_phrase_cache: bool = True
+
+    def __post_init__(self) -> None:
+        if self.pipeline not in PIPELINES:
+            raise ValueError(f"pipeline must be one of {PIPELINES}, got {self.pipeline!r}")
+        if self.pipeline == "custom":
+            missing = [f for f in ("stt_model", "llm_model", "tts_model") if not getattr(self, f)]
+            if missing:
+                raise ValueError(f"custom pipeline needs {', '.join(missing)}")
+        if self.turn_detection is not None and self.turn_detection not in TURN_DETECTION_MODES:
+            raise ValueError(f"turn_detection must be one of {TURN_DETECTION_MODES}, got {self.turn_detection!r}")
+        if self.vad_activation_threshold is not None and not 0 < self.vad_activation_threshold < 1:
+            raise ValueError("vad_activation_threshold must be between 0 and 1")
+        for name in (
+            "vad_min_speech_duration",
+            "vad_min_silence_duration",
+            "min_endpointing_delay",
+            "max_endpointing_delay",
+            "min_interruption_duration",
+            "min_interruption_words",
+        ):
+            value = getattr(self, name)
+            if value is not None and value < 0:
+                raise ValueError(f"{name} must not be negative")
+        if (
+            self.min_endpointing_delay is not None
+            and self.max_endpointing_delay is not None
+            and self.min_endpointing_delay > self.max_endpointing_delay
+        ):
+            raise ValueError("min_endpointing_delay must not exceed max_endpointing_delay")
+
+    @property
+    def vad_options(self) -> Dict[str, float]:
+        """Keyword arguments for silero.VAD.load; empty means the shared default VAD."""
+        options = {
+            "activation_threshold": self.vad_activation_threshold,
+            "min_speech_duration": self.vad_min_speech_duration,
+            "min_silence_duration": self.vad_min_silence_duration,
+        }
+        return {key: value for key, value in options.items() if value is not None}
+
+
+_CUSTOM = SessionProfile(
+    name="custom",
+    pipeline="custom",
+    stt_model="assemblyai/universal-streaming",
+    stt_language="en",
+    llm_model="openai/gpt-4.1-mini",
+    tts_model="cartesia/sonic-3",
+    tts_voice="9626c31c-bec5-4cca-baa8-f8ba9e84c8bc",
+    turn_detection="multilingual",
+    preemptive_generation=True,
+)
+
+BUILTIN_PROFILES: Dict[str, SessionProfile] = {
+    "realtime": SessionProfile(name="realtime", pipeline="realtime"),
+    "custom": _CUSTOM,
+    # simple receptionist flows do not need the larger model
+    "receptionist": replace(_CUSTOM, name="receptionist", llm_model="openai/gpt-4.1-nano"),
+    # answers sooner at the cost of occasionally cutting a slow speaker off
+    "low_latency": replace(
+        _CUSTOM,
+        name="low_latency",
+        llm_model="openai/gpt-4.1-nano",
+        min_endpointing_delay=0.3,
+        max_endpointing_delay=1.5,
+        vad_min_silence_duration=0.35,
+    ),
+}
+
+DEFAULT_PROFILE = "realtime"
+
+_FIELDS = {f.name for f in fields(SessionProfile)} - {"name"}
+
+
+def build_profile(base: str, overrides: Optional[Dict[str, Any]] = None) -> SessionProfile:
+    """
+    Apply backend overrides to a built-in profile and validate the result.
+
+    Raises:
+        ValueError: Unknown base profile, unknown field or invalid value.
+    """
+    profile = BUILTIN_PROFILES.get(base)
+    if profile is None:
+        raise ValueError(f"unknown session profile {base!r}")
+    if not overrides:
+        return profile
+    unknown = set(overrides) - _FIELDS
+    if unknown:
+        raise ValueError(f"unknown session profile fields: {', '.join(sorted(unknown))}")
+    return replace(profile, **overrides)
+
+
+@lru_cache(maxsize=256)
+def _cached_profile(base: str, overrides_json: str) -> SessionProfile:
+    return build_profile(base, json.loads(overrides_json))
+
+
+def resolve_profile(agent: Agent) -> SessionProfile:
+    """
+    Return the session profile for an agent.
+
+    The base profile is `agent.profile`, else `agent.agent_type`; the
+    agent's `session_settings` from the backend are applied on top. Profiles
+    are cached by content, so a changed backend config takes effect as soon
+    as the agent config cache refreshes. An invalid profile is logged and
+    replaced by the unmodified base (or DEFAULT_PROFILE), so a bad config
+    never keeps a call from being answered.
+    """
+    base = agent.profile or agent.agent_type
+    if base not in BUILTIN_PROFILES:
+        logger.warning(f"Agent {agent.id} has unknown session profile {base!r}, using {DEFAULT_PROFILE}")
+        base = DEFAULT_PROFILE
+    try:
+        return _cached_profile(base, json.dumps(agent.session_settings or {}, sort_keys=True))
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Invalid session settings for agent {agent.id}, using profile {base}: {e}")
+        return BUILTIN_PROFILES[base]
+
+
+def profile_cache_info():
+    return _cached_profile.cache_info()
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List
+
+from livekit.agents import AgentSession
+
+from agent_config.history_spool import HistorySpool
+
+logger = logging.getLogger("transcript-recorder")
+
+
+def _transcript_dir() -> str:
+    return os.path.join(os.getenv("HISTORY_SPOOL_DIR", ".history_spool"), "transcripts")
+
+
+class TranscriptRecorder:
+    """
+    Captures the conversation while the call is running.
+
+    Each `conversation_item_added` / `function_tools_executed` event is
+    serialized once, when it happens, into a small in-memory buffer. The
+    buffer is appended to a per-job JSONL file every TRANSCRIPT_FLUSH_INTERVAL
+    seconds (default 5) or as soon as it holds TRANSCRIPT_BUFFER_SIZE records
+    (default 50), so memory stays bounded on long calls and a crashed worker
+    still leaves the transcript on disk. The first line of the file holds the
+    history metadata needed to upload it.
+    """
+
+    def __init__(
+        self,
+        session: AgentSession,
+        job_id: str,
+        meta: Dict[str, Any],
+        buffer_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ) -> None:
+        self._session = session
+        self.job_id = job_id
+        self.meta = meta
+        self.buffer_size = buffer_size or int(os.getenv("TRANSCRIPT_BUFFER_SIZE", "50"))
+        self.flush_interval = flush_interval or float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL", "5"))
+        self.path = os.path.join(_transcript_dir(), f"{job_id}.jsonl")
+
+        self._buffer: List[str] = []
+        self._count = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._pending_flush: Optional[asyncio.Task] = None
+
+    @property
+    def count(self) -> int:
+        """Number of conversation records captured so far."""
+        return self._count
+
+    def start(self) -> None:
+        """Subscribe to session events; call before `session.start` so the greeting is captured."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            f.write(json.dumps({"meta": self.meta}) + "\n")
+
+        self._session.on("conversation_item_added", self._on_item_added)
+        self._session.on("function_tools_executed", self._on_tools_executed)
+        self._flush_task = asyncio.ensure_future(self._flush_periodically())
+
+    def _on_item_added(self, ev) -> None:
+        self._append(ev.item.model_dump())
+
+    def _on_tools_executed(self, ev) -> None:
+        self._append(ev.model_dump())
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        self._buffer.append(json.dumps(record, default=str))
+        self._count += 1
+        if len(self._buffer) >= self.buffer_size and (self._pending_flush is None or self._pending_flush.done()):
+            self._pending_flush = asyncio.ensure_future(self.flush())
+
+    def _write(self, lines: List[str]) -> None:
+        with open(self.path, "a") as f:
+            if lines:
+                f.write("\n".join(lines) + "\n")
+        # keep the mtime fresh during silences so the file is not mistaken for an orphan
+        os.utime(self.path)
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            lines, self._buffer = self._buffer, []
+            await asyncio.to_thread(self._write, lines)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Transcript flush for {self.job_id} failed: {e}")
+
+    async def finalize(self) -> List[Dict[str, Any]]:
+        """
+        Stop recording and return the conversation payload.
+
+        The on-disk chunks are read back once and the file is removed; the
+        caller is expected to hand the payload to the history spool.
+        """
+        self._session.off("conversation_item_added", self._on_item_added)
+        self._session.off("function_tools_executed", self._on_tools_executed)
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+
+        await self.flush()
+        conversation = await asyncio.to_thread(_read_records, self.path)
+        return conversation
+
+    def discard(self) -> None:
+        """Remove the on-disk transcript once its history record is safely spooled."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _read_records(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        next(f, None)  # metadata line
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _salvage(max_age: float, active: set) -> List[Dict[str, Any]]:
+    directory = _transcript_dir()
+    if not os.path.isdir(directory):
+        return []
+
+    salvaged = []
+    now = time.time()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        job_id = name[: -len(".jsonl")]
+        if not name.endswith(".jsonl") or job_id in active:
+            continue
+        try:
+            mtime = os.path.getmtime(path)
+            if now - mtime < max_age:
+                continue
+            # claim the file first so two jobs starting together cannot both salvage it
+            claimed = path + ".salvaging"
+            os.rename(path, claimed)
+            path = claimed
+        except FileNotFoundError:
+            continue  # another job claimed it
+        except OSError as e:
+            logger.warning(f"Skipping unreadable transcript {path}: {e}")
+            continue
+        try:
+            with open(path) as f:
+                meta = json.loads(next(f)).get("meta", {})
+            conversation = _read_records(path)
+        except (OSError, ValueError, StopIteration) as e:
+            logger.warning(f"Skipping unreadable transcript {path}: {e}")
+            continue
+
+        started_at = meta.pop("started_at", mtime)
+        record = {**meta, "duration": int(max(mtime - started_at, 0)), "summary": None, "conversation": conversation}
+        salvaged.append({"job_id": job_id, "path": path, "record": record})
+    return salvaged
+
+
+async def salvage_orphaned_transcripts(spool: HistorySpool, active_job_ids: Optional[set] = None) -> int:
+    """
+    Turn transcripts left behind by crashed jobs into spooled history records.
+
+    A transcript is considered orphaned once it has not been touched for
+    TRANSCRIPT_ORPHAN_AGE seconds (default 600). The job id is reused as the
+    idempotency key, so a record that did get uploaded is not stored twice.
+
+    Returns:
+        int: Number of transcripts recovered.
+    """
+    max_age = float(os.getenv("TRANSCRIPT_ORPHAN_AGE", "600"))
+    orphans = await asyncio.to_thread(_salvage, max_age, active_job_ids or set())
+    for orphan in orphans:
+        await spool.enqueue(orphan["record"], idempotency_key=orphan["job_id"])
+        try:
+            await asyncio.to_thread(os.remove, orphan["path"])
+        except FileNotFoundError:
+            pass
+        logger.info(f"Recovered transcript of crashed job {orphan['job_id']} ({len(orphan['record']['conversation'])} items)")
+    return len(orphans)
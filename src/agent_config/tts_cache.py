@@ -0,0 +1,223 @@
+import os
+import re
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Set
+
+from livekit.agents import APIConnectOptions, tts, utils
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS
+
+logger = logging.getLogger("tts-cache")
+
+_PLACEHOLDER = re.compile(r"\{[A-Za-z_][A-Za-z0-9_]*\}")
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class PhraseCache:
+    """
+    Synthesized audio for utterances the agents say over and over.
+
+    Audio is kept as raw PCM in a memory LRU bounded by TTS_CACHE_MAX_BYTES
+    (default 32 MB) and, when TTS_CACHE_DIR is set, in a disk tier that
+    survives restarts and is shared by the worker's job processes.
+
+    Only utterances of at most TTS_CACHE_MAX_CHARS characters (default 160)
+    are admitted: registered phrases and anything matching a registered
+    template ("Sorry, {time} on {date} is already booked.") right away,
+    other sentences once they have been said before, so one-off LLM
+    sentences do not push recurring ones out.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, directory: Optional[str] = None, max_chars: Optional[int] = None) -> None:
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("TTS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+        self.directory = directory if directory is not None else os.getenv("TTS_CACHE_DIR") or None
+        self.max_chars = max_chars or int(os.getenv("TTS_CACHE_MAX_CHARS", "160"))
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._phrases: Set[str] = set()
+        self._templates: List[re.Pattern] = []
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+
+    def register(self, phrase: str) -> None:
+        """Admit `phrase` on first use; `{name}` placeholders match any text."""
+        phrase = _normalize(phrase)
+        if _PLACEHOLDER.search(phrase):
+            parts = _PLACEHOLDER.split(phrase)
+            self._templates.append(re.compile("^" + ".+?".join(re.escape(part) for part in parts) + "$"))
+        else:
+            self._phrases.add(phrase)
+
+    def key(self, model: str, voice: str, sample_rate: int, text: str) -> str:
+        return hashlib.sha256(f"{model}|{voice}|{sample_rate}|{_normalize(text)}".encode()).hexdigest()
+
+    def admits(self, text: str) -> bool:
+        text = _normalize(text)
+        if not text or len(text) > self.max_chars:
+            return False
+        if text in self._phrases or any(template.match(text) for template in self._templates):
+            return True
+        if text in self._seen:
+            return True
+        self._seen[text] = None
+        if len(self._seen) > 4096:
+            self._seen.popitem(last=False)
+        return False
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pcm")
+
+    def get(self, key: str) -> Optional[bytes]:
+        audio = self._entries.get(key)
+        if audio is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        elif self.directory:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    audio = f.read()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not read cached phrase {key}: {e}")
+            if audio is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._store(key, audio)
+        if audio is None:
+            self.misses += 1
+            return None
+        self.bytes_saved += len(audio)
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        self._store(key, audio)
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp = f"{self._disk_path(key)}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp, self._disk_path(key))
+            except OSError as e:
+                logger.warning(f"Could not write cached phrase {key}: {e}")
+
+    def _store(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = audio
+        self._size += len(audio)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "memory_bytes": self._size,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "bytes_saved": self.bytes_saved,
+            "evictions": self.evictions,
+        }
+
+
+_phrase_cache: Optional[PhraseCache] = None
+
+
+def get_phrase_cache() -> PhraseCache:
+    """Return the process-wide phrase cache, shared by every session."""
+    global _phrase_cache
+    if _phrase_cache is None:
+        _phrase_cache = PhraseCache()
+    return _phrase_cache
+
+
+def register_phrase(phrase: str) -> None:
+    """Mark an utterance (or `{placeholder}` template) as worth caching from its first use."""
+    get_phrase_cache().register(phrase)
+
+
+class CachingTTS(tts.TTS):
+    """
+    Wraps a TTS so repeated sentences are served from the PhraseCache.
+
+    It is a non-streaming TTS: the session splits the reply into sentences
+    (livekit's StreamAdapter) and each sentence is one `synthesize` call,
+    which makes the sentence the cache unit. Misses go to the wrapped TTS
+    and are played as they arrive.
+    """
+
+    def __init__(self, wrapped: tts.TTS, voice: str = "", cache: Optional[PhraseCache] = None) -> None:
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False),
+            sample_rate=wrapped.sample_rate,
+            num_channels=wrapped.num_channels,
+        )
+        self.wrapped = wrapped
+        self.voice = voice
+        self.cache = cache or get_phrase_cache()
+
+    @property
+    def model(self) -> str:
+        return self.wrapped.model
+
+    @property
+    def provider(self) -> str:
+        return self.wrapped.provider
+
+    def synthesize(self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS) -> tts.ChunkedStream:
+        return _CachedChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+    def prewarm(self) -> None:
+        self.wrapped.prewarm()
+
+    async def aclose(self) -> None:
+        await self.wrapped.aclose()
+
+
+class _CachedChunkedStream(tts.ChunkedStream):
+    def __init__(self, *, tts: CachingTTS, input_text: str, conn_options: APIConnectOptions) -> None:
+        super().__init__(tts=tts, input_text=input_text, conn_options=conn_options)
+        self._caching_tts = tts
+
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        engine = self._caching_tts
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=engine.sample_rate,
+            num_channels=engine.num_channels,
+            mime_type="audio/pcm",
+        )
+        key = engine.cache.key(engine.model, engine.voice, engine.sample_rate, self.input_text)
+        audio = engine.cache.get(key)
+        if audio is not None:
+            output_emitter.push(audio)
+            output_emitter.flush()
+            return
+
+        buffer = bytearray() if engine.cache.admits(self.input_text) else None
+        async with engine.wrapped.synthesize(self.input_text, conn_options=self._conn_options) as stream:
+            async for ev in stream:
+                data = ev.frame.data.tobytes()
+                output_emitter.push(data)
+                if buffer is not None:
+                    buffer += data
+        output_emitter.flush()
+        if buffer:
+            engine.cache.put(key, bytes(buffer))
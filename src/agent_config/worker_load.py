@@ -0,0 +1,243 @@
+import os
+import time
+import asyncio
+import logging
+import tempfile
+from collections import deque
+from typing import Optional, Dict, Any, Callable, Deque, Tuple
+
+import psutil
+from livekit.agents.utils.hw import get_cpu_monitor
+from livekit.agents.worker import ServerEnvOption
+from prometheus_client import Gauge
+
+logger = logging.getLogger("worker-load")
+
+# Served by the worker's /metrics endpoint; autoscalers read these next to livekit's own load gauge
+_LOAD = Gauge("voice_agent_worker_load", "Load reported to LiveKit for job admission (0-1)")
+_ACTIVE_SESSIONS = Gauge("voice_agent_worker_active_sessions", "Sessions running on this worker")
+_CPU = Gauge("voice_agent_worker_cpu_utilization", "CPU used by the worker and its job processes, as a fraction of its cores")
+_LOOP_LAG = Gauge("voice_agent_worker_loop_lag_seconds", "Worst event-loop lag reported by a job process")
+_ACCEPTING = Gauge("voice_agent_worker_accepting_jobs", "1 while the worker is below its load threshold")
+
+
+def _report_dir(worker_pid: int) -> str:
+    return os.path.join(tempfile.gettempdir(), f"voice-agent-load-{worker_pid}")
+
+
+class LoopLagProbe:
+    """
+    Measures how late this process's event loop wakes up from a short sleep.
+
+    A loop busy with VAD, noise cancellation or a blocking call wakes up
+    late; `lag` is the worst delay over the last `window` seconds. In job
+    processes the value is also written to a small per-process report file
+    that the worker's WorkerLoad reads, since the load function runs in the
+    worker process and cannot see the jobs' loops.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        window: float = 5.0,
+        report_dir: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.interval = interval
+        self.window = window
+        self.report_dir = report_dir
+        self._clock = clock
+        self._samples: Deque[Tuple[float, float]] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def record(self, lag: float) -> None:
+        now = self._clock()
+        self._samples.append((now, lag))
+        while self._samples and self._samples[0][0] < now - self.window:
+            self._samples.popleft()
+        self.max_lag = max(self.max_lag, lag)
+
+    @property
+    def lag(self) -> float:
+        return max((lag for _, lag in self._samples), default=0.0)
+
+    async def _run(self) -> None:
+        last_report, reported = float("-inf"), 0.0
+        while True:
+            expected = self._clock() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(self._clock() - expected, 0.0))
+            # spikes are reported right away, the decay back to normal once a second
+            if self.report_dir and (self.lag > reported or self._clock() - last_report >= 1.0):
+                last_report, reported = self._clock(), self.lag
+                self._report(reported)
+
+    def _report(self, lag: float) -> None:
+        try:
+            os.makedirs(self.report_dir, exist_ok=True)
+            path = os.path.join(self.report_dir, str(os.getpid()))
+            with open(f"{path}.tmp", "w") as f:
+                f.write(f"{lag:.4f}")
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.debug(f"Could not report loop lag: {e}")
+
+
+_loop_lag_probe: Optional[LoopLagProbe] = None
+
+
+def start_loop_lag_probe() -> LoopLagProbe:
+    """Start (once per job process) the probe that feeds the worker's load function."""
+    global _loop_lag_probe
+    if _loop_lag_probe is None:
+        _loop_lag_probe = LoopLagProbe(report_dir=_report_dir(os.getppid()))
+    _loop_lag_probe.start()
+    return _loop_lag_probe
+
+
+class WorkerLoad:
+    """
+    Load function for WorkerOptions, so LiveKit stops sending jobs before call quality drops.
+
+    Three signals are sampled every time LiveKit polls the load (every 0.5s):
+    active sessions, CPU of the worker process tree (the job processes run
+    VAD, noise cancellation and turn detection) and the worst event-loop lag
+    reported by a job process. Each is divided by its limit; the load is
+    `threshold * max(ratios)`, so the worker stops accepting jobs as soon as
+    any one signal reaches its limit, and reports a proportional load below
+    that for LiveKit to spread jobs across workers.
+
+    Configuration:
+        WORKER_LOAD_THRESHOLD    load at which admission closes (default 0.75; off in dev mode)
+        MAX_CONCURRENT_SESSIONS  sessions per worker, 0 for no cap (default 0)
+        WORKER_CPU_LIMIT         CPU fraction of the available cores (default 0.8)
+        WORKER_LOOP_LAG_LIMIT    seconds of event-loop lag in any job (default 0.1)
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        max_sessions: Optional[int] = None,
+        cpu_limit: Optional[float] = None,
+        lag_limit: Optional[float] = None,
+        report_dir: Optional[str] = None,
+        cpu_count: Optional[float] = None,
+    ) -> None:
+        self.threshold = threshold if threshold is not None else float(os.getenv("WORKER_LOAD_THRESHOLD", "0.75"))
+        self.max_sessions = max_sessions if max_sessions is not None else int(os.getenv("MAX_CONCURRENT_SESSIONS", "0"))
+        self.cpu_limit = cpu_limit or float(os.getenv("WORKER_CPU_LIMIT", "0.8"))
+        self.lag_limit = lag_limit or float(os.getenv("WORKER_LOOP_LAG_LIMIT", "0.1"))
+        self.report_dir = report_dir or _report_dir(os.getpid())
+        # cgroup aware, so a container limited to 2 cores is not measured against the host's 64
+        self.cpu_count = cpu_count or get_cpu_monitor().cpu_count()
+        self._processes: Dict[int, psutil.Process] = {}
+        self._cpu_samples: Deque[float] = deque(maxlen=5)
+        self._accepting = True
+        self.last: Dict[str, Any] = {}
+
+    def options(self) -> Dict[str, Any]:
+        """WorkerOptions kwargs installing this load function."""
+        return {"load_fnc": self, "load_threshold": ServerEnvOption(dev_default=float("inf"), prod_default=self.threshold)}
+
+    def __call__(self, server: Any) -> float:
+        return self.sample(len(server.active_jobs))
+
+    def sample(self, active_sessions: int) -> float:
+        pids = self._refresh_processes()
+        cpu = self._cpu()
+        lag = self._loop_lag(pids)
+        ratios = {
+            "sessions": active_sessions / self.max_sessions if self.max_sessions > 0 else 0.0,
+            "cpu": cpu / self.cpu_limit,
+            "loop_lag": lag / self.lag_limit,
+        }
+        limiting = max(ratios, key=ratios.get)
+        load = min(self.threshold * ratios[limiting], 1.0)
+
+        accepting = load < self.threshold
+        if accepting != self._accepting:
+            self._accepting = accepting
+            if accepting:
+                logger.info(f"Worker accepting jobs again (load {load:.2f})")
+            else:
+                logger.warning(
+                    f"Worker stopped accepting jobs, {limiting} at its limit "
+                    f"(sessions={active_sessions}, cpu={cpu:.2f}, loop_lag={lag * 1000:.0f}ms)"
+                )
+
+        _LOAD.set(load)
+        _ACTIVE_SESSIONS.set(active_sessions)
+        _CPU.set(cpu)
+        _LOOP_LAG.set(lag)
+        _ACCEPTING.set(1 if accepting else 0)
+        self.last = {
+            "load": round(load, 3),
+            "active_sessions": active_sessions,
+            "cpu": round(cpu, 3),
+            "loop_lag": round(lag, 4),
+            "limiting": limiting,
+            "accepting": accepting,
+        }
+        return load
+
+    def _refresh_processes(self) -> set:
+        try:
+            me = psutil.Process()
+            current = [me, *me.children(recursive=True)]
+        except psutil.Error:
+            return set(self._processes)
+        pids = {process.pid for process in current}
+        for process in current:
+            # keep the Process objects: cpu_percent() measures since the previous call on the same object
+            self._processes.setdefault(process.pid, process)
+        for pid in set(self._processes) - pids:
+            del self._processes[pid]
+        return pids
+
+    def _cpu(self) -> float:
+        used = 0.0
+        for process in list(self._processes.values()):
+            try:
+                used += process.cpu_percent(None)
+            except psutil.Error:
+                continue
+        self._cpu_samples.append(used / 100 / self.cpu_count)
+        return sum(self._cpu_samples) / len(self._cpu_samples)
+
+    def _loop_lag(self, pids: set) -> float:
+        worst = 0.0
+        try:
+            names = os.listdir(self.report_dir)
+        except FileNotFoundError:
+            return worst
+        for name in names:
+            path = os.path.join(self.report_dir, name)
+            if not name.isdigit():
+                continue
+            if int(name) not in pids:
+                # the job process is gone, its last report no longer means anything
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(path) as f:
+                    worst = max(worst, float(f.read() or 0))
+            except (OSError, ValueError):
+                continue
+        return worst
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.last)
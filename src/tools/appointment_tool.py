@@ -1,47 +1,58 @@
 import os
 import logging
-import dateparser
-from datetime import datetime, timedelta
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from livekit.agents.llm import function_tool
+from typing import Optional
+from datetime import datetime, time as dt_time, timedelta
+from tools.guarded_tool import guarded_tool
 from dotenv import load_dotenv
 from livekit.agents import RunContext
 from livekit.api import LiveKitAPI
 from livekit.protocol.sip import TransferSIPParticipantRequest
 from livekit import rtc
 from tools.function_context import FunctionContext, get_function_context, log_context
+from tools.calendar_backend import CalendarBackend, CalendarRequestCancelled, get_calendar_backend, prewarm_calendar
+from tools.availability import get_busy_index
+from tools.date_resolution import resolve_datetime, resolve_date_range, prewarm_date_parser
+from tools.prefetch import record_lookup
+from agent_config.tts_cache import register_phrase
 
 load_dotenv(dotenv_path=".env.local")
 
 logger = logging.getLogger("appointment-tools")
 
+# tool answers the LLM tends to read back verbatim; cache their audio from the first use
+for _phrase in (
+    "Yes, {time} on {date} is available.",
+    "Sorry, {time} on {date} is already booked.",
+    "Calendar service is currently unavailable. Please try again later.",
+):
+    register_phrase(_phrase)
+
+
+def prewarm() -> Optional[CalendarBackend]:
+    """
+    Prewarm hook of the appointments tool provider (see tools.registry).
+
+    Builds the calendar backend and, only when a calendar is configured,
+    imports dateparser: a worker without calendar credentials loads neither.
+    """
+    backend = prewarm_calendar()
+    if backend is not None:
+        prewarm_date_parser()
+    return backend
+
 class AppointmentTools:
-    def __init__(self):
-        self._calendar_id = os.getenv("GOOGLE_CALENDAR_ID", "primary")
-        self._service = self._get_calendar_service()
-        self.api = LiveKitAPI()
-
-    def _get_calendar_service(self):
-        """Authenticates and returns the Google Calendar service object."""
-        creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-        if not creds_path or not os.path.exists(creds_path):
-            logger.warning("GOOGLE_APPLICATION_CREDENTIALS not set or file not found. Calendar integration disabled.")
-            return None
-        logger.info(f"credentials path: {creds_path}")
-        logger.info(f"calendar id: {self._calendar_id}")
-        
-        try:
-            scopes = ['https://www.googleapis.com/auth/calendar']
-            creds = service_account.Credentials.from_service_account_file(creds_path, scopes=scopes)
-            return build('calendar', 'v3', credentials=creds)
-        except Exception as e:
-            logger.error(f"Failed to initialize Google Calendar service: {e}")
-            return None
-
-    @function_tool
-    async def check_availability(self, date: str, time: str) -> str:
+    def __init__(self, backend: Optional[CalendarBackend] = None):
+        # Calendar services and credentials are shared per process; see get_calendar_backend
+        self._service = backend if backend is not None else get_calendar_backend()
+
+    @guarded_tool(
+        dependency="calendar",
+        filler="One moment while I check the calendar.",
+        timeout_message="The calendar is taking too long to respond. Please try again in a moment.",
+        error_message="An error occurred while checking availability.",
+        unavailable_message="Calendar service is currently unavailable. Please try again later.",
+    )
+    async def check_availability(self, ctx: RunContext, date: str, time: str) -> str:
         """
         Check if a specific date and time is available for an appointment.
         args:
@@ -52,30 +63,35 @@ class AppointmentTools:
             return "Calendar service is currently unavailable. Please try again later."
 
         try:
-            start_dt = dateparser.parse(f"{date} {time}")
+            start_dt = resolve_datetime(date, time)
             if not start_dt:
                 return f"Could not understand the date or time: {date} {time}"
             
             end_dt = start_dt + timedelta(minutes=30)
             
-            events_result = self._service.events().list(
-                calendarId=self._calendar_id,
-                timeMin=start_dt.isoformat() + 'Z',
-                timeMax=end_dt.isoformat() + 'Z',
-                singleEvents=True
-            ).execute()
+            # Answered from the cached free/busy index; one query per day window at most
+            index = get_busy_index(self._service)
+            record_lookup(ctx, "availability", index.is_warm(start_dt, end_dt))
+            is_free = await index.is_free(
+                start_dt, end_dt, speech_handle=ctx.speech_handle
+            )
             
-            events = events_result.get('items', [])
-            if not events:
+            if is_free:
                 return f"Yes, {time} on {date} is available."
             else:
                 return f"Sorry, {time} on {date} is already booked."
                 
-        except Exception as e:
-            logger.error(f"Error checking availability: {e}")
-            return "An error occurred while checking availability."
+        except CalendarRequestCancelled:
+            logger.info("Availability check abandoned after user interruption")
+            return "Availability check cancelled."
 
-    @function_tool
+    @guarded_tool(
+        dependency="calendar",
+        filler="One moment while I book that for you.",
+        timeout_message="The calendar did not confirm the booking in time. Please check again before rebooking.",
+        error_message="An error occurred while booking the appointment.",
+        unavailable_message="Calendar service is currently unavailable. Please try again later.",
+    )
     async def book_appointment(self, ctx: RunContext,name: str, date: str, time: str) -> str:
         """
         Book an appointment for a patient.
@@ -89,7 +105,7 @@ class AppointmentTools:
             return "Calendar service is currently unavailable. Please try again later."
 
         try:
-            start_dt = dateparser.parse(f"{date} {time}")
+            start_dt = resolve_datetime(date, time)
             if not start_dt:
                 return f"Could not understand the date or time: {date} {time}"
             
@@ -100,17 +116,69 @@ class AppointmentTools:
                 'description': f'Booked via Voice Assistant. Phone: {get_function_context(ctx).phone_number}',
                 'start': {
                     'dateTime': start_dt.isoformat(),
-                    'timeZone': 'UTC', # Adjust as needed
+                    'timeZone': start_dt.tzinfo.key,
                 },
                 'end': {
                     'dateTime': end_dt.isoformat(),
-                    'timeZone': 'UTC', # Adjust as needed
+                    'timeZone': end_dt.tzinfo.key,
                 },
             }
 
-            event = self._service.events().insert(calendarId=self._calendar_id, body=event).execute()
+            try:
+                event = await self._service.insert_event(event, speech_handle=ctx.speech_handle)
+            finally:
+                # the slot may have been written even if we stopped waiting for the reply
+                get_busy_index(self._service).invalidate(start_dt, end_dt)
             return f"Appointment confirmed for {name} on {date} at {time}. Link: {event.get('htmlLink')}"
 
-        except Exception as e:
-            logger.error(f"Error booking appointment: {e}")
-            return "An error occurred while booking the appointment."
\ No newline at end of file
+        except CalendarRequestCancelled:
+            logger.info("Booking abandoned after user interruption")
+            return "Booking was interrupted; it may or may not have been saved."
+
+    @guarded_tool(
+        dependency="calendar",
+        filler="One moment while I look for open times.",
+        timeout_message="The calendar is taking too long to respond. Please try again in a moment.",
+        error_message="An error occurred while searching for available times.",
+        unavailable_message="Calendar service is currently unavailable. Please try again later.",
+    )
+    async def find_available_slots(self, ctx: RunContext, date_range: str, duration: int = 30) -> str:
+        """
+        Find the next open appointment slots in a date range, in a single lookup.
+        Use this instead of checking times one by one.
+        args:
+            date_range: The day or range to search (e.g., "tomorrow", "next week", "Monday to Wednesday")
+            duration: Length of the appointment in minutes.
+        """
+        if not self._service:
+            return "Calendar service is currently unavailable. Please try again later."
+
+        try:
+            window = resolve_date_range(date_range)
+            if not window:
+                return f"Could not understand the date range: {date_range}"
+            start_dt, end_dt = window
+
+            now = datetime.now(start_dt.tzinfo)
+            if start_dt < now:
+                start_dt = now
+
+            index = get_busy_index(self._service)
+            record_lookup(ctx, "availability", index.is_warm(start_dt, end_dt))
+            slots = await index.find_free_slots(
+                start_dt,
+                end_dt,
+                duration=timedelta(minutes=duration),
+                limit=int(os.getenv("AVAILABILITY_MAX_SLOTS", "5")),
+                day_start=dt_time(int(os.getenv("APPOINTMENT_DAY_START", "9"))),
+                day_end=dt_time(int(os.getenv("APPOINTMENT_DAY_END", "17"))),
+                speech_handle=ctx.speech_handle,
+            )
+            if not slots:
+                return f"There are no open {duration}-minute slots for {date_range}."
+            return "Available times: " + ", ".join(slot.strftime("%A, %B %d at %I:%M %p") for slot in slots)
+
+        except CalendarRequestCancelled:
+            logger.info("Slot search abandoned after user interruption")
+            return "Slot search cancelled."
+
@@ -0,0 +1,184 @@
+import os
+import time
+import asyncio
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from livekit.agents.voice import SpeechHandle
+
+from tools.calendar_backend import CalendarBackend
+
+logger = logging.getLogger("appointment-tools")
+
+Interval = Tuple[datetime, datetime]
+
+
+def _parse_rfc3339(value: str) -> datetime:
+    # datetime.fromisoformat only accepts a trailing "Z" from Python 3.11
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _merge(intervals: List[Interval]) -> List[Interval]:
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+@dataclass
+class _Day:
+    fetched_at: float
+    busy: List[Interval] = field(default_factory=list)
+    starts: List[datetime] = field(default_factory=list)
+
+
+class BusyIndex:
+    """
+    Free/busy intervals for one calendar, cached per UTC day.
+
+    Missing or expired days are fetched with a single `freebusy.query`
+    covering all of them; slot queries are then answered locally with a
+    bisect over merged busy intervals. Days expire after AVAILABILITY_TTL
+    seconds (default 60) so bookings made elsewhere are picked up, and are
+    invalidated immediately when this worker books an appointment.
+    """
+
+    def __init__(self, backend: CalendarBackend, ttl: Optional[float] = None) -> None:
+        self._backend = backend
+        self.ttl = ttl if ttl is not None else float(os.getenv("AVAILABILITY_TTL", "60"))
+        self._days: Dict[date, _Day] = {}
+        self._lock = asyncio.Lock()
+        self.queries = 0
+        self.local_answers = 0
+
+    def _fresh(self, day: date) -> bool:
+        entry = self._days.get(day)
+        return entry is not None and time.monotonic() - entry.fetched_at < self.ttl
+
+    @staticmethod
+    def _span(start: datetime, end: datetime) -> List[date]:
+        start, end = _as_utc(start), _as_utc(end)
+        days = [start.date() + timedelta(days=i) for i in range((end - start).days + 2)]
+        return [d for d in days if datetime.combine(d, dt_time.min, timezone.utc) < end]
+
+    def is_warm(self, start: datetime, end: datetime) -> bool:
+        """True if [start, end) can be answered locally, without a freebusy query."""
+        return all(self._fresh(d) for d in self._span(start, end))
+
+    async def ensure(self, start: datetime, end: datetime, speech_handle: Optional[SpeechHandle] = None) -> None:
+        """Make sure every UTC day touched by [start, end) is loaded and fresh."""
+        days = self._span(start, end)
+        if all(self._fresh(d) for d in days):
+            self.local_answers += 1
+            return
+
+        async with self._lock:
+            missing = [d for d in days if not self._fresh(d)]
+            if not missing:
+                self.local_answers += 1
+                return
+            await self._fetch(missing[0], missing[-1] + timedelta(days=1), speech_handle)
+
+    async def _fetch(self, first_day: date, end_day: date, speech_handle: Optional[SpeechHandle]) -> None:
+        window_start = datetime.combine(first_day, dt_time.min, timezone.utc)
+        window_end = datetime.combine(end_day, dt_time.min, timezone.utc)
+        self.queries += 1
+        periods = await self._backend.freebusy(
+            window_start.isoformat(), window_end.isoformat(), speech_handle=speech_handle
+        )
+        busy = _merge([(_parse_rfc3339(p["start"]), _parse_rfc3339(p["end"])) for p in periods])
+
+        now = time.monotonic()
+        day = first_day
+        while day < end_day:
+            day_start = datetime.combine(day, dt_time.min, timezone.utc)
+            day_end = day_start + timedelta(days=1)
+            clipped = [
+                (max(s, day_start), min(e, day_end)) for s, e in busy if s < day_end and e > day_start
+            ]
+            self._days[day] = _Day(fetched_at=now, busy=clipped, starts=[s for s, _ in clipped])
+            day += timedelta(days=1)
+
+    def _overlaps(self, start: datetime, end: datetime) -> bool:
+        day = start.date()
+        while datetime.combine(day, dt_time.min, timezone.utc) < end:
+            entry = self._days.get(day)
+            if entry is not None:
+                i = bisect_right(entry.starts, start) - 1
+                if i >= 0 and entry.busy[i][1] > start:
+                    return True
+                if i + 1 < len(entry.busy) and entry.busy[i + 1][0] < end:
+                    return True
+            day += timedelta(days=1)
+        return False
+
+    async def is_free(self, start: datetime, end: datetime, speech_handle: Optional[SpeechHandle] = None) -> bool:
+        await self.ensure(start, end, speech_handle)
+        return not self._overlaps(_as_utc(start), _as_utc(end))
+
+    async def find_free_slots(
+        self,
+        start: datetime,
+        end: datetime,
+        duration: timedelta,
+        limit: int,
+        day_start: dt_time,
+        day_end: dt_time,
+        step: timedelta = timedelta(minutes=30),
+        speech_handle: Optional[SpeechHandle] = None,
+    ) -> List[datetime]:
+        """
+        Return up to `limit` open slot start times in [start, end) that fall
+        within working hours `day_start`-`day_end` (in the timezone of `start`).
+        """
+        tz = start.tzinfo or timezone.utc
+        await self.ensure(start, end, speech_handle)
+
+        slots: List[datetime] = []
+        day = start.date()
+        while len(slots) < limit and datetime.combine(day, dt_time.min, tz) < end:
+            slot = datetime.combine(day, day_start, tz)
+            close = datetime.combine(day, day_end, tz)
+            while len(slots) < limit and slot + duration <= close:
+                if slot >= start and slot + duration <= end and not self._overlaps(
+                    _as_utc(slot), _as_utc(slot + duration)
+                ):
+                    slots.append(slot)
+                slot += step
+            day += timedelta(days=1)
+        return slots
+
+    def invalidate(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> None:
+        """Drop cached days touched by [start, end), or everything when no range is given."""
+        if start is None or end is None:
+            self._days.clear()
+            return
+        day = _as_utc(start).date()
+        last = _as_utc(end).date()
+        while day <= last:
+            self._days.pop(day, None)
+            day += timedelta(days=1)
+
+
+_indexes: Dict[str, BusyIndex] = {}
+
+
+def get_busy_index(backend: CalendarBackend) -> BusyIndex:
+    """Return the process-wide BusyIndex for a calendar backend."""
+    index = _indexes.get(backend.calendar_id)
+    if index is None or index._backend is not backend:
+        index = BusyIndex(backend)
+        _indexes[backend.calendar_id] = index
+    return index
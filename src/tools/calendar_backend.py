@@ -0,0 +1,207 @@
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from livekit.agents.voice import SpeechHandle
+
+# The Google client libraries are imported on first use: job processes of
+# agents without a calendar never pay for them.
+
+logger = logging.getLogger("appointment-tools")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Bounded pool shared by every calendar in the process (CALENDAR_MAX_WORKERS, default 4)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("CALENDAR_MAX_WORKERS", "4")),
+                thread_name_prefix="calendar",
+            )
+    return _executor
+
+
+class CalendarRequestCancelled(Exception):
+    """The user interrupted the agent while a calendar request was pending."""
+
+
+class CalendarBackend:
+    """
+    Async wrapper around a googleapiclient Calendar service.
+
+    The client library is synchronous, so every request runs on a bounded
+    thread pool instead of the event loop that streams session audio. Each
+    worker thread gets its own authorized httplib2 connection because
+    httplib2 is not thread-safe. Requests are bounded by CALENDAR_TIMEOUT
+    seconds (default 8) and are abandoned as soon as the user interrupts the
+    speech that triggered them. A request that already reached Google keeps
+    running in its thread; only its result is discarded.
+    """
+
+    def __init__(self, service, credentials, calendar_id: str, timeout: Optional[float] = None) -> None:
+        self._service = service
+        self._credentials = credentials
+        self.calendar_id = calendar_id
+        self.timeout = timeout if timeout is not None else float(os.getenv("CALENDAR_TIMEOUT", "8"))
+        self._local = threading.local()
+
+    def _thread_http(self) -> "google_auth_httplib2.AuthorizedHttp":
+        http = getattr(self._local, "http", None)
+        if http is None:
+            import httplib2
+            import google_auth_httplib2
+
+            http = google_auth_httplib2.AuthorizedHttp(
+                self._credentials, http=httplib2.Http(timeout=self.timeout)
+            )
+            self._local.http = http
+        return http
+
+    async def _run(self, fn: Callable[[], Any], speech_handle: Optional[SpeechHandle] = None) -> Any:
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(_get_executor(), fn)
+        try:
+            if speech_handle is None:
+                return await asyncio.wait_for(fut, self.timeout)
+
+            await asyncio.wait_for(speech_handle.wait_if_not_interrupted([fut]), self.timeout)
+            if not fut.done():
+                raise CalendarRequestCancelled()
+            return fut.result()
+        finally:
+            # drops the call if it is still queued behind other requests
+            if not fut.done():
+                fut.cancel()
+
+    async def list_events(
+        self, time_min: str, time_max: str, speech_handle: Optional[SpeechHandle] = None
+    ) -> List[Dict[str, Any]]:
+        request = self._service.events().list(
+            calendarId=self.calendar_id,
+            timeMin=time_min,
+            timeMax=time_max,
+            singleEvents=True,
+        )
+        result = await self._run(lambda: request.execute(http=self._thread_http()), speech_handle)
+        return result.get("items", [])
+
+    async def insert_event(
+        self, body: Dict[str, Any], speech_handle: Optional[SpeechHandle] = None
+    ) -> Dict[str, Any]:
+        request = self._service.events().insert(calendarId=self.calendar_id, body=body)
+        return await self._run(lambda: request.execute(http=self._thread_http()), speech_handle)
+
+    async def freebusy(
+        self, time_min: str, time_max: str, speech_handle: Optional[SpeechHandle] = None
+    ) -> List[Dict[str, str]]:
+        """Return the busy periods ({"start", "end"} RFC3339 strings) of this calendar in one query."""
+        request = self._service.freebusy().query(
+            body={
+                "timeMin": time_min,
+                "timeMax": time_max,
+                "items": [{"id": self.calendar_id}],
+            }
+        )
+        result = await self._run(lambda: request.execute(http=self._thread_http()), speech_handle)
+        return result.get("calendars", {}).get(self.calendar_id, {}).get("busy", [])
+
+
+CALENDAR_SCOPES = ['https://www.googleapis.com/auth/calendar']
+
+
+def build(*args: Any, **kwargs: Any) -> Any:
+    """googleapiclient.discovery.build, imported on first use."""
+    from googleapiclient.discovery import build as discovery_build
+
+    return discovery_build(*args, **kwargs)
+
+_credentials = None
+_backends: Dict[str, CalendarBackend] = {}
+_registry_lock = threading.Lock()
+
+
+def _load_credentials():
+    """
+    Load the service-account credentials once per process.
+
+    Non-blocking refresh makes google-auth renew the token on a background
+    thread once it is close to expiry, so requests never wait on OAuth.
+    """
+    global _credentials
+    if _credentials is not None:
+        return _credentials
+
+    creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    if not creds_path or not os.path.exists(creds_path):
+        logger.warning("GOOGLE_APPLICATION_CREDENTIALS not set or file not found. Calendar integration disabled.")
+        return None
+    logger.info(f"credentials path: {creds_path}")
+
+    from google.oauth2 import service_account
+
+    creds = service_account.Credentials.from_service_account_file(creds_path, scopes=CALENDAR_SCOPES)
+    creds.with_non_blocking_refresh()
+    _credentials = creds
+    return _credentials
+
+
+def get_calendar_backend(calendar_id: Optional[str] = None) -> Optional[CalendarBackend]:
+    """
+    Return the process-wide CalendarBackend for a calendar id, building it on first use.
+
+    The service is built from the discovery document bundled with
+    googleapiclient, so no discovery request is made.
+
+    Args:
+        calendar_id: Calendar to use; defaults to GOOGLE_CALENDAR_ID or "primary".
+
+    Returns:
+        CalendarBackend, or None when calendar credentials are not configured.
+    """
+    calendar_id = calendar_id or os.getenv("GOOGLE_CALENDAR_ID", "primary")
+    backend = _backends.get(calendar_id)
+    if backend is not None:
+        return backend
+
+    with _registry_lock:
+        backend = _backends.get(calendar_id)
+        if backend is not None:
+            return backend
+
+        try:
+            creds = _load_credentials()
+            if creds is None:
+                return None
+            logger.info(f"calendar id: {calendar_id}")
+            service = build('calendar', 'v3', credentials=creds, static_discovery=True, cache_discovery=False)
+        except Exception as e:
+            logger.error(f"Failed to initialize Google Calendar service: {e}")
+            return None
+
+        backend = CalendarBackend(service, creds, calendar_id)
+        _backends[calendar_id] = backend
+        return backend
+
+
+def prewarm_calendar() -> Optional[CalendarBackend]:
+    """Build the default calendar backend and fetch a first access token. Called from `prewarm`."""
+    backend = get_calendar_backend()
+    if backend is None:
+        return None
+
+    try:
+        import httplib2
+        import google_auth_httplib2
+
+        backend._credentials.refresh(google_auth_httplib2.Request(httplib2.Http(timeout=backend.timeout)))
+    except Exception as e:
+        # not fatal: the token is fetched on the first request instead
+        logger.warning(f"Could not prefetch Google access token: {e}")
+    return backend
@@ -0,0 +1,240 @@
+import os
+import re
+import logging
+from datetime import date, datetime, time as dt_time, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger("appointment-tools")
+
+# Only English is spoken to the appointment tools; skipping language
+# detection is most of dateparser's per-call cost.
+_LANGUAGES = ["en"]
+
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+_DAY_RE = re.compile(
+    r"^(?:(?P<rel>today|tonight|tomorrow|day after tomorrow)"
+    r"|(?:(?P<mod>this|next|coming) )?(?P<weekday>" + "|".join(_WEEKDAYS) + r")"
+    r"|(?P<dom>\d{1,2})(?:st|nd|rd|th))$"
+)
+_TIME_RE = re.compile(
+    r"^(?:(?P<word>noon|midday|midnight)"
+    r"|(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))? ?(?P<meridiem>am|pm|o'?clock)?)$"
+)
+# relative-to-now phrases depend on the current time, not just the date
+_NOW_RELATIVE_RE = re.compile(r"\b(now|in \d+|in an?|hours?|minutes?|mins?|ago|later)\b")
+
+
+@lru_cache(maxsize=None)
+def get_timezone() -> ZoneInfo:
+    """Timezone appointments are spoken and booked in (APPOINTMENT_TIMEZONE, default UTC)."""
+    return ZoneInfo(os.getenv("APPOINTMENT_TIMEZONE", "UTC"))
+
+
+def normalize_phrase(phrase: str) -> str:
+    """
+    Lower-case and strip the filler that varies between spoken forms of the same time.
+
+    Ordinal suffixes are kept: "the 20th" is a day of the month, and without
+    the suffix it would read as a bare clock hour.
+    """
+    text = phrase.lower().strip()
+    text = text.replace("a.m.", "am").replace("p.m.", "pm")
+    text = re.sub(r"[,.]", " ", text)
+    text = re.sub(r"\b(the|on)\b", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _resolve_day(phrase: str, today: date) -> Optional[date]:
+    match = _DAY_RE.match(phrase)
+    if not match:
+        return None
+    rel = match.group("rel")
+    if rel in ("today", "tonight"):
+        return today
+    if rel == "tomorrow":
+        return today + timedelta(days=1)
+    if rel == "day after tomorrow":
+        return today + timedelta(days=2)
+    if match.group("dom"):
+        return _next_day_of_month(int(match.group("dom")), today)
+
+    ahead = (_WEEKDAYS.index(match.group("weekday")) - today.weekday()) % 7
+    if ahead == 0 and match.group("mod") != "this":
+        # "Friday" said on a Friday means next week, as dateparser resolves it
+        ahead = 7
+    return today + timedelta(days=ahead)
+
+
+def _next_day_of_month(dom: int, today: date) -> Optional[date]:
+    """"The 5th": this month if it has not passed yet, otherwise the next month that has that day."""
+    year, month = today.year, today.month
+    if dom < today.day:
+        month += 1
+    for _ in range(12):
+        if month > 12:
+            year, month = year + 1, 1
+        try:
+            return date(year, month, dom)
+        except ValueError:
+            month += 1  # e.g. the 31st in a 30-day month
+    return None
+
+
+def _resolve_time(phrase: str, marked: bool = False, evening: bool = False) -> Optional[dt_time]:
+    """
+    Parse a clock time. A bare number ("3", "20") only counts as a time when
+    `marked` (it followed "at"); otherwise it is more likely a day of the
+    month and is left to dateparser. `evening` moves un-suffixed hours to
+    the evening ("tonight at 8").
+    """
+    match = _TIME_RE.match(phrase)
+    if not match:
+        return None
+    word = match.group("word")
+    if word:
+        return dt_time(0) if word == "midnight" else dt_time(12)
+
+    hour = int(match.group("hour"))
+    minute = int(match.group("minute") or 0)
+    meridiem = match.group("meridiem")
+    if meridiem is None and match.group("minute") is None and not marked:
+        return None
+    if meridiem == "pm" and hour < 12:
+        hour += 12
+    elif meridiem == "am" and hour == 12:
+        hour = 0
+    elif meridiem not in ("am", "pm") and evening and 1 <= hour <= 11:
+        hour += 12
+    elif meridiem not in ("am", "pm") and 1 <= hour <= 7:
+        # "at 3" on a booking line means the afternoon
+        hour += 12
+    if hour > 23 or minute > 59:
+        return None
+    return dt_time(hour, minute)
+
+
+def _fast_path(phrase: str, today: date) -> Optional[datetime]:
+    """Resolve "<day> [at] <time>", "<time> <day>", "<day>" and "<time>" without dateparser."""
+    day_part, time_part = phrase, ""
+    if " at " in phrase:
+        day_part, time_part = phrase.split(" at ", 1)
+    elif phrase.startswith("at "):
+        day_part, time_part = "", phrase[3:]
+
+    # (day text, time text, time followed "at")
+    candidates = [(day_part, time_part, True)] if time_part else []
+    words = phrase.split(" ")
+    for i in range(1, len(words)):
+        candidates.append((" ".join(words[:i]), " ".join(words[i:]), False))
+        candidates.append((" ".join(words[i:]), " ".join(words[:i]), False))
+    candidates.append((phrase, "", False))
+    candidates.append(("", phrase, False))
+
+    for day_text, time_text, marked in candidates:
+        day = _resolve_day(day_text, today) if day_text else today
+        clock = _resolve_time(time_text, marked, evening=day_text == "tonight") if time_text else dt_time(0)
+        if day is not None and clock is not None and (day_text or time_text):
+            return datetime.combine(day, clock)
+    return None
+
+
+def _dateparser_parse(phrase: str, relative_base: datetime) -> Optional[datetime]:
+    # imported here: dateparser takes ~0.5s to import and most phrases never reach it
+    import dateparser
+
+    return dateparser.parse(
+        phrase,
+        languages=_LANGUAGES,
+        settings={
+            "PREFER_DATES_FROM": "future",
+            "RELATIVE_BASE": relative_base,
+            "RETURN_AS_TIMEZONE_AWARE": False,
+        },
+    )
+
+
+@lru_cache(maxsize=2048)
+def _resolve_cached(phrase: str, today: date) -> Optional[datetime]:
+    resolved = _fast_path(phrase, today)
+    if resolved is not None:
+        return resolved
+    return _dateparser_parse(phrase, datetime.combine(today, dt_time(0)))
+
+
+def resolve_datetime(date_text: str, time_text: str = "", now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Resolve a spoken date and time into an aware datetime in the appointment timezone.
+
+    Common forms ("tomorrow at 3 pm", "next Monday 10:30am") are handled by a
+    regex fast path; anything else goes to an English-only dateparser. Results
+    are memoized on the normalized phrase and the reference date.
+
+    Args:
+        date_text: The spoken date (e.g. "Monday, January 26th", "tomorrow").
+        time_text: The spoken time (e.g. "2:00 PM"); may be empty.
+        now: Reference time; defaults to the current time in the appointment timezone.
+
+    Returns:
+        Timezone-aware datetime, or None if the phrase could not be understood.
+    """
+    tz = get_timezone()
+    now = now.astimezone(tz) if now is not None else datetime.now(tz)
+    phrase = normalize_phrase(f"{date_text} {time_text}")
+    if not phrase:
+        return None
+
+    if _NOW_RELATIVE_RE.search(phrase):
+        resolved = _dateparser_parse(phrase, now.replace(tzinfo=None))
+    else:
+        resolved = _resolve_cached(phrase, now.date())
+
+    if resolved is None:
+        return None
+    return resolved.replace(tzinfo=tz)
+
+
+def resolve_date_range(text: str, now: Optional[datetime] = None) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Turn "tomorrow", "next week" or "Monday to Wednesday" into a [start, end)
+    window of whole days in the appointment timezone.
+    """
+    phrase = normalize_phrase(text)
+    for separator in (" to ", " through ", " until ", " - "):
+        if separator in phrase:
+            first, last = phrase.split(separator, 1)
+            break
+    else:
+        first, last = phrase, None
+
+    tz = get_timezone()
+    now = now.astimezone(tz) if now is not None else datetime.now(tz)
+
+    if last is None and phrase in ("this week", "next week"):
+        monday = now.date() - timedelta(days=now.weekday())
+        start_day = monday if phrase == "this week" else monday + timedelta(days=7)
+        start = datetime.combine(start_day, dt_time(0), tz)
+        return start, start + timedelta(days=7)
+
+    start = resolve_datetime(first, now=now)
+    end = resolve_datetime(last, now=now) if last else start
+    if start is None or end is None:
+        return None
+    return (
+        datetime.combine(start.date(), dt_time(0), tz),
+        datetime.combine(end.date(), dt_time(0), tz) + timedelta(days=1),
+    )
+
+
+def prewarm_date_parser() -> None:
+    """Import dateparser and compile its English tables once so the first call in a session is not slow."""
+    import dateparser
+
+    dateparser.parse("Monday, January 26th 2:00 PM", languages=_LANGUAGES)
+    logger.debug("dateparser prewarmed")
+
+
+def cache_info():
+    return _resolve_cached.cache_info()
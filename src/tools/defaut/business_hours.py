@@ -0,0 +1,151 @@
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from agent_config.backend_client import get_backend_client
+from agent_config.config_cache import ConfigCache
+
+logger = logging.getLogger("default-tools")
+
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def _parse_iso(value: str) -> datetime:
+    # datetime.fromisoformat only accepts a trailing "Z" from Python 3.11
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+@dataclass
+class OrgSchedule:
+    """
+    Weekly opening hours of an organization, evaluated locally.
+
+    `clock_offset` is the server clock minus the local clock in seconds, so
+    "now" matches what the backend would have answered.
+    """
+    timezone: ZoneInfo
+    weekly: Dict[int, List[Tuple[dt_time, dt_time]]] = field(default_factory=dict)
+    holidays: Set[date] = field(default_factory=set)
+    clock_offset: float = 0.0
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(time.time() + self.clock_offset, self.timezone)
+
+    def localize(self, target_time: str) -> datetime:
+        """Parse an ISO time; naive values are taken as the organization's local time."""
+        at = _parse_iso(target_time)
+        if at.tzinfo is None:
+            return at.replace(tzinfo=self.timezone)
+        return at.astimezone(self.timezone)
+
+    def is_open(self, at: datetime) -> bool:
+        at = at.astimezone(self.timezone)
+        clock = at.time()
+
+        if at.date() not in self.holidays:
+            for open_at, close_at in self.weekly.get(at.weekday(), []):
+                if open_at <= close_at:
+                    if open_at <= clock < close_at:
+                        return True
+                elif clock >= open_at:
+                    # overnight hours, e.g. 22:00-02:00, evening part
+                    return True
+
+        # early-morning part of an overnight interval that started the day before
+        previous = at.date() - timedelta(days=1)
+        if previous not in self.holidays:
+            for open_at, close_at in self.weekly.get(previous.weekday(), []):
+                if open_at > close_at and clock < close_at:
+                    return True
+        return False
+
+
+def parse_schedule(data: dict, clock_offset: float = 0.0) -> OrgSchedule:
+    """
+    Build an OrgSchedule from the backend payload:
+
+        {
+            "timezone": "America/Toronto",
+            "weekly": {"monday": [{"open": "09:00", "close": "17:00"}], ...},
+            "holidays": ["2026-12-25"],
+            "current_time": "2026-10-16T10:00:00-04:00"
+        }
+    """
+    weekly: Dict[int, List[Tuple[dt_time, dt_time]]] = {}
+    for day_name, intervals in (data.get("weekly") or {}).items():
+        weekday = _WEEKDAYS.index(day_name.lower())
+        weekly[weekday] = [
+            (dt_time.fromisoformat(i["open"]), dt_time.fromisoformat(i["close"])) for i in intervals or []
+        ]
+
+    return OrgSchedule(
+        timezone=ZoneInfo(data.get("timezone") or "UTC"),
+        weekly=weekly,
+        holidays={date.fromisoformat(d) for d in data.get("holidays") or []},
+        clock_offset=clock_offset,
+    )
+
+
+async def _load_schedule(user_id: str) -> OrgSchedule:
+    """Fetch an organization's schedule and measure the server clock offset."""
+    client = get_backend_client()
+
+    sent = time.time()
+    response = await client.get("/agent/is-org-open/schedule", params={"user_id": user_id})
+    received = time.time()
+    response.raise_for_status()
+    data = response.json()
+
+    clock_offset = 0.0
+    if data.get("current_time"):
+        server_now = _parse_iso(data["current_time"])
+        if server_now.tzinfo is not None:
+            clock_offset = server_now.timestamp() - (sent + received) / 2
+
+    schedule = parse_schedule(data, clock_offset)
+    logger.info(
+        f"Loaded business hours for {user_id}: tz={schedule.timezone.key}, "
+        f"{len(schedule.holidays)} holidays, clock offset {clock_offset:.2f}s"
+    )
+    return schedule
+
+
+# Business hours change rarely; BUSINESS_HOURS_TTL (default 15 min) bounds staleness.
+schedule_cache = ConfigCache(
+    "schedule",
+    ttl=float(os.getenv("BUSINESS_HOURS_TTL", "900")),
+    stale_ttl=float(os.getenv("BUSINESS_HOURS_STALE_TTL", "3600")),
+    negative_ttl=float(os.getenv("BUSINESS_HOURS_NEGATIVE_TTL", "900")),
+)
+
+
+def schedule_enabled() -> bool:
+    """
+    Whether the backend exposes /agent/is-org-open/schedule.
+
+    Off by default (BUSINESS_HOURS_SCHEDULE=1 enables it) until the endpoint
+    ships; without it every lookup would be a 404 before the remote check.
+    """
+    return os.getenv("BUSINESS_HOURS_SCHEDULE", "0").lower() in ("1", "true", "yes")
+
+
+async def get_org_schedule(user_id: str) -> Optional[OrgSchedule]:
+    """
+    Return the cached schedule for an organization.
+
+    Returns:
+        OrgSchedule, or None if schedules are disabled or the backend does not
+        expose one for this organization.
+    """
+    if not schedule_enabled():
+        return None
+    return await schedule_cache.get(user_id, _load_schedule)
+
+
+def is_schedule_warm(user_id: str) -> bool:
+    """True if the schedule for `user_id` is cached and can be used without a backend call."""
+    return schedule_cache.is_warm(user_id)
@@ -1,11 +1,12 @@
 import logging
-import os
 import json
-import httpx
 from typing import Optional
-from livekit.agents.llm import function_tool
+from tools.guarded_tool import guarded_tool
 from livekit.agents import RunContext, get_job_context
 from tools.function_context import get_function_context
+from agent_config.backend_client import get_backend_client
+from tools.defaut.business_hours import get_org_schedule, is_schedule_warm, schedule_enabled
+from tools.prefetch import record_lookup
 from livekit import api
 from livekit.api import LiveKitAPI
 from livekit.protocol.sip import TransferSIPParticipantRequest
@@ -13,7 +14,13 @@ from livekit.protocol.sip import TransferSIPParticipantRequest
 logger = logging.getLogger("default-tools")
 
 class DefaultTools:
-    @function_tool
+    @guarded_tool(
+        dependency="backend",
+        filler="One moment while I check our hours.",
+        timeout_message="Unable to check business status right now.",
+        error_message="Unable to check business status.",
+        unavailable_message="Business status is currently unavailable.",
+    )
     async def is_org_open(self, ctx: RunContext, target_time: Optional[str] = None) -> str:
         """
         Check if the business is open currently or at a specific time.
@@ -21,21 +28,15 @@ class DefaultTools:
         
         Args:
             target_time: Optional ISO format datetime string (e.g., '2023-10-27T10:00:00'). 
-                         If not provided, checks the current time by first fetching server time.
+                         If not provided, checks the current time.
         
         Returns:
             "true" if open, "false" if closed.
         """
-        api_url = os.getenv("API_URL", "http://127.0.0.1:8000")
-        secret_key = os.getenv("API_SECRET_KEY")
+        client = get_backend_client()
         
-        if not secret_key:
+        if not client.secret_key:
             return "Business status is currently unavailable."
-
-        headers = {
-            "Authorization": f"Bearer {secret_key}",
-            "Content-Type": "application/json"
-        }
         
         # Get user_id from context (phone number)
         user_id = get_function_context(ctx).user_id
@@ -45,37 +46,50 @@ class DefaultTools:
              # Proceeding hoping backend handles it or we return error.
              # Based on previous code, user_id was required.
         
+        if user_id and schedule_enabled():
+            record_lookup(ctx, "schedule", is_schedule_warm(user_id))
         try:
-            async with httpx.AsyncClient() as client:
-                # If no time provided, fetch server time first
-                if not target_time:
-                    time_url = f"{api_url}/agent/is-org-open/time"
-                    response = await client.get(time_url, headers=headers)
-                    response.raise_for_status()
-                    target_time = response.json().get("current_time")
-                    if not target_time:
-                         return "Unable to determine current server time."
+            # Common case: evaluate the cached weekly schedule locally, no network call
+            schedule = await get_org_schedule(user_id) if user_id else None
+        except Exception as e:
+            logger.warning(f"Business hours schedule unavailable, falling back to remote check: {e}")
+            schedule = None
 
-                # Check status for the specific time
-                check_url = f"{api_url}/agent/is-org-open/check"
-                params = {
-                    "user_id": user_id,
-                    "target_time": target_time
-                }
-                
-                response = await client.get(check_url, headers=headers, params=params)
-                response.raise_for_status()
-                is_open = response.json()
-                
-                result = "open" if is_open else "closed"
-                return result
+        if schedule:
+            try:
+                at = schedule.localize(target_time) if target_time else schedule.now()
+                return "open" if schedule.is_open(at) else "closed"
+            except ValueError as e:
+                logger.warning(f"Could not evaluate {target_time!r} locally: {e}")
 
-        except Exception as e:
-            logger.error(f"Error checking business status: {e}")
-            return "Unable to check business status."
+        # Backend errors propagate so the guard can count them against the backend circuit
+        # If no time provided, fetch server time first
+        if not target_time:
+            response = await client.get("/agent/is-org-open/time")
+            response.raise_for_status()
+            target_time = response.json().get("current_time")
+            if not target_time:
+                 return "Unable to determine current server time."
+
+        # Check status for the specific time
+        params = {
+            "user_id": user_id,
+            "target_time": target_time
+        }
+        
+        response = await client.get("/agent/is-org-open/check", params=params)
+        response.raise_for_status()
+        is_open = response.json()
+        
+        result = "open" if is_open else "closed"
+        return result
              
     
-    @function_tool
+    @guarded_tool(
+        dependency="livekit",
+        filler="Please hold while I transfer your call.",
+        error_message="Could not forward the call.",
+    )
     async def call_forward(self, ctx: RunContext) -> str:
         """
         Forwards the current call to another phone number.
@@ -88,9 +102,8 @@ class DefaultTools:
         if not room_name or not participant:
             return "Could not find room or participant."
         
+        transfer_to = 'tel:+12894898478'
         async with LiveKitAPI() as livekit_api:
-            transfer_to = 'tel:+12894898478'
-
             try:
                 # Create transfer request
                 transfer_request = TransferSIPParticipantRequest(
@@ -100,23 +113,24 @@ class DefaultTools:
                     play_dialtone=False
                 )
                 logger.debug(f"Transfer request: {transfer_request}")
-          
+
                 # Transfer caller
                 await livekit_api.sip.transfer_sip_participant(transfer_request)
-                print("SIP participant transferred successfully")
-          
             except Exception as error:
-                # Check if it's a Twirp error with metadata
-                if hasattr(error, 'metadata') and error.metadata:
-                    print(f"SIP error code: {error.metadata.get('sip_status_code')}")
-                    print(f"SIP error message: {error.metadata.get('sip_status')}")
-                else:
-                    print(f"Error transferring SIP participant:")
-                    print(f"{error.status} - {error.code} - {error.message}")
+                # Twirp errors carry the SIP status of the failed transfer
+                metadata = getattr(error, "metadata", None) or {}
+                logger.error(
+                    f"SIP transfer of {participant.identity} in room {room_name} failed: "
+                    f"{metadata.get('sip_status_code', '-')} {metadata.get('sip_status') or error}"
+                )
+                # the guard counts it against the livekit breaker and answers error_message
+                raise
 
+        logger.info(f"Transferred SIP participant {participant.identity} in room {room_name}")
         return "Call forwarded successfully."
 
-    @function_tool
+    # no filler while hanging up; the timeout also covers waiting for the goodbye to play out
+    @guarded_tool(dependency="livekit", filler=None, timeout=30, error_message="Failed to hang up call.")
     async def hangup_call(self, ctx: RunContext) -> str:
         """
         Hangs up the call.
@@ -1,6 +1,6 @@
-import json
 import logging
 from dataclasses import dataclass
+from typing import Optional, Any
 from livekit import rtc
 from livekit.agents import RunContext
 
@@ -12,18 +12,13 @@ class FunctionContext:
     room_name: str
     participant: rtc.RemoteParticipant
     user_id: str
+    prefetcher: Optional[Any] = None  # tools.prefetch.SessionPrefetcher
 
 def get_function_context(ctx: RunContext) -> FunctionContext:
     return getattr(ctx.session, "function_context", FunctionContext("", "", None, ""))
 
 def log_context(ctx: RunContext):
     fn_ctx = get_function_context(ctx)
-    
-
-    data = {
-        "phone_number": fn_ctx.phone_number,
-        "room_name": fn_ctx.room_name,
-        "user_id": fn_ctx.user_id
-    }
-    
-    logger.info(f"Function Context:\n{json.dumps(data, indent=2)}")
+    # one line, and only built when debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Function context: room={fn_ctx.room_name} user_id={fn_ctx.user_id}")
@@ -0,0 +1,222 @@
+import os
+import time
+import asyncio
+import inspect
+import contextlib
+import logging
+import functools
+from typing import Optional, Dict, Any, Callable
+
+from livekit.agents import RunContext
+from livekit.agents.llm import function_tool
+from prometheus_client import Counter
+from agent_config.tts_cache import register_phrase
+
+logger = logging.getLogger("tool-guard")
+
+# Per-tool latency is already exported as voice_agent_tool_duration_seconds by
+# SessionMetrics; the guard only adds what it alone knows, the call outcome.
+_TOOL_CALLS = Counter(
+    "voice_agent_tool_calls_total",
+    "Guarded tool calls by outcome (ok, error, timeout, cancelled, short_circuit)",
+    ["tool", "outcome"],
+)
+_TOOL_FILLERS = Counter("voice_agent_tool_fillers_total", "Filler phrases spoken while a tool was running", ["tool"])
+
+
+class CircuitBreaker:
+    """
+    Process-wide failure gate for one downstream dependency.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    calls are rejected immediately for `reset_timeout` seconds. Then a
+    single probe call is let through (half-open): success closes the
+    breaker, failure opens it for another `reset_timeout`.
+
+    Configuration:
+        CIRCUIT_FAILURE_THRESHOLD  consecutive failures before opening (default 5)
+        CIRCUIT_RESET_TIMEOUT      seconds to stay open before probing (default 30)
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold or int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.reset_timeout = reset_timeout or float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """Return True if a call may go to the dependency now."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        if self.failures >= self.failure_threshold:
+            logger.info(f"Circuit {self.name} closed")
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.failures >= self.failure_threshold:
+            if self.failures == self.failure_threshold:
+                self.times_opened += 1
+            # a failed probe re-opens the breaker for a full reset_timeout
+            self.opened_at = time.monotonic()
+            logger.warning(f"Circuit {self.name} open after {self.failures} consecutive failures")
+
+    def release(self) -> None:
+        """Give back a probe slot without a verdict (the call was cancelled)."""
+        self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(dependency: str) -> CircuitBreaker:
+    """Return the process-wide breaker for `dependency`, shared by every session."""
+    breaker = _breakers.get(dependency)
+    if breaker is None:
+        breaker = _breakers[dependency] = CircuitBreaker(dependency)
+    return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: breaker.stats() for name, breaker in _breakers.items()}
+
+
+def _find_run_context(args: tuple, kwargs: dict) -> Optional[RunContext]:
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, RunContext):
+            return value
+    return None
+
+
+def _filler_source(ctx: RunContext, text: str, tool_name: str) -> Callable[[int], Any]:
+    def source(step: int) -> Any:
+        _TOOL_FILLERS.labels(tool=tool_name).inc()
+        if ctx.session.tts is not None:
+            return text
+        # realtime models have no separate TTS to speak a fixed phrase through
+        return ctx.session.generate_reply(instructions="say: " + text, allow_interruptions=True, tool_choice="none")
+
+    return source
+
+
+def guarded_tool(
+    dependency: Optional[str] = None,
+    budget: Optional[float] = None,
+    timeout: Optional[float] = None,
+    filler: Optional[str] = "One moment, I'm still checking on that.",
+    timeout_message: str = "That is taking too long to respond. Please try again in a moment.",
+    error_message: str = "Something went wrong while handling that request.",
+    unavailable_message: str = "That service is temporarily unavailable. Please try again later.",
+    **tool_kwargs,
+) -> Callable:
+    """
+    `function_tool` with a latency budget, filler speech and a circuit breaker.
+
+    The wrapped coroutine runs as usual. If it is still running after
+    `budget` seconds of silence, `filler` is spoken (through
+    `RunContext.with_filler`) so the caller does not sit in dead air; after
+    `timeout` seconds it is cancelled and `timeout_message` is returned. Exceptions and timeouts count as failures of `dependency`;
+    while its breaker is open the tool answers `unavailable_message`
+    without calling the dependency at all. Tools therefore only need to
+    handle outcomes they want to phrase specially and may let other errors
+    propagate.
+
+    Args:
+        dependency: Breaker name shared by every tool that calls the same backend.
+            None disables the breaker.
+        budget: Seconds before the filler is spoken (default TOOL_FILLER_AFTER, 2).
+        timeout: Hard limit in seconds (default TOOL_TIMEOUT, 12).
+        filler: Phrase spoken when the budget is exceeded; None to stay silent.
+        **tool_kwargs: Passed through to `function_tool` (name, description, ...).
+    """
+
+    def decorator(func: Callable) -> Any:
+        tool_name = tool_kwargs.get("name") or func.__name__
+        if filler:
+            register_phrase(filler)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            breaker = get_breaker(dependency) if dependency else None
+            if breaker is not None and not breaker.allow():
+                _TOOL_CALLS.labels(tool=tool_name, outcome="short_circuit").inc()
+                logger.warning(f"Tool {tool_name} short-circuited, {dependency} circuit is open")
+                return unavailable_message
+
+            filler_after = budget if budget is not None else float(os.getenv("TOOL_FILLER_AFTER", "2"))
+            hard_limit = timeout if timeout is not None else float(os.getenv("TOOL_TIMEOUT", "12"))
+            ctx = _find_run_context(args, kwargs)
+
+            if filler and ctx is not None:
+                # livekit speaks it once the session has been idle for `budget` seconds
+                filler_scope = ctx.with_filler(_filler_source(ctx, filler, tool_name), delay=filler_after)
+            else:
+                filler_scope = contextlib.nullcontext()
+
+            start = time.perf_counter()
+            outcome = "ok"
+            try:
+                async with filler_scope:
+                    result = await asyncio.wait_for(func(*args, **kwargs), hard_limit)
+                if breaker is not None:
+                    breaker.record_success()
+                return result
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                if breaker is not None:
+                    breaker.record_failure()
+                logger.warning(f"Tool {tool_name} timed out after {time.perf_counter() - start:.1f}s")
+                return timeout_message
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                if breaker is not None:
+                    breaker.release()
+                raise
+            except Exception as e:
+                outcome = "error"
+                if breaker is not None:
+                    breaker.record_failure()
+                logger.error(f"Tool {tool_name} failed: {e}")
+                return error_message
+            finally:
+                _TOOL_CALLS.labels(tool=tool_name, outcome=outcome).inc()
+
+        # livekit builds the tool schema from the signature and docstring of the wrapped function
+        wrapper.__signature__ = inspect.signature(func)
+        return function_tool(wrapper, **tool_kwargs)
+
+    return decorator
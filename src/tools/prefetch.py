@@ -0,0 +1,124 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, time as dt_time, timedelta
+from typing import Optional, Dict, Any, Iterable
+
+from livekit.agents import RunContext
+from prometheus_client import Counter
+
+from tools.availability import get_busy_index
+from tools.calendar_backend import get_calendar_backend
+from tools.date_resolution import get_timezone
+from tools.defaut.business_hours import get_org_schedule, schedule_enabled
+from tools.function_context import get_function_context
+
+logger = logging.getLogger("tool-prefetch")
+
+CALENDAR_TOOLS = {"check_availability", "find_available_slots", "book_appointment"}
+SCHEDULE_TOOLS = {"is_org_open"}
+
+_LOOKUPS = Counter(
+    "voice_agent_prefetch_lookups_total",
+    "Tool lookups by whether prefetched data was already warm",
+    ["kind", "result"],
+)
+
+
+class SessionPrefetcher:
+    """
+    Warms the data a session's tools are likely to need while the greeting plays.
+
+    Which prefetches run is derived from the tools `get_agentTools` returned:
+    calendar tools warm today's and tomorrow's free/busy (in the appointment
+    timezone) in the shared BusyIndex, `is_org_open` warms the org schedule
+    cache when BUSINESS_HOURS_SCHEDULE is on. Free/busy is re-warmed every
+    PREFETCH_REFRESH_INTERVAL seconds (default: the availability TTL; 0
+    disables) for as long as the session runs. Tools report each lookup
+    through `record_lookup`, which feeds the per-session hit counts and the
+    `voice_agent_prefetch_lookups_total` series.
+    """
+
+    def __init__(self, tool_names: Iterable[str], user_id: Optional[str] = None, refresh_interval: Optional[float] = None) -> None:
+        names = set(tool_names)
+        self.calendar = get_calendar_backend() if names & CALENDAR_TOOLS else None
+        self.user_id = user_id if names & SCHEDULE_TOOLS and schedule_enabled() else None
+        env_interval = os.getenv("PREFETCH_REFRESH_INTERVAL")
+        if refresh_interval is None and env_interval is not None:
+            refresh_interval = float(env_interval)
+        self.refresh_interval = refresh_interval
+
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.errors = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.calendar is not None or bool(self.user_id)
+
+    def start(self) -> None:
+        """Start prefetching in the background; returns immediately."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _warm_availability(self) -> None:
+        today = datetime.now(get_timezone()).date()
+        start = datetime.combine(today, dt_time.min, get_timezone())
+        await get_busy_index(self.calendar).ensure(start, start + timedelta(days=2))
+
+    async def _warm_schedule(self) -> None:
+        await get_org_schedule(self.user_id)
+
+    async def _warm(self, jobs: Dict[str, Any]) -> None:
+        results = await asyncio.gather(*(job() for job in jobs.values()), return_exceptions=True)
+        for kind, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                self.errors += 1
+                logger.warning(f"Prefetch of {kind} failed: {result}")
+
+    async def _run(self) -> None:
+        jobs = {}
+        if self.calendar is not None:
+            jobs["availability"] = self._warm_availability
+        if self.user_id:
+            jobs["schedule"] = self._warm_schedule
+        await self._warm(jobs)
+
+        if self.calendar is None:
+            return
+        interval = self.refresh_interval
+        if interval is None:
+            interval = get_busy_index(self.calendar).ttl
+        while interval > 0:
+            await asyncio.sleep(interval)
+            await self._warm({"availability": self._warm_availability})
+
+    def record(self, kind: str, warm: bool) -> None:
+        counts = self.hits if warm else self.misses
+        counts[kind] = counts.get(kind, 0) + 1
+        _LOOKUPS.labels(kind=kind, result="hit" if warm else "miss").inc()
+
+    def stats(self) -> Dict[str, Any]:
+        kinds = set(self.hits) | set(self.misses)
+        lookups = sum(self.hits.values()) + sum(self.misses.values())
+        return {
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "hit_rate": {kind: round(self.hits.get(kind, 0) / (self.hits.get(kind, 0) + self.misses.get(kind, 0)), 3) for kind in kinds},
+            "overall_hit_rate": round(sum(self.hits.values()) / lookups, 3) if lookups else None,
+            "errors": self.errors,
+        }
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+def record_lookup(ctx: RunContext, kind: str, warm: bool) -> None:
+    """Report whether a tool lookup found prefetched data warm (no-op without a prefetcher)."""
+    prefetcher = get_function_context(ctx).prefetcher
+    if prefetcher is not None:
+        prefetcher.record(kind, warm)
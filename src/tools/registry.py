@@ -0,0 +1,233 @@
+import os
+import time
+import asyncio
+import logging
+import importlib
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
+
+logger = logging.getLogger("tool-registry")
+
+WARMUP_COSTS = ("lazy", "prewarm")
+
+
+def _resolve(target: str) -> Any:
+    module, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+@dataclass(frozen=True)
+class ToolProvider:
+    """
+    Declarative description of a set of tools an agent can be given.
+
+    Nothing is imported until an agent's config enables the provider: then
+    `target` is imported and instantiated once per process, and the instance
+    is shared by every later session (tool state that must not be shared
+    lives on the RunContext / FunctionContext, not on the instance).
+
+    Fields:
+        name: provider id, used in logs and stats.
+        target: "module:Class" exposing the tools; constructed without arguments.
+        tools: names of the tool methods handed to the session.
+        config_keys: config values that must all be truthy to enable the
+            provider. "agent.<field>" reads the Agent; "tools.<field>" reads
+            the agent's tool config (fetched only when a provider needs it).
+        dependencies: guarded_tool dependencies (circuit breakers) the tools call.
+        warmup: "lazy" (built by the first session that needs it) or
+            "prewarm" (costly first use: `prewarm` hooks run in the job
+            process's prewarm, see TOOL_PREWARM).
+        prewarm: "module:function" hooks run for "prewarm" providers.
+    """
+
+    name: str
+    target: str
+    tools: Tuple[str, ...]
+    config_keys: Tuple[str, ...] = ()
+    dependencies: Tuple[str, ...] = ()
+    warmup: str = "lazy"
+    prewarm: Tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        if ":" not in self.target:
+            raise ValueError(f"target must be 'module:Class', got {self.target!r}")
+        if self.warmup not in WARMUP_COSTS:
+            raise ValueError(f"warmup must be one of {WARMUP_COSTS}, got {self.warmup!r}")
+        for key in self.config_keys:
+            if not key.startswith(("agent.", "tools.")):
+                raise ValueError(f"config key {key!r} must start with 'agent.' or 'tools.'")
+
+    @property
+    def needs_tool_config(self) -> bool:
+        return any(key.startswith("tools.") for key in self.config_keys)
+
+    def enabled(self, agent: Any, tool_config: Any = None) -> bool:
+        for key in self.config_keys:
+            scope, _, field = key.partition(".")
+            if scope == "agent":
+                value = getattr(agent, field, None)
+            elif tool_config is None:
+                return False
+            else:
+                # fields the backend sends that AgentTool does not map yet are in `config`
+                value = getattr(tool_config, field, None)
+                if value is None:
+                    value = (getattr(tool_config, "config", None) or {}).get(field)
+            if not value:
+                return False
+        return True
+
+
+BUILTIN_PROVIDERS: Tuple[ToolProvider, ...] = (
+    ToolProvider(
+        name="default",
+        target="tools.defaut.default_tools:DefaultTools",
+        tools=("is_org_open", "call_forward", "hangup_call"),
+        config_keys=("agent.user_id",),
+        dependencies=("backend", "livekit"),
+    ),
+    ToolProvider(
+        name="appointments",
+        target="tools.appointment_tool:AppointmentTools",
+        tools=("check_availability", "find_available_slots", "book_appointment"),
+        config_keys=("agent.tool_id", "tools.appointment_tool"),
+        dependencies=("calendar",),
+        # Google client libraries and credentials, and dateparser's language data
+        warmup="prewarm",
+        prewarm=("tools.appointment_tool:prewarm",),
+    ),
+)
+
+
+class ToolRegistry:
+    """
+    Per-process registry of tool providers.
+
+    `tools_for` decides from an agent's config which providers it gets,
+    fetches the tool config only when one of them needs it, and returns
+    the shared instances' tool methods. The first use of a provider imports
+    and builds it off the event loop; later sessions reuse the instance.
+
+    Configuration:
+        TOOL_PREWARM  comma-separated providers whose prewarm hooks run in
+                      the job process's prewarm (default: those declaring
+                      warmup="prewarm"; empty to prewarm none)
+    """
+
+    def __init__(self, providers: Tuple[ToolProvider, ...] = BUILTIN_PROVIDERS) -> None:
+        self.providers: Dict[str, ToolProvider] = {}
+        self._instances: Dict[str, Any] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+        self.load_seconds: Dict[str, float] = {}
+        self.sessions: Dict[str, int] = {}
+        for provider in providers:
+            self.register(provider)
+
+    def register(self, provider: ToolProvider) -> None:
+        """Add (or replace) a provider; later registrations are offered to agents after earlier ones."""
+        self.providers[provider.name] = provider
+        self._instances.pop(provider.name, None)
+
+    def prewarm(self) -> Dict[str, Any]:
+        """Run the prewarm hooks of the providers selected by TOOL_PREWARM; returns the hooks' results."""
+        selected = os.getenv("TOOL_PREWARM")
+        names = (
+            [name.strip() for name in selected.split(",") if name.strip()]
+            if selected is not None
+            else [provider.name for provider in self.providers.values() if provider.warmup == "prewarm"]
+        )
+        results = {}
+        for name in names:
+            provider = self.providers.get(name)
+            if provider is None:
+                logger.warning(f"TOOL_PREWARM names unknown tool provider {name!r}")
+                continue
+            for hook in provider.prewarm:
+                started = time.perf_counter()
+                try:
+                    results[hook] = _resolve(hook)()
+                except Exception as e:
+                    logger.warning(f"Prewarm hook {hook} of tool provider {name} failed: {e}")
+                    continue
+                logger.info(f"Prewarmed tool provider {name} ({hook}) in {time.perf_counter() - started:.2f}s")
+        return results
+
+    def _build(self, provider: ToolProvider) -> Any:
+        started = time.perf_counter()
+        instance = _resolve(provider.target)()
+        self.load_seconds[provider.name] = round(time.perf_counter() - started, 3)
+        logger.info(f"Loaded tool provider {provider.name} in {self.load_seconds[provider.name]}s")
+        return instance
+
+    async def instance(self, provider: ToolProvider) -> Any:
+        """The provider's per-process instance, imported and built on first use."""
+        instance = self._instances.get(provider.name)
+        if instance is not None:
+            return instance
+        loading = self._loading.get(provider.name)
+        if loading is None:
+            # importing a provider (and e.g. building a Google API client) must not stall other calls' audio
+            loading = self._loading[provider.name] = asyncio.ensure_future(asyncio.to_thread(self._build, provider))
+        try:
+            instance = await asyncio.shield(loading)
+        finally:
+            if loading.done():
+                self._loading.pop(provider.name, None)
+        self._instances[provider.name] = instance
+        return instance
+
+    async def tools_for(self, agent: Any, load_tool_config: Callable[[str], Awaitable[Any]]) -> List[Any]:
+        """The tools `agent`'s config enables, in provider registration order."""
+        candidates = [
+            provider
+            for provider in self.providers.values()
+            if all(getattr(agent, key[len("agent."):], None) for key in provider.config_keys if key.startswith("agent."))
+        ]
+        tool_config = None
+        if agent.tool_id and any(provider.needs_tool_config for provider in candidates):
+            try:
+                tool_config = await load_tool_config(agent.tool_id)
+            except Exception as e:
+                logger.error(f"Failed to fetch tools for agent {agent.id}: {e}")
+
+        tools: List[Any] = []
+        for provider in candidates:
+            if not provider.enabled(agent, tool_config):
+                continue
+            try:
+                instance = await self.instance(provider)
+                tools.extend(getattr(instance, name) for name in provider.tools)
+            except Exception as e:
+                logger.error(f"Failed to register {provider.name} tools for agent {agent.id}: {e}")
+                continue
+            self.sessions[provider.name] = self.sessions.get(provider.name, 0) + 1
+        return tools
+
+    def reset(self) -> None:
+        """Drop the built instances, e.g. after swapping the process-wide calendar backend."""
+        self._instances.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "loaded": name in self._instances,
+                "load_s": self.load_seconds.get(name),
+                "sessions": self.sessions.get(name, 0),
+            }
+            for name in self.providers
+        }
+
+
+_registry: Optional[ToolRegistry] = None
+
+
+def get_tool_registry() -> ToolRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ToolRegistry()
+    return _registry
+
+
+def register_tool_provider(provider: ToolProvider) -> None:
+    """Make `provider` available to every agent whose config enables it."""
+    get_tool_registry().register(provider)
@@ -0,0 +1,699 @@
+"""
+Offline load test for the voice agent worker.
+
+Runs many entrypoint-equivalent sessions in one process against local
+stand-ins, so the numbers measure this code and livekit's session pipeline
+rather than the network or a model provider:
+
+- a mock backend HTTP server for /agents/get, /tools/get and /history/create
+- a fake calendar behind the real AppointmentTools / BusyIndex
+- fake STT, LLM and TTS plugins that stream synthetic transcripts, tokens
+  and audio with configurable latencies
+- a synthetic microphone and a speaker that "plays" audio at real time
+  (or faster, see `playout_speed`)
+
+Each session goes through bootstrap_session, the session factory's
+pipeline shape, the TranscriptRecorder, SessionMetrics, the prefetcher,
+the Assistant greeting and the history spool, then holds `turns`
+conversation turns, one of which calls the calendar tool.
+
+The report has time-to-greeting and per-turn latency percentiles,
+event-loop lag, memory per session and, over a series of concurrency
+levels, the highest level that stays within the latency budget.
+
+Usage:
+    python tests/load_harness.py --levels 10,25,50,100 --turns 3
+"""
+
+import os
+import json
+import math
+import time
+import asyncio
+import logging
+import argparse
+import datetime
+import tempfile
+import contextlib
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Optional, Dict, Any, List, AsyncIterator
+
+import psutil
+from aiohttp import web
+from livekit import rtc
+from livekit.agents import AgentSession, llm, stt, tts, utils
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS
+from livekit.agents.voice import io
+
+from agent import Assistant
+from agent_config import backend_client
+from agent_config import greeting_cache
+from agent_config.bootstrap import bootstrap_session
+from agent_config.get_agent import agent_cache, tool_cache
+from agent_config.history_spool import HistorySpool
+from agent_config.session_metrics import SessionMetrics
+from agent_config.transcript_recorder import TranscriptRecorder
+from agent_config.tts_cache import CachingTTS
+from agent_config.worker_load import LoopLagProbe
+from tools import calendar_backend
+from tools import registry as tool_registry
+from tools.calendar_backend import CalendarBackend
+from tools.date_resolution import prewarm_date_parser
+from tools.function_context import FunctionContext
+from tools.prefetch import SessionPrefetcher
+
+logger = logging.getLogger("load-harness")
+
+AGENT_ID = "load-agent"
+TOOL_ID = "load-tools"
+USER_TURNS = (
+    "Hi, I'd like to make an appointment.",
+    "Is tomorrow at 3 pm available?",
+    "Great, that works for me.",
+    "Do you have anything later in the week?",
+    "Thanks, that's all.",
+)
+
+
+@dataclass
+class LoadConfig:
+    """Latencies of the stand-ins and the shape of every simulated call."""
+
+    turns: int = 3
+    stt_delay: float = 0.1
+    llm_ttft: float = 0.25
+    llm_token_interval: float = 0.01
+    tts_ttfb: float = 0.15
+    calendar_latency: float = 0.1
+    backend_latency: float = 0.02
+    user_speech: float = 1.0
+    think_time: float = 0.5
+    min_endpointing_delay: float = 0.5
+    playout_speed: float = 1.0
+    ramp: float = 2.0
+    turn_timeout: float = 15.0
+
+
+@dataclass
+class LoadBudget:
+    """A concurrency level is sustainable while all of these hold."""
+
+    greeting_p95: float = 1.5
+    turn_p95: float = 2.0
+    loop_lag: float = 0.1
+
+
+# -- mock backend ----------------------------------------------------------
+
+
+class MockBackend:
+    """aiohttp server answering the three backend routes the agent calls."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.requests: Dict[str, int] = {}
+        self.histories: List[bytes] = []
+        self.url = ""
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _count(self, route: str) -> None:
+        self.requests[route] = self.requests.get(route, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def _agent(self, request: web.Request) -> web.Response:
+        await self._count("agents")
+        return web.json_response({
+            "id": request.match_info["agent_id"],
+            "name": "Load Test Clinic",
+            "agent_type": "custom",
+            "voice": "load-voice",
+            "greeting_prompt": "Hello, thanks for calling the clinic. How can I help you today?",
+            "system_prompt": "You are a friendly receptionist who books appointments.",
+            "user_id": "",
+            "tool_id": TOOL_ID,
+        })
+
+    async def _tools(self, request: web.Request) -> web.Response:
+        await self._count("tools")
+        return web.json_response({"id": request.match_info["tool_id"], "name": "calendar", "appointment_tool": True})
+
+    async def _history(self, request: web.Request) -> web.Response:
+        await self._count("history")
+        self.histories.append(await request.read())
+        return web.json_response({"ok": True})
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/agents/get/{agent_id}", self._agent)
+        app.router.add_get("/tools/get/{tool_id}", self._tools)
+        app.router.add_post("/history/create", self._history)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def aclose(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+# -- fake calendar and model plugins ------------------------------------------
+
+
+class FakeCalendar(CalendarBackend):
+    """Calendar with no events; every request takes `latency` seconds."""
+
+    def __init__(self, latency: float) -> None:
+        self.calendar_id = "primary"
+        self.timeout = 8.0
+        self.latency = latency
+        self.requests = 0
+
+    async def _call(self, result: Any) -> Any:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        return result
+
+    async def list_events(self, time_min, time_max, speech_handle=None):
+        return await self._call([])
+
+    async def insert_event(self, body, speech_handle=None):
+        return await self._call({"htmlLink": "https://calendar.test/event"})
+
+    async def freebusy(self, time_min, time_max, speech_handle=None):
+        return await self._call([])
+
+
+class FakeSTT(stt.STT):
+    """Streaming STT that transcribes whatever the harness says the caller said."""
+
+    def __init__(self, config: LoadConfig) -> None:
+        super().__init__(capabilities=stt.STTCapabilities(streaming=True, interim_results=True))
+        self.config = config
+        self.utterances: "asyncio.Queue[str]" = asyncio.Queue()
+        self.on_end_of_speech = lambda: None
+
+    @property
+    def model(self) -> str:
+        return "fake-stt"
+
+    async def _recognize_impl(self, buffer, *, language=None, conn_options=None) -> stt.SpeechEvent:
+        raise NotImplementedError("the load test only streams")
+
+    def stream(self, *, language=None, conn_options=DEFAULT_API_CONNECT_OPTIONS) -> stt.RecognizeStream:
+        return _FakeSTTStream(stt=self, conn_options=conn_options)
+
+
+class _FakeSTTStream(stt.RecognizeStream):
+    async def _run(self) -> None:
+        speech = asyncio.ensure_future(self._recognize_utterances())
+        try:
+            # the audio itself is ignored; the stream ends when the session closes its input
+            async for _ in self._input_ch:
+                pass
+        finally:
+            speech.cancel()
+
+    async def _recognize_utterances(self) -> None:
+        engine: FakeSTT = self._stt
+        while True:
+            text = await engine.utterances.get()
+            self._event_ch.send_nowait(stt.SpeechEvent(type=stt.SpeechEventType.START_OF_SPEECH))
+            await asyncio.sleep(engine.config.user_speech / 2)
+            self._event_ch.send_nowait(_transcript(stt.SpeechEventType.INTERIM_TRANSCRIPT, text[: len(text) // 2]))
+            await asyncio.sleep(engine.config.user_speech / 2)
+            engine.on_end_of_speech()
+            await asyncio.sleep(engine.config.stt_delay)
+            self._event_ch.send_nowait(_transcript(stt.SpeechEventType.FINAL_TRANSCRIPT, text))
+            self._event_ch.send_nowait(stt.SpeechEvent(type=stt.SpeechEventType.END_OF_SPEECH))
+
+
+def _transcript(kind: stt.SpeechEventType, text: str) -> stt.SpeechEvent:
+    return stt.SpeechEvent(type=kind, alternatives=[stt.SpeechData(language="en", text=text)])
+
+
+class FakeLLM(llm.LLM):
+    """
+    Streams a canned reply token by token. A caller asking whether a time is
+    available gets a check_availability tool call first, like the real model.
+    """
+
+    def __init__(self, config: LoadConfig) -> None:
+        super().__init__()
+        self.config = config
+
+    @property
+    def model(self) -> str:
+        return "fake-llm"
+
+    def chat(self, *, chat_ctx, tools=None, conn_options=DEFAULT_API_CONNECT_OPTIONS, **kwargs) -> llm.LLMStream:
+        return _FakeLLMStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class _FakeLLMStream(llm.LLMStream):
+    async def _run(self) -> None:
+        config: LoadConfig = self._llm.config
+        await asyncio.sleep(config.llm_ttft)
+        last = self._chat_ctx.items[-1] if self._chat_ctx.items else None
+        tool_names = {tool.info.name for tool in self._tools}
+
+        if last is not None and last.type == "message" and "available" in (last.text_content or "") and "check_availability" in tool_names:
+            call = llm.FunctionToolCall(
+                name="check_availability",
+                arguments=json.dumps({"date": "tomorrow", "time": "3 pm"}),
+                call_id=utils.shortuuid("call_"),
+            )
+            self._event_ch.send_nowait(llm.ChatChunk(id=utils.shortuuid(), delta=llm.ChoiceDelta(role="assistant", tool_calls=[call])))
+            return
+
+        if last is not None and last.type == "function_call_output":
+            reply = f"{last.output} Would you like me to book it?"
+        elif last is not None and last.type == "message" and last.role == "system":
+            # generate_reply(instructions="say: ...") for the greeting on pipelines without the audio cache
+            reply = "Hello, how can I help you today?"
+        else:
+            reply = "Sure, I can help with that. What day and time would suit you?"
+
+        chunk_id = utils.shortuuid()
+        for token in reply.split(" "):
+            self._event_ch.send_nowait(llm.ChatChunk(id=chunk_id, delta=llm.ChoiceDelta(role="assistant", content=token + " ")))
+            await asyncio.sleep(config.llm_token_interval)
+
+
+class FakeTTS(tts.TTS):
+    """Synthesizes 60ms of low-level noise per character, in 100ms chunks."""
+
+    def __init__(self, config: LoadConfig) -> None:
+        super().__init__(capabilities=tts.TTSCapabilities(streaming=False), sample_rate=24000, num_channels=1)
+        self.config = config
+
+    @property
+    def model(self) -> str:
+        return "fake-tts"
+
+    def synthesize(self, text: str, *, conn_options=DEFAULT_API_CONNECT_OPTIONS) -> tts.ChunkedStream:
+        return _FakeChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+_NOISE_CHUNK = bytes((i * 7) % 16 if i % 2 == 0 else 0 for i in range(4800))  # 100ms at 24kHz, int16
+
+
+class _FakeChunkedStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        engine: FakeTTS = self._tts
+        output_emitter.initialize(request_id=utils.shortuuid(), sample_rate=24000, num_channels=1, mime_type="audio/pcm")
+        await asyncio.sleep(engine.config.tts_ttfb)
+        for _ in range(max(1, int(len(self.input_text) * 0.6))):
+            output_emitter.push(_NOISE_CHUNK)
+            await asyncio.sleep(0)
+        output_emitter.flush()
+
+
+# -- synthetic audio I/O ----------------------------------------------------
+
+
+class SyntheticMic(io.AudioInput):
+    """20ms frames of faint noise, paced at real time like a room track."""
+
+    _FRAME = rtc.AudioFrame(bytes((i * 3) % 8 if i % 2 == 0 else 0 for i in range(640)), 16000, 1, 320)
+
+    def __init__(self) -> None:
+        super().__init__(label="synthetic-mic")
+        self._next = time.perf_counter()
+
+    async def __anext__(self) -> rtc.AudioFrame:
+        self._next += 0.02
+        await asyncio.sleep(max(self._next - time.perf_counter(), 0))
+        return self._FRAME
+
+
+class TimingSpeaker(io.AudioOutput):
+    """Audio sink that plays out at `speed` x real time and reports when replies start."""
+
+    def __init__(self, stats: "SessionStats", speed: float) -> None:
+        super().__init__(label="timing-speaker", capabilities=io.AudioOutputCapabilities(pause=False), sample_rate=None)
+        self._stats = stats
+        self._speed = speed
+        self._segment = 0.0
+        self._segment_started = False
+        self._playout: Optional[asyncio.Task] = None
+        self.segment_done = asyncio.Event()
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        await super().capture_frame(frame)
+        if not self._segment_started:
+            self._segment_started = True
+            self.segment_done.clear()
+            self.on_playback_started(created_at=time.time())
+            self._stats.agent_audio_started()
+        self._segment += frame.duration
+
+    def flush(self) -> None:
+        super().flush()
+        duration, self._segment, self._segment_started = self._segment, 0.0, False
+
+        async def play() -> None:
+            await asyncio.sleep(duration / self._speed)
+            self.on_playback_finished(playback_position=duration, interrupted=False)
+            self.segment_done.set()
+
+        self._playout = asyncio.ensure_future(play())
+
+    def clear_buffer(self) -> None:
+        self._segment, self._segment_started = 0.0, False
+
+
+# -- one simulated call -------------------------------------------------------
+
+
+@dataclass
+class SessionStats:
+    started: float = field(default_factory=time.perf_counter)
+    time_to_greeting: Optional[float] = None
+    turn_latencies: List[float] = field(default_factory=list)
+    error: Optional[str] = None
+    _user_done: Optional[float] = None
+    _reply_started: Optional[asyncio.Event] = None
+
+    def user_finished_speaking(self) -> None:
+        self._user_done = time.perf_counter()
+
+    def agent_audio_started(self) -> None:
+        now = time.perf_counter()
+        if self.time_to_greeting is None:
+            self.time_to_greeting = now - self.started
+        elif self._user_done is not None:
+            self.turn_latencies.append(now - self._user_done)
+            self._user_done = None
+        if self._reply_started is not None:
+            self._reply_started.set()
+
+
+class _FakeJobContext:
+    """What bootstrap_session and the entrypoint use of JobContext, without a room."""
+
+    def __init__(self, index: int) -> None:
+        self.job = SimpleNamespace(id=f"load-job-{index}", metadata=AGENT_ID)
+        self.room = SimpleNamespace(name=f"load-room-{index}", sid=f"RM_load{index}")
+        self._participant = SimpleNamespace(
+            identity=f"caller-{index}",
+            name=f"Caller {index}",
+            kind=rtc.ParticipantKind.PARTICIPANT_KIND_SIP,
+            attributes={"sip.phoneNumber": f"+1555000{index:04d}"},
+        )
+
+    async def connect(self) -> None:
+        await asyncio.sleep(0)
+
+    async def wait_for_participant(self) -> SimpleNamespace:
+        return self._participant
+
+
+class _Stack:
+    """Process-wide stand-ins shared by every session of a run."""
+
+    def __init__(self, config: LoadConfig, backend: MockBackend, spool: HistorySpool) -> None:
+        self.config = config
+        self.backend = backend
+        self.spool = spool
+
+
+def _build_session(stack: _Stack, stats: SessionStats):
+    def factory(agent) -> AgentSession:
+        # same shape as the custom pipeline in session_factory, with fakes for the remote models
+        recognizer = FakeSTT(stack.config)
+        recognizer.on_end_of_speech = stats.user_finished_speaking
+        session = AgentSession(
+            stt=recognizer,
+            llm=FakeLLM(stack.config),
+            tts=CachingTTS(FakeTTS(stack.config), voice=agent.voice),
+            turn_handling={
+                "turn_detection": "stt",
+                "endpointing": {"min_delay": stack.config.min_endpointing_delay},
+                # the timing speaker cannot pause playout
+                "interruption": {"resume_false_interruption": False},
+            },
+            # on close the session waits for a last transcript of the caller hanging up; the
+            # fake STT has none to give, and teardown is not what the harness measures
+            session_close_transcript_timeout=0.1,
+        )
+        session.recognizer = recognizer
+        return session
+
+    return factory
+
+
+async def run_session(stack: _Stack, index: int) -> SessionStats:
+    """The entrypoint's flow for one call, from dispatch to the history upload."""
+    config = stack.config
+    stats = SessionStats()
+    ctx = _FakeJobContext(index)
+    session = None
+    try:
+        boot = await bootstrap_session(ctx, _build_session(stack, stats))
+        agent, session, tools = boot.agent, boot.session, boot.tools
+        start_time = datetime.datetime.now()
+
+        recorder = TranscriptRecorder(session, ctx.job.id, {"agent_id": agent.id, "started_at": start_time.timestamp()})
+        recorder.start()
+        session_metrics = SessionMetrics(session, ctx.room.name)
+        session_metrics.start()
+        prefetcher = SessionPrefetcher((tool.info.name for tool in tools), user_id=agent.user_id)
+        prefetcher.start()
+        session.function_context = FunctionContext(
+            phone_number=boot.participant.attributes["sip.phoneNumber"],
+            room_name=ctx.room.name,
+            participant=boot.participant,
+            user_id=agent.user_id,
+            prefetcher=prefetcher,
+        )
+
+        speaker = TimingSpeaker(stats, config.playout_speed)
+        session.input.audio = SyntheticMic()
+        session.output.audio = speaker
+        assistant = Assistant(
+            agent.system_prompt,
+            agent.greeting_prompt,
+            tools=tools,
+            metrics=session_metrics,
+            agent_id=agent.id,
+            voice=f"fake-tts:{agent.voice}",
+        )
+        await session.start(agent=assistant)
+        await asyncio.wait_for(speaker.segment_done.wait(), config.turn_timeout)
+
+        for turn in range(config.turns):
+            await asyncio.sleep(config.think_time)
+            stats._reply_started = asyncio.Event()
+            await session.recognizer.utterances.put(USER_TURNS[turn % len(USER_TURNS)])
+            await asyncio.wait_for(stats._reply_started.wait(), config.turn_timeout)
+            await asyncio.wait_for(speaker.segment_done.wait(), config.turn_timeout)
+
+        conversation = await recorder.finalize()
+        session_metrics.stop()
+        await prefetcher.aclose()
+        await stack.spool.enqueue({
+            "agent_id": agent.id,
+            "date": start_time.date().isoformat(),
+            "time": start_time.time().isoformat(),
+            "duration": int((datetime.datetime.now() - start_time).total_seconds()),
+            "summary": None,
+            "conversation": conversation,
+            "metrics": session_metrics.summary(),
+        }, idempotency_key=ctx.job.id)
+        recorder.discard()
+    except Exception as e:
+        stats.error = f"{type(e).__name__}: {e}"
+        logger.warning(f"Session {index} failed: {stats.error}")
+    finally:
+        if session is not None:
+            await session.aclose()
+    return stats
+
+
+# -- runs and reports ---------------------------------------------------------
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile; None for no samples."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+@dataclass
+class LevelReport:
+    sessions: int
+    completed: int
+    errors: List[str]
+    greeting: Dict[str, Optional[float]]
+    turn: Dict[str, Optional[float]]
+    loop_lag_max: float
+    memory_per_session: float
+    duration: float
+
+    def within(self, budget: LoadBudget) -> bool:
+        return (
+            not self.errors
+            and (self.greeting["p95"] or 0) <= budget.greeting_p95
+            and (self.turn["p95"] or 0) <= budget.turn_p95
+            and self.loop_lag_max <= budget.loop_lag
+        )
+
+    def line(self) -> str:
+        def ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value * 1000:.0f}"
+
+        return (
+            f"{self.sessions:>5} {self.completed:>5} {len(self.errors):>4}  "
+            f"{ms(self.greeting['p50']):>6} {ms(self.greeting['p95']):>6} {ms(self.greeting['p99']):>6}  "
+            f"{ms(self.turn['p50']):>6} {ms(self.turn['p95']):>6} {ms(self.turn['p99']):>6}  "
+            f"{self.loop_lag_max * 1000:>7.0f} {self.memory_per_session / 1e6:>8.2f}"
+        )
+
+
+REPORT_HEADER = (
+    "sessions  done  err  greet ms (p50 p95 p99)  turn ms (p50 p95 p99)  lag ms  MB/session"
+)
+
+
+def _distribution(values: List[float]) -> Dict[str, Optional[float]]:
+    return {"p50": percentile(values, 50), "p95": percentile(values, 95), "p99": percentile(values, 99)}
+
+
+async def run_level(stack: _Stack, sessions: int) -> LevelReport:
+    """Start `sessions` calls spread over the ramp and wait for all of them to hang up."""
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    rss_peak = rss_before
+    probe = LoopLagProbe(interval=0.02, window=float("inf"))
+    probe.start()
+    started = time.perf_counter()
+
+    async def staggered(index: int) -> SessionStats:
+        await asyncio.sleep(stack.config.ramp * index / max(sessions, 1))
+        return await run_session(stack, index)
+
+    tasks = [asyncio.ensure_future(staggered(i)) for i in range(sessions)]
+    pending = set(tasks)
+    while pending:
+        _, pending = await asyncio.wait(pending, timeout=0.25)
+        rss_peak = max(rss_peak, process.memory_info().rss)
+    await probe.aclose()
+    await stack.spool.flush(timeout=10)
+
+    results = [task.result() for task in tasks]
+    return LevelReport(
+        sessions=sessions,
+        completed=sum(1 for r in results if r.error is None),
+        errors=[r.error for r in results if r.error is not None],
+        greeting=_distribution([r.time_to_greeting for r in results if r.time_to_greeting is not None]),
+        turn=_distribution([latency for r in results for latency in r.turn_latencies]),
+        loop_lag_max=probe.max_lag,
+        memory_per_session=(rss_peak - rss_before) / max(sessions, 1),
+        duration=time.perf_counter() - started,
+    )
+
+
+@contextlib.asynccontextmanager
+async def offline_stack(config: LoadConfig, directory: Optional[str] = None) -> AsyncIterator[_Stack]:
+    """
+    Start the mock backend and install the fake calendar and a backend client
+    pointing at it, restoring the process-wide singletons afterwards.
+    """
+    tmp = tempfile.TemporaryDirectory() if directory is None else None
+    directory = directory or tmp.name
+    saved_spool_dir = os.environ.get("HISTORY_SPOOL_DIR")
+    saved_client = backend_client._backend_client
+    saved_greetings = greeting_cache._greeting_cache
+    saved_calendars = dict(calendar_backend._backends)
+    saved_registry = tool_registry._registry
+    backend = MockBackend(latency=config.backend_latency)
+    try:
+        url = await backend.start()
+        os.environ["HISTORY_SPOOL_DIR"] = directory
+        backend_client._backend_client = backend_client.BackendClient(api_url=url, secret_key="load-test")
+        greeting_cache._greeting_cache = greeting_cache.GreetingCache(directory=os.path.join(directory, "greetings"))
+        calendar_backend._backends["primary"] = FakeCalendar(config.calendar_latency)
+        # tool providers are built once per process; these ones must see the fake calendar
+        tool_registry._registry = tool_registry.ToolRegistry()
+        agent_cache.clear()
+        tool_cache.clear()
+        # what the worker's prewarm does before the first job
+        prewarm_date_parser()
+        yield _Stack(config, backend, HistorySpool(directory=directory))
+    finally:
+        await backend_client._backend_client.aclose()
+        backend_client._backend_client = saved_client
+        greeting_cache._greeting_cache = saved_greetings
+        calendar_backend._backends.clear()
+        calendar_backend._backends.update(saved_calendars)
+        tool_registry._registry = saved_registry
+        agent_cache.clear()
+        tool_cache.clear()
+        if saved_spool_dir is None:
+            os.environ.pop("HISTORY_SPOOL_DIR", None)
+        else:
+            os.environ["HISTORY_SPOOL_DIR"] = saved_spool_dir
+        await backend.aclose()
+        if tmp is not None:
+            tmp.cleanup()
+
+
+async def find_max_concurrency(levels: List[int], config: LoadConfig, budget: LoadBudget):
+    """
+    Run the levels in increasing order until one misses the budget.
+
+    Returns:
+        (reports, max_sustainable): one LevelReport per level run, and the
+        highest level within the budget (0 if none was).
+    """
+    reports: List[LevelReport] = []
+    max_sustainable = 0
+    async with offline_stack(config) as stack:
+        # the first call in a process pays one-off costs (config fetch, caches, lazy imports)
+        await run_level(stack, 1)
+        for sessions in sorted(levels):
+            report = await run_level(stack, sessions)
+            reports.append(report)
+            if not report.within(budget):
+                break
+            max_sustainable = sessions
+    return reports, max_sustainable
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="5,10,25,50,100", help="comma separated concurrent session counts")
+    parser.add_argument("--turns", type=int, default=LoadConfig.turns)
+    parser.add_argument("--ramp", type=float, default=LoadConfig.ramp, help="seconds over which a level's calls arrive")
+    parser.add_argument("--playout-speed", type=float, default=LoadConfig.playout_speed)
+    parser.add_argument("--turn-p95", type=float, default=LoadBudget.turn_p95, help="budget in seconds")
+    parser.add_argument("--greeting-p95", type=float, default=LoadBudget.greeting_p95, help="budget in seconds")
+    parser.add_argument("--loop-lag", type=float, default=LoadBudget.loop_lag, help="budget in seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    # the agent's loggers are set to INFO explicitly; per-call chatter would drown the report
+    logging.disable(logging.INFO)
+    config = LoadConfig(turns=args.turns, ramp=args.ramp, playout_speed=args.playout_speed)
+    budget = LoadBudget(greeting_p95=args.greeting_p95, turn_p95=args.turn_p95, loop_lag=args.loop_lag)
+    reports, max_sustainable = asyncio.run(
+        find_max_concurrency([int(level) for level in args.levels.split(",")], config, budget)
+    )
+
+    print(REPORT_HEADER)
+    for report in reports:
+        print(report.line())
+    print(f"max sustainable concurrency: {max_sustainable} sessions")
+
+
+if __name__ == "__main__":
+    main()
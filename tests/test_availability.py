@@ -0,0 +1,84 @@
+from datetime import datetime, time, timedelta, timezone
+
+from tools.availability import BusyIndex
+
+
+class FakeCalendar:
+    """Serves freebusy queries from a fixed list of busy periods."""
+
+    calendar_id = "primary"
+
+    def __init__(self, busy: list) -> None:
+        self.busy = busy
+        self.queries = []
+
+    async def freebusy(self, time_min: str, time_max: str, speech_handle=None) -> list:
+        self.queries.append((time_min, time_max))
+        return [
+            {"start": start.isoformat().replace("+00:00", "Z"), "end": end.isoformat().replace("+00:00", "Z")}
+            for start, end in self.busy
+        ]
+
+
+def _at(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2030, 1, day, hour, minute, tzinfo=timezone.utc)
+
+
+async def test_repeated_slot_probes_use_one_query() -> None:
+    calendar = FakeCalendar([(_at(7, 15), _at(7, 16))])
+    index = BusyIndex(calendar, ttl=60)
+
+    assert await index.is_free(_at(7, 14), _at(7, 14, 30))
+    assert not await index.is_free(_at(7, 15), _at(7, 15, 30))
+    assert not await index.is_free(_at(7, 15, 30), _at(7, 16))
+    assert await index.is_free(_at(7, 16), _at(7, 16, 30))
+    # a slot straddling the start of a busy block is not free
+    assert not await index.is_free(_at(7, 14, 45), _at(7, 15, 15))
+
+    assert len(calendar.queries) == 1
+
+
+async def test_booking_invalidates_the_day() -> None:
+    calendar = FakeCalendar([])
+    index = BusyIndex(calendar, ttl=60)
+
+    assert await index.is_free(_at(7, 10), _at(7, 10, 30))
+    calendar.busy = [(_at(7, 10), _at(7, 10, 30))]
+    index.invalidate(_at(7, 10), _at(7, 10, 30))
+
+    assert not await index.is_free(_at(7, 10), _at(7, 10, 30))
+    assert len(calendar.queries) == 2
+
+
+async def test_find_free_slots_skips_busy_and_off_hours() -> None:
+    calendar = FakeCalendar([(_at(7, 9), _at(7, 10)), (_at(8, 9), _at(8, 17))])
+    index = BusyIndex(calendar, ttl=60)
+
+    slots = await index.find_free_slots(
+        _at(7, 0),
+        _at(7, 0) + timedelta(days=3),
+        duration=timedelta(minutes=30),
+        limit=3,
+        day_start=time(9),
+        day_end=time(17),
+    )
+
+    assert slots == [_at(7, 10), _at(7, 10, 30), _at(7, 11)]
+    # the whole window was loaded in a single freebusy query
+    assert len(calendar.queries) == 1
+
+
+async def test_find_free_slots_moves_to_next_open_day() -> None:
+    calendar = FakeCalendar([(_at(7, 9), _at(7, 17))])
+    index = BusyIndex(calendar, ttl=60)
+
+    slots = await index.find_free_slots(
+        _at(7, 0),
+        _at(9, 0),
+        duration=timedelta(hours=1),
+        limit=2,
+        day_start=time(9),
+        day_end=time(17),
+    )
+
+    assert slots == [_at(8, 9), _at(8, 9, 30)]
@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+import pytest
+
+from agent_config import backend_client, get_agent
+from agent_config.backend_client import BackendClient
+from agent_config.config_cache import ConfigCache
+
+
+def _agent_payload(agent_id: str) -> dict:
+    return {
+        "id": agent_id,
+        "name": "Receptionist",
+        "agent_type": "custom",
+        "voice": "alloy",
+        "greeting_prompt": "Hello",
+        "system_prompt": "Be helpful",
+        "user_id": "user-1",
+        "api_key": "sk-test",
+        "tool_id": "tool-1",
+    }
+
+
+@pytest.fixture
+def requests_seen(monkeypatch) -> list:
+    """Install a process-wide backend client backed by a mock transport."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.url.path.startswith("/agents/get/"):
+            return httpx.Response(200, json=_agent_payload(request.url.path.rsplit("/", 1)[-1]))
+        return httpx.Response(404)
+
+    client = BackendClient(
+        api_url="http://backend.test",
+        secret_key="secret",
+        transport=httpx.MockTransport(handler),
+    )
+    monkeypatch.setattr(backend_client, "_backend_client", client)
+    monkeypatch.setattr(get_agent, "agent_cache", ConfigCache("agent"))
+    return seen
+
+
+async def test_fetch_agent_uses_shared_client(requests_seen) -> None:
+    """fetch_agent goes through the pooled client with auth headers applied."""
+    agent = await get_agent.fetch_agent("agent-1")
+
+    assert agent.id == "agent-1"
+    assert agent.tool_id == "tool-1"
+    assert len(requests_seen) == 1
+    assert requests_seen[0].url == "http://backend.test/agents/get/agent-1"
+    assert requests_seen[0].headers["Authorization"] == "Bearer secret"
+
+    metrics = backend_client.get_backend_client().metrics.snapshot()
+    assert metrics["requests"] == 1
+    assert metrics["errors"] == 0
+
+
+async def test_fetch_agent_logs_no_secrets_or_prompts(requests_seen, caplog) -> None:
+    with caplog.at_level("INFO", logger="voice-agent"):
+        await get_agent.fetch_agent("agent-1")
+
+    assert "agent-1" in caplog.text
+    assert "sk-test" not in caplog.text
+    assert "Be helpful" not in caplog.text
+    assert "sha256:" in caplog.text
+
+
+async def test_client_is_reused_within_a_loop(requests_seen) -> None:
+    """Successive calls on the same loop share one httpx client."""
+    client = backend_client.get_backend_client()
+
+    await client.get("/agents/get/a")
+    first = client.client
+    await client.get("/agents/get/b")
+
+    assert client.client is first
+    assert client.metrics.requests == 2
+
+
+def test_client_rebuilt_for_new_event_loop(requests_seen) -> None:
+    """Connections are loop-bound, so a new loop gets a fresh httpx client."""
+    client = backend_client.get_backend_client()
+
+    async def current_client() -> httpx.AsyncClient:
+        await client.get("/agents/get/a")
+        return client.client
+
+    first = asyncio.run(current_client())
+    second = asyncio.run(current_client())
+
+    assert first is not second
+    # the stale client is closed rather than leaking its pooled sockets
+    assert first.is_closed
+    assert not second.is_closed
+
+
+def test_http2_requires_h2(monkeypatch) -> None:
+    """HTTP/2 is only requested when the optional h2 package is importable."""
+    monkeypatch.setattr(backend_client.importlib.util, "find_spec", lambda name: None)
+
+    client = BackendClient(api_url="http://backend.test", secret_key="secret", http2=True)
+
+    assert client.http2 is False
@@ -0,0 +1,97 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from agent_config import bootstrap
+from agent_config.get_agent import Agent
+
+
+class FakeJobContext:
+    """Just enough of JobContext for bootstrap_session."""
+
+    def __init__(self, metadata: str, attributes: dict) -> None:
+        self.job = SimpleNamespace(metadata=metadata)
+        self.room = SimpleNamespace(name="room-1")
+        self.events = []
+        self._attributes = attributes
+
+    async def connect(self) -> None:
+        self.events.append("connect_start")
+        await asyncio.sleep(0.05)
+        self.events.append("connect_done")
+
+    async def wait_for_participant(self):
+        await asyncio.sleep(0.05)
+        return SimpleNamespace(attributes=self._attributes)
+
+
+def _patch_backend(monkeypatch, ctx: FakeJobContext) -> list:
+    fetched = []
+
+    async def fake_fetch_agent(agent_id: str):
+        ctx.events.append(f"fetch_start:{agent_id}")
+        fetched.append(agent_id)
+        await asyncio.sleep(0.08)
+        return Agent(id=agent_id, tool_id="tool-1")
+
+    async def fake_get_agent_tools(agent: Agent) -> list:
+        await asyncio.sleep(0.05)
+        return ["tool"]
+
+    monkeypatch.setattr(bootstrap, "fetch_agent", fake_fetch_agent)
+    monkeypatch.setattr(bootstrap, "get_agentTools", fake_get_agent_tools)
+    return fetched
+
+
+class FakeSession:
+    def on(self, event, callback) -> None:
+        pass
+
+
+async def test_agent_fetch_overlaps_room_connect(monkeypatch) -> None:
+    """Config fetch starts before connect finishes and is not repeated."""
+    ctx = FakeJobContext(metadata="agent-1", attributes={})
+    fetched = _patch_backend(monkeypatch, ctx)
+
+    start = time.perf_counter()
+    result = await bootstrap.bootstrap_session(ctx, lambda agent: FakeSession())
+    elapsed = time.perf_counter() - start
+
+    assert result.agent.id == "agent-1"
+    assert result.tools == ["tool"]
+    assert fetched == ["agent-1"]
+    assert ctx.events.index("fetch_start:agent-1") < ctx.events.index("connect_done")
+    # sequential would be 0.05 + 0.05 + 0.08 + 0.05
+    assert elapsed < 0.2
+    assert {"connect", "participant_join", "agent_config", "tools", "session"} <= set(result.timings.marks)
+
+
+async def test_participant_agent_id_overrides_metadata(monkeypatch) -> None:
+    """The participant's agent_id attribute wins over the dispatch metadata."""
+    ctx = FakeJobContext(metadata="agent-1", attributes={"agent_id": "agent-2"})
+    fetched = _patch_backend(monkeypatch, ctx)
+
+    result = await bootstrap.bootstrap_session(ctx, lambda agent: FakeSession())
+
+    assert result.agent.id == "agent-2"
+    assert fetched == ["agent-1", "agent-2"]
+
+
+async def test_failed_tool_fetch_releases_pooled_models(monkeypatch) -> None:
+    ctx = FakeJobContext(metadata="agent-1", attributes={})
+    _patch_backend(monkeypatch, ctx)
+
+    async def failing_tools(agent: Agent) -> list:
+        raise RuntimeError("tools unavailable")
+
+    monkeypatch.setattr(bootstrap, "get_agentTools", failing_tools)
+    released = []
+    session = FakeSession()
+    session.model_lease = SimpleNamespace(release=lambda: released.append(1))
+
+    with pytest.raises(RuntimeError):
+        await bootstrap.bootstrap_session(ctx, lambda agent: session)
+
+    assert released == [1]
@@ -0,0 +1,131 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import httpx
+import pytest
+
+from agent_config import backend_client
+from agent_config.backend_client import BackendClient
+from agent_config.config_cache import ConfigCache
+from tools.defaut import business_hours
+from tools.defaut.business_hours import parse_schedule
+from tools.defaut.default_tools import DefaultTools
+from tools.function_context import FunctionContext
+
+TORONTO = ZoneInfo("America/Toronto")
+
+SCHEDULE = {
+    "timezone": "America/Toronto",
+    "weekly": {
+        "monday": [{"open": "09:00", "close": "12:00"}, {"open": "13:00", "close": "17:00"}],
+        "friday": [{"open": "22:00", "close": "02:00"}],
+    },
+    "holidays": ["2026-10-19"],
+}
+
+
+@pytest.mark.parametrize(
+    ("at", "expected"),
+    [
+        (datetime(2026, 10, 12, 9, 30, tzinfo=TORONTO), True),
+        (datetime(2026, 10, 12, 12, 30, tzinfo=TORONTO), False),  # lunch break
+        (datetime(2026, 10, 12, 17, 0, tzinfo=TORONTO), False),  # closing time is exclusive
+        (datetime(2026, 10, 13, 10, 0, tzinfo=TORONTO), False),  # no hours on Tuesday
+        (datetime(2026, 10, 16, 23, 0, tzinfo=TORONTO), True),  # Friday overnight
+        (datetime(2026, 10, 17, 1, 0, tzinfo=TORONTO), True),  # ...spilling into Saturday
+        (datetime(2026, 10, 17, 3, 0, tzinfo=TORONTO), False),
+        (datetime(2026, 10, 19, 10, 0, tzinfo=TORONTO), False),  # holiday Monday
+        (datetime(2026, 10, 12, 14, 0, tzinfo=timezone.utc), True),  # 10:00 in Toronto
+    ],
+)
+def test_schedule_evaluated_locally(at, expected) -> None:
+    assert parse_schedule(SCHEDULE).is_open(at) is expected
+
+
+def test_naive_target_time_uses_org_timezone() -> None:
+    schedule = parse_schedule(SCHEDULE)
+
+    assert schedule.localize("2026-10-12T09:30:00").tzinfo == TORONTO
+    assert schedule.is_open(schedule.localize("2026-10-12T09:30:00"))
+
+
+async def test_schedule_fetched_once_and_clock_offset_measured(monkeypatch) -> None:
+    monkeypatch.setenv("BUSINESS_HOURS_SCHEDULE", "1")
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        server_now = datetime.now(timezone.utc).timestamp() + 120
+        return httpx.Response(
+            200, json={**SCHEDULE, "current_time": datetime.fromtimestamp(server_now, timezone.utc).isoformat()}
+        )
+
+    monkeypatch.setattr(
+        backend_client,
+        "_backend_client",
+        BackendClient(api_url="http://backend.test", secret_key="secret", transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr(business_hours, "schedule_cache", ConfigCache("schedule", ttl=60, stale_ttl=0, negative_ttl=60))
+
+    first = await business_hours.get_org_schedule("user-1")
+    second = await business_hours.get_org_schedule("user-1")
+
+    assert first is second
+    assert len(requests) == 1
+    assert requests[0].url.params["user_id"] == "user-1"
+    assert first.clock_offset == pytest.approx(120, abs=5)
+
+
+def _install_backend(monkeypatch, handler) -> None:
+    monkeypatch.setattr(
+        backend_client,
+        "_backend_client",
+        BackendClient(api_url="http://backend.test", secret_key="secret", transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr(business_hours, "schedule_cache", ConfigCache("schedule", ttl=60, stale_ttl=0, negative_ttl=60))
+
+
+def _remote_handler(paths: list, schedule_status: int = 404):
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        if request.url.path == "/agent/is-org-open/schedule":
+            return httpx.Response(schedule_status, json=SCHEDULE)
+        if request.url.path == "/agent/is-org-open/time":
+            return httpx.Response(200, json={"current_time": "2026-10-12T09:30:00-04:00"})
+        return httpx.Response(200, json=True)
+
+    return handler
+
+
+def _ctx():
+    return SimpleNamespace(session=SimpleNamespace(function_context=FunctionContext("", "room", None, "user-1")))
+
+
+async def test_schedule_disabled_uses_remote_check_only(monkeypatch) -> None:
+    monkeypatch.delenv("BUSINESS_HOURS_SCHEDULE", raising=False)
+    paths = []
+    _install_backend(monkeypatch, _remote_handler(paths))
+
+    assert await DefaultTools().is_org_open(_ctx()) == "open"
+    assert paths == ["/agent/is-org-open/time", "/agent/is-org-open/check"]
+
+
+async def test_missing_schedule_endpoint_falls_back_to_remote_check(monkeypatch) -> None:
+    monkeypatch.setenv("BUSINESS_HOURS_SCHEDULE", "1")
+    paths = []
+    _install_backend(monkeypatch, _remote_handler(paths, schedule_status=404))
+
+    assert await DefaultTools().is_org_open(_ctx(), "2026-10-12T12:30:00") == "open"
+    assert await DefaultTools().is_org_open(_ctx(), "2026-10-12T12:30:00") == "open"
+    # the 404 is cached negatively, so only the first call asks for the schedule
+    assert paths == ["/agent/is-org-open/schedule", "/agent/is-org-open/check", "/agent/is-org-open/check"]
+
+
+async def test_enabled_schedule_answers_without_remote_check(monkeypatch) -> None:
+    monkeypatch.setenv("BUSINESS_HOURS_SCHEDULE", "1")
+    paths = []
+    _install_backend(monkeypatch, _remote_handler(paths, schedule_status=200))
+
+    assert await DefaultTools().is_org_open(_ctx(), "2026-10-12T12:30:00") == "closed"  # lunch break
+    assert paths == ["/agent/is-org-open/schedule"]
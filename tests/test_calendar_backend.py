@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import pytest
+from livekit.agents.voice import SpeechHandle
+
+from tools import appointment_tool, calendar_backend
+from tools.calendar_backend import CalendarBackend, CalendarRequestCancelled
+
+
+class FakeRequest:
+    def __init__(self, delay: float, result: dict) -> None:
+        self.delay = delay
+        self.result = result
+
+    def execute(self, http=None) -> dict:
+        # googleapiclient blocks the calling thread for the whole round trip
+        time.sleep(self.delay)
+        return self.result
+
+
+class FakeService:
+    """Mimics service.events().list/insert(...).execute()."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    def events(self) -> "FakeService":
+        return self
+
+    def list(self, **kwargs) -> FakeRequest:
+        return FakeRequest(self.delay, {"items": [{"id": "evt"}]})
+
+    def insert(self, calendarId: str, body: dict) -> FakeRequest:
+        return FakeRequest(self.delay, {"htmlLink": "https://calendar.test/evt"})
+
+
+def _backend(delay: float, timeout: float = 2.0) -> CalendarBackend:
+    return CalendarBackend(FakeService(delay), credentials=None, calendar_id="primary", timeout=timeout)
+
+
+async def test_calendar_calls_do_not_block_the_loop() -> None:
+    backend = _backend(delay=0.2)
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.ensure_future(ticker())
+    events = await backend.list_events("2026-01-01T10:00:00Z", "2026-01-01T10:30:00Z")
+    task.cancel()
+
+    assert events == [{"id": "evt"}]
+    assert ticks >= 10
+
+
+async def test_calendar_call_times_out() -> None:
+    backend = _backend(delay=0.5, timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await backend.insert_event({"summary": "x"})
+
+
+async def test_calendar_call_abandoned_on_interruption() -> None:
+    backend = _backend(delay=0.5)
+    speech_handle = SpeechHandle.create()
+
+    asyncio.get_running_loop().call_later(0.05, speech_handle.interrupt)
+    start = time.perf_counter()
+    with pytest.raises(CalendarRequestCancelled):
+        await backend.list_events("a", "b", speech_handle=speech_handle)
+
+    assert time.perf_counter() - start < 0.4
+
+
+def test_backend_is_built_once_per_calendar(monkeypatch) -> None:
+    """Tool construction reuses the process-wide service instead of rebuilding it."""
+    builds = []
+    monkeypatch.setattr(calendar_backend, "_backends", {})
+    monkeypatch.setattr(calendar_backend, "_load_credentials", lambda: object())
+    monkeypatch.setattr(calendar_backend, "build", lambda *args, **kwargs: builds.append(kwargs) or FakeService(0))
+
+    tools = [appointment_tool.AppointmentTools() for _ in range(3)]
+
+    assert len(builds) == 1
+    assert builds[0]["static_discovery"] is True
+    assert all(t._service is tools[0]._service for t in tools)
+    assert calendar_backend.get_calendar_backend("other") is not tools[0]._service
@@ -0,0 +1,116 @@
+import asyncio
+
+import httpx
+import pytest
+
+from agent_config import config_cache
+from agent_config.config_cache import ConfigCache
+
+
+class Loader:
+    """Counts backend fetches and returns a versioned value per key."""
+
+    def __init__(self, status_code: int = 200, delay: float = 0.0) -> None:
+        self.calls = 0
+        self.status_code = status_code
+        self.delay = delay
+
+    async def __call__(self, key: str):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.status_code != 200:
+            request = httpx.Request("GET", f"http://backend.test/agents/get/{key}")
+            response = httpx.Response(self.status_code, request=request)
+            raise httpx.HTTPStatusError("error", request=request, response=response)
+        return f"{key}-v{self.calls}"
+
+
+async def test_hit_within_ttl() -> None:
+    cache = ConfigCache("agent", ttl=60, stale_ttl=0, negative_ttl=0, max_size=8)
+    loader = Loader()
+
+    assert await cache.get("a", loader) == "a-v1"
+    assert await cache.get("a", loader) == "a-v1"
+
+    assert loader.calls == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+async def test_stale_entry_served_while_refreshing() -> None:
+    cache = ConfigCache("agent", ttl=0, stale_ttl=60, negative_ttl=0, max_size=8)
+    loader = Loader()
+
+    assert await cache.get("a", loader) == "a-v1"
+    # expired but within the stale window: old value now, refresh in background
+    assert await cache.get("a", loader) == "a-v1"
+    await asyncio.gather(*cache._refresh_tasks)
+
+    assert loader.calls == 2
+    assert cache.stats()["stale_hits"] == 1
+    assert cache.stats()["refreshes"] == 1
+    assert cache._entries["a"].value == "a-v2"
+
+
+async def test_not_found_is_cached_negatively() -> None:
+    cache = ConfigCache("agent", ttl=60, stale_ttl=0, negative_ttl=60, max_size=8)
+    loader = Loader(status_code=404)
+
+    assert await cache.get("missing", loader) is None
+    assert await cache.get("missing", loader) is None
+
+    assert loader.calls == 1
+    assert cache.stats()["negative_hits"] == 1
+
+
+async def test_server_errors_are_not_cached() -> None:
+    cache = ConfigCache("agent", ttl=60, stale_ttl=0, negative_ttl=60, max_size=8)
+    loader = Loader(status_code=503)
+
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            await cache.get("a", loader)
+
+    assert loader.calls == 2
+
+
+async def test_lru_eviction() -> None:
+    cache = ConfigCache("agent", ttl=60, stale_ttl=0, negative_ttl=0, max_size=2)
+    loader = Loader()
+
+    await cache.get("a", loader)
+    await cache.get("b", loader)
+    await cache.get("a", loader)  # a is now most recently used
+    await cache.get("c", loader)
+
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+
+
+async def test_concurrent_misses_share_one_fetch() -> None:
+    cache = ConfigCache("agent", ttl=60, stale_ttl=0, negative_ttl=0, max_size=8)
+    loader = Loader(delay=0.01)
+
+    results = await asyncio.gather(*(cache.get("a", loader) for _ in range(5)))
+
+    assert results == ["a-v1"] * 5
+    assert loader.calls == 1
+
+
+async def test_backend_invalidation(monkeypatch) -> None:
+    agents = ConfigCache("agent", ttl=60, stale_ttl=0, negative_ttl=0, max_size=8)
+    tools = ConfigCache("tool", ttl=60, stale_ttl=0, negative_ttl=0, max_size=8)
+    monkeypatch.setattr(config_cache, "agent_cache", agents)
+    monkeypatch.setattr(config_cache, "tool_cache", tools)
+    loader = Loader()
+
+    await agents.get("a", loader)
+    await tools.get("t", loader)
+    config_cache.handle_invalidation(b'{"agent_id": "a"}')
+
+    assert "a" not in agents._entries
+    assert "t" in tools._entries
+
+    config_cache.handle_invalidation('{"all": true}')
+    assert not tools._entries
@@ -0,0 +1,100 @@
+import statistics
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from tools import date_resolution
+from tools.date_resolution import resolve_date_range, resolve_datetime
+
+TORONTO = ZoneInfo("America/Toronto")
+# Friday morning, local time
+NOW = datetime(2026, 10, 16, 10, 0, tzinfo=TORONTO)
+
+
+@pytest.fixture(autouse=True)
+def appointment_timezone(monkeypatch):
+    monkeypatch.setenv("APPOINTMENT_TIMEZONE", "America/Toronto")
+    date_resolution.get_timezone.cache_clear()
+    date_resolution._resolve_cached.cache_clear()
+    yield
+    date_resolution.get_timezone.cache_clear()
+
+
+@pytest.mark.parametrize(
+    ("date_text", "time_text", "expected"),
+    [
+        ("tomorrow", "3 pm", datetime(2026, 10, 17, 15, 0)),
+        ("Tomorrow", "at 3:30 P.M.", datetime(2026, 10, 17, 15, 30)),
+        ("next Monday", "10am", datetime(2026, 10, 19, 10, 0)),
+        ("Friday", "2:00 PM", datetime(2026, 10, 23, 14, 0)),
+        ("this friday", "noon", datetime(2026, 10, 16, 12, 0)),
+        ("today", "at 3", datetime(2026, 10, 16, 15, 0)),
+        ("3 pm tomorrow", "", datetime(2026, 10, 17, 15, 0)),
+        ("Monday, October 26th", "2:00 PM", datetime(2026, 10, 26, 14, 0)),
+        ("tonight", "at 8", datetime(2026, 10, 16, 20, 0)),
+        ("tonight", "8:30", datetime(2026, 10, 16, 20, 30)),
+        ("the 20th", "", datetime(2026, 10, 20, 0, 0)),
+        ("the 20th", "at 3 pm", datetime(2026, 10, 20, 15, 0)),
+    ],
+)
+def test_resolves_spoken_forms(date_text, time_text, expected) -> None:
+    resolved = resolve_datetime(date_text, time_text, now=NOW)
+
+    assert resolved == expected.replace(tzinfo=TORONTO)
+    assert resolved.tzinfo.key == "America/Toronto"
+
+
+def test_dst_offset_follows_the_date() -> None:
+    """Toronto leaves daylight saving on Nov 1st 2026; offsets must differ."""
+    before = resolve_datetime("October 30", "9 am", now=NOW)
+    after = resolve_datetime("November 3", "9 am", now=NOW)
+
+    assert before.utcoffset() != after.utcoffset()
+
+
+def test_memo_is_keyed_on_reference_date() -> None:
+    first = resolve_datetime("tomorrow", "3 pm", now=NOW)
+    next_day = resolve_datetime("tomorrow", "3 pm", now=NOW.replace(day=17))
+
+    assert next_day.date() != first.date()
+    assert date_resolution.cache_info().misses == 2
+
+
+@pytest.mark.parametrize(("text", "day"), [("the 20th", 20), ("20th", 20), ("the 5th", 5)])
+def test_date_range_day_of_month(text, day) -> None:
+    """A bare day of the month is a date, never a clock hour today."""
+    start, end = resolve_date_range(text, now=NOW)
+
+    month = 10 if day >= NOW.day else 11
+    assert start == datetime(2026, month, day, tzinfo=TORONTO)
+    assert end - start == timedelta(days=1)
+
+
+def test_date_range_week() -> None:
+    start, end = resolve_date_range("next week", now=NOW)
+
+    assert start == datetime(2026, 10, 19, tzinfo=TORONTO)
+    assert end == datetime(2026, 10, 26, tzinfo=TORONTO)
+
+
+def test_parse_latency_benchmark() -> None:
+    """Micro-benchmark: cold dateparser vs fast path vs memo hit. Run with -s to see numbers."""
+
+    def median_us(fn, runs: int = 50) -> float:
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1e6)
+        return statistics.median(samples)
+
+    date_resolution.prewarm_date_parser()
+    dateparser_us = median_us(lambda: date_resolution._dateparser_parse("tomorrow at 3 pm", NOW.replace(tzinfo=None)))
+    fast_us = median_us(lambda: date_resolution._fast_path("tomorrow at 3 pm", NOW.date()))
+    memo_us = median_us(lambda: resolve_datetime("tomorrow", "3 pm", now=NOW))
+
+    print(f"\nparse latency (median): dateparser={dateparser_us:.0f}us fast_path={fast_us:.0f}us memo={memo_us:.0f}us")
+    assert fast_us < dateparser_us
+    assert memo_us < dateparser_us
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import pytest
+
+from tools import guarded_tool as guarded_tool_module
+from tools.defaut import default_tools
+from tools.defaut.default_tools import DefaultTools
+from tools.function_context import FunctionContext
+from tools.guarded_tool import get_breaker
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(guarded_tool_module, "_breakers", {})
+
+
+class _FailedTransfer(Exception):
+    metadata = {"sip_status_code": "486", "sip_status": "Busy Here"}
+
+
+def _livekit_api(transfer):
+    class _FakeLiveKitAPI:
+        sip = SimpleNamespace(transfer_sip_participant=transfer)
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    return _FakeLiveKitAPI
+
+
+def _ctx():
+    participant = SimpleNamespace(identity="caller")
+    return SimpleNamespace(session=SimpleNamespace(function_context=FunctionContext("", "room", participant, "user-1")))
+
+
+async def test_failed_transfer_is_reported_to_the_caller(monkeypatch) -> None:
+    async def transfer(request):
+        raise _FailedTransfer("transfer failed")
+
+    monkeypatch.setattr(default_tools, "LiveKitAPI", _livekit_api(transfer))
+
+    assert await DefaultTools().call_forward(_ctx()) == "Could not forward the call."
+    assert get_breaker("livekit").stats()["failures"] == 1
+
+
+async def test_successful_transfer(monkeypatch) -> None:
+    requests = []
+
+    async def transfer(request):
+        requests.append(request)
+
+    monkeypatch.setattr(default_tools, "LiveKitAPI", _livekit_api(transfer))
+
+    assert await DefaultTools().call_forward(_ctx()) == "Call forwarded successfully."
+    assert requests[0].participant_identity == "caller"
+    assert requests[0].room_name == "room"
@@ -0,0 +1,83 @@
+import contextlib
+import os
+from types import SimpleNamespace
+
+import pytest
+from livekit import rtc
+
+from agent_config.greeting_cache import GreetingCache
+
+
+class FakeTTS:
+    """Synthesizes 100ms of a constant sample per character."""
+
+    sample_rate = 16000
+    num_channels = 1
+
+    def __init__(self) -> None:
+        self.requests = []
+
+    @contextlib.asynccontextmanager
+    async def _stream(self, text: str):
+        async def frames():
+            for i, _ in enumerate(text):
+                samples = self.sample_rate // 10
+                yield SimpleNamespace(frame=rtc.AudioFrame(bytes([i % 100, 0]) * samples, self.sample_rate, 1, samples))
+
+        yield frames()
+
+    def synthesize(self, text: str):
+        self.requests.append(text)
+        return self._stream(text)
+
+
+async def _play(audio) -> bytes:
+    return b"".join([bytes(frame.data.cast("B")) async for frame in audio])
+
+
+@pytest.fixture
+def cache(tmp_path) -> GreetingCache:
+    return GreetingCache(directory=str(tmp_path))
+
+
+async def test_greeting_synthesized_once_then_served_from_disk(cache, tmp_path) -> None:
+    engine = FakeTTS()
+    session = SimpleNamespace(tts=engine)
+
+    first = await _play(cache.audio(session, "agent-1", "sonic:v1", "Hello!"))
+    second = await _play(cache.audio(session, "agent-1", "sonic:v1", "Hello!"))
+    # a new cache instance (another worker process) maps the same file
+    third = await _play(GreetingCache(directory=str(tmp_path)).audio(session, "agent-1", "sonic:v1", "Hello!"))
+
+    assert engine.requests == ["Hello!"]
+    assert first == second == third
+    assert len(first) == 6 * 1600 * 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["mapped_bytes"] > len(first)
+
+
+async def test_changed_greeting_or_voice_rebuilds_and_drops_old_entry(cache, tmp_path) -> None:
+    engine = FakeTTS()
+    session = SimpleNamespace(tts=engine)
+
+    await _play(cache.audio(session, "agent-1", "sonic:v1", "Hello!"))
+    await _play(cache.audio(session, "agent-1", "sonic:v2", "Hello!"))
+    await _play(cache.audio(session, "agent-1", "sonic:v2", "Welcome back"))
+    await _play(cache.audio(session, "agent-2", "sonic:v2", "Hello!"))
+
+    assert engine.requests == ["Hello!", "Hello!", "Welcome back", "Hello!"]
+    assert sorted(name.split("=")[0] for name in os.listdir(tmp_path)) == ["agent-1", "agent-2"]
+
+
+async def test_interrupted_synthesis_leaves_no_entry(cache, tmp_path) -> None:
+    session = SimpleNamespace(tts=FakeTTS())
+
+    audio = cache.audio(session, "agent-1", "sonic:v1", "Hello!")
+    await audio.__anext__()
+    await audio.aclose()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_sessions_without_tts_fall_back(cache) -> None:
+    assert cache.audio(SimpleNamespace(tts=None), "agent-1", "alloy", "Hello!") is None
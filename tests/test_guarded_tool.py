@@ -0,0 +1,108 @@
+import asyncio
+import contextlib
+
+import pytest
+from livekit.agents import RunContext
+from prometheus_client import REGISTRY
+
+from tools import guarded_tool as guarded_tool_module
+from tools.guarded_tool import CircuitBreaker, get_breaker, guarded_tool
+
+
+class FakeContext(RunContext):
+    """Just enough of RunContext for the guard: with_filler runs the source after `delay`."""
+
+    def __init__(self) -> None:
+        self.fillers = []
+
+    @contextlib.asynccontextmanager
+    async def with_filler(self, source, *, delay=0, interval=None, max_steps=None):
+        async def fire():
+            await asyncio.sleep(delay)
+            self.fillers.append(source(0))
+
+        task = asyncio.ensure_future(fire())
+        try:
+            yield
+        finally:
+            task.cancel()
+
+    @property
+    def session(self):
+        return type("Session", (), {"tts": object()})()
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(guarded_tool_module, "_breakers", {})
+
+
+class Tools:
+    def __init__(self, delay: float = 0, error: Exception = None) -> None:
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    @guarded_tool(dependency="calendar", budget=0.02, timeout=0.2, filler="One moment.", error_message="failed", timeout_message="too slow", unavailable_message="down")
+    async def lookup(self, ctx: RunContext, day: str) -> str:
+        """Look something up."""
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return f"ok {day}"
+
+
+async def test_fast_call_passes_through_without_filler() -> None:
+    ctx = FakeContext()
+
+    assert await Tools().lookup(ctx, "monday") == "ok monday"
+    assert ctx.fillers == []
+    assert Tools.lookup.info.name == "lookup"
+    assert Tools.lookup.info.description == "Look something up."
+
+
+async def test_slow_call_gets_filler_then_times_out() -> None:
+    ctx = FakeContext()
+    before = REGISTRY.get_sample_value("voice_agent_tool_calls_total", {"tool": "lookup", "outcome": "timeout"}) or 0
+
+    assert await Tools(delay=0.05).lookup(ctx, "monday") == "ok monday"
+    assert ctx.fillers == ["One moment."]
+
+    assert await Tools(delay=1).lookup(FakeContext(), "monday") == "too slow"
+    assert REGISTRY.get_sample_value("voice_agent_tool_calls_total", {"tool": "lookup", "outcome": "timeout"}) == before + 1
+
+
+async def test_errors_open_the_shared_breaker(monkeypatch) -> None:
+    monkeypatch.setattr(guarded_tool_module, "_breakers", {"calendar": CircuitBreaker("calendar", failure_threshold=2, reset_timeout=60)})
+    failing = Tools(error=RuntimeError("calendar down"))
+
+    assert await failing.lookup(FakeContext(), "monday") == "failed"
+    assert await failing.lookup(FakeContext(), "monday") == "failed"
+
+    # another session's tools share the breaker and are not even called
+    healthy = Tools()
+    assert await healthy.lookup(FakeContext(), "monday") == "down"
+    assert healthy.calls == 0
+    assert get_breaker("calendar").stats()["state"] == "open"
+
+
+def test_breaker_half_open_probe(monkeypatch) -> None:
+    breaker = CircuitBreaker("backend", failure_threshold=1, reset_timeout=10)
+    clock = [100.0]
+    monkeypatch.setattr(guarded_tool_module.time, "monotonic", lambda: clock[0])
+
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock[0] += 10
+    assert breaker.allow()  # single probe
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock[0] += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
@@ -0,0 +1,131 @@
+import gzip
+import json
+import statistics
+import time
+
+import httpx
+import pytest
+from livekit.agents import llm
+from livekit.agents.voice.events import FunctionToolsExecutedEvent
+
+from agent_config import backend_client
+from agent_config.backend_client import BackendClient
+from agent_config.get_agent import create_history
+from agent_config.history_codec import (
+    FORMAT_VERSION,
+    decode_conversation,
+    encode_body,
+    encode_conversation,
+)
+
+
+def _conversation(turns: int = 100) -> list:
+    """A long call in the shape TranscriptRecorder writes (model_dump of session events)."""
+    conversation = []
+    for i in range(turns):
+        conversation.append(llm.ChatMessage(role="user", content=[f"Can I book something around {i % 12 + 1} pm on Friday?"]).model_dump())
+        if i % 3 == 0:
+            call = llm.FunctionCall(call_id=f"c{i}", name="check_availability", arguments=json.dumps({"date": "friday", "time": f"{i % 12 + 1} pm"}))
+            output = llm.FunctionCallOutput(call_id=f"c{i}", name="check_availability", output="The requested time slot is available.", is_error=False)
+            conversation.append(FunctionToolsExecutedEvent(function_calls=[call], function_call_outputs=[output]).model_dump())
+        conversation.append(llm.ChatMessage(role="assistant", content=["That time is available. Shall I book it for you?"], interrupted=i % 10 == 0).model_dump())
+    return conversation
+
+
+def test_round_trip_keeps_what_history_needs() -> None:
+    conversation = _conversation(turns=4)
+    compact = encode_conversation(conversation)
+    decoded = decode_conversation(json.loads(json.dumps(compact)))
+
+    assert compact["v"] == FORMAT_VERSION
+    assert len(decoded) == len(conversation)
+    for original, item in zip(conversation, decoded):
+        assert item["type"] == original["type"]
+        assert item["created_at"] == pytest.approx(original["created_at"], abs=1e-3)
+        if original["type"] == "message":
+            assert (item["role"], item["content"], item["interrupted"]) == (original["role"], original["content"], original["interrupted"])
+        else:
+            assert item["function_calls"][0]["name"] == "check_availability"
+            assert json.loads(item["function_calls"][0]["arguments"]) == json.loads(original["function_calls"][0]["arguments"])
+            assert item["function_call_outputs"][0]["output"] == original["function_call_outputs"][0]["output"]
+            assert "id" not in item["function_calls"][0]
+
+
+def test_unknown_items_and_raw_payloads_pass_through() -> None:
+    handoff = {"type": "agent_handoff", "old_agent_id": None, "new_agent_id": "a", "created_at": 1.0}
+
+    assert decode_conversation(encode_conversation([handoff])) == [handoff]
+    assert decode_conversation([handoff]) == [handoff]
+    with pytest.raises(ValueError):
+        decode_conversation({"v": FORMAT_VERSION + 1, "items": []})
+
+
+def test_encode_body_compression() -> None:
+    record = {"agent_id": "a", "conversation": _conversation(turns=5)}
+
+    plain, headers = encode_body(record)
+    assert "Content-Encoding" not in headers
+    assert json.loads(plain) == json.loads(json.dumps(record))
+
+    packed, headers = encode_body(record, "gzip")
+    assert headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(packed) == plain
+
+    with pytest.raises(ValueError):
+        encode_body(record, "brotli")
+
+
+async def test_create_history_uses_configured_format(monkeypatch) -> None:
+    bodies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append((request.headers, request.content))
+        return httpx.Response(200, json={})
+
+    monkeypatch.setattr(
+        backend_client,
+        "_backend_client",
+        BackendClient(api_url="http://backend.test", secret_key="secret", transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setenv("HISTORY_FORMAT", "compact")
+    monkeypatch.setenv("HISTORY_ENCODING", "gzip")
+
+    assert await create_history({"agent_id": "a", "conversation": _conversation(turns=2)}, idempotency_key="job-1")
+
+    [(headers, content)] = bodies
+    assert headers["Content-Encoding"] == "gzip"
+    assert headers["Idempotency-Key"] == "job-1"
+    sent = json.loads(gzip.decompress(content))
+    assert sent["conversation"]["v"] == FORMAT_VERSION
+    assert decode_conversation(sent["conversation"])[0]["content"] == ["Can I book something around 1 pm on Friday?"]
+
+
+def test_payload_size_benchmark() -> None:
+    """Size and serialization time of raw vs compact history. Run with -s to see numbers."""
+    record = {"agent_id": "a", "duration": 600, "summary": None, "conversation": _conversation()}
+
+    def median_ms(fn, runs: int = 10) -> float:
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
+
+    def compact_record():
+        return {**record, "conversation": encode_conversation(record["conversation"])}
+
+    raw = json.dumps(record, default=str).encode()
+    compact, _ = encode_body(compact_record())
+    compact_gzip, _ = encode_body(compact_record(), "gzip")
+
+    raw_ms = median_ms(lambda: json.dumps(record, default=str).encode())
+    compact_ms = median_ms(lambda: encode_body(compact_record()))
+    gzip_ms = median_ms(lambda: encode_body(compact_record(), "gzip"))
+
+    print(
+        f"\nhistory payload: raw={len(raw)}B/{raw_ms:.2f}ms "
+        f"compact={len(compact)}B/{compact_ms:.2f}ms compact+gzip={len(compact_gzip)}B/{gzip_ms:.2f}ms"
+    )
+    assert len(compact) < len(raw) / 2
+    assert len(compact_gzip) < len(compact) / 4
@@ -0,0 +1,77 @@
+import sqlite3
+
+from agent_config.history_spool import HistorySpool
+
+
+class Uploader:
+    """Fails the first `failures` attempts, then accepts everything."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.calls = []
+
+    async def __call__(self, record: dict, idempotency_key: str) -> bool:
+        self.calls.append((record["agent_id"], idempotency_key))
+        if self.failures > 0:
+            self.failures -= 1
+            return False
+        return True
+
+
+def _spool(directory, uploader, **kwargs) -> HistorySpool:
+    return HistorySpool(directory=str(directory), uploader=uploader, max_backoff=0.001, **kwargs)
+
+
+async def test_enqueued_records_are_uploaded_and_removed(tmp_path) -> None:
+    uploader = Uploader()
+    spool = _spool(tmp_path, uploader, batch_size=2)
+
+    for i in range(5):
+        await spool.enqueue({"agent_id": f"a{i}"})
+    assert spool.depth == 5
+
+    assert await spool.drain() == 5
+    assert spool.stats()["queue_depth"] == 0
+    assert [agent for agent, _ in uploader.calls] == [f"a{i}" for i in range(5)]
+
+
+async def test_failed_upload_is_retried_with_same_idempotency_key(tmp_path) -> None:
+    uploader = Uploader(failures=1)
+    spool = _spool(tmp_path, uploader)
+
+    key = await spool.enqueue({"agent_id": "a"}, idempotency_key="job-1")
+    assert await spool.drain() == 0
+    assert spool.depth == 1
+
+    # backoff is capped at 1ms in this test
+    with sqlite3.connect(spool.path) as db:
+        db.execute("UPDATE pending SET next_attempt_at = 0")
+    assert await spool.drain() == 1
+
+    assert key == "job-1"
+    assert uploader.calls == [("a", "job-1"), ("a", "job-1")]
+    assert spool.stats()["failed_attempts"] == 1
+
+
+async def test_pending_records_survive_restart(tmp_path) -> None:
+    crashed = _spool(tmp_path, Uploader())
+    await crashed.enqueue({"agent_id": "a"})
+    # a worker that dies mid-upload leaves the record claimed
+    assert len(crashed._claim()) == 1
+
+    uploader = Uploader()
+    assert await _spool(tmp_path, uploader, lease=60).drain() == 0
+
+    restarted = _spool(tmp_path, uploader, lease=0.001)
+    assert await restarted.drain() == 1
+    assert uploader.calls[0][0] == "a"
+
+
+async def test_record_parked_after_max_attempts(tmp_path) -> None:
+    spool = _spool(tmp_path, Uploader(failures=10), max_attempts=1)
+
+    await spool.enqueue({"agent_id": "a"})
+    await spool.drain()
+
+    assert spool.stats()["dead"] == 1
+    assert spool.stats()["queue_depth"] == 0
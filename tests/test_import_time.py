@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# seconds `import agent` may add on top of livekit.agents in a fresh interpreter
+BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "0.5"))
+
+# loaded by the features that need them, never by importing the entry module
+LAZY_MODULES = (
+    "dateparser",
+    "googleapiclient",
+    "google.oauth2",
+    "httplib2",
+    "livekit.plugins.openai",
+    "livekit.plugins.silero",
+    "livekit.plugins.noise_cancellation",
+    "livekit.plugins.turn_detector",
+)
+
+PROBE = f"""
+import json, sys, time
+import livekit.agents
+started = time.perf_counter()
+import agent
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def _cold_import() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=SRC,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["slowest"] = _slowest(result.stderr)
+    return report
+
+
+def _slowest(importtime: str, limit: int = 8) -> list:
+    # only what `import agent` pulled in: the lines after livekit.agents' own top-level entry
+    lines = importtime.splitlines()
+    start = next((i for i, line in enumerate(lines) if line.rstrip().endswith("| livekit.agents")), -1)
+    rows = []
+    for line in lines[start + 1:]:
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].strip()))
+    return [f"{name} {us / 1000:.0f}ms" for us, name in sorted(rows, reverse=True)[:limit]]
+
+
+def test_entry_module_cold_import_stays_within_budget() -> None:
+    # up to three tries: a single cold run also measures the machine's disk cache
+    best = _cold_import()
+    for _ in range(2):
+        if best["seconds"] <= BUDGET:
+            break
+        best = min(best, _cold_import(), key=lambda run: run["seconds"])
+
+    assert best["loaded"] == [], f"imported eagerly: {best['loaded']}"
+    assert best["seconds"] <= BUDGET, (
+        f"`import agent` took {best['seconds']:.3f}s (budget {BUDGET}s); slowest: {best['slowest']}"
+    )
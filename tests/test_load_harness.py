@@ -0,0 +1,65 @@
+import json
+import gzip
+
+import pytest
+
+from agent_config.history_codec import decode_conversation
+from load_harness import LoadBudget, LoadConfig, find_max_concurrency, offline_stack, percentile, run_level
+
+# a fast call: quick stand-ins, short speech, quick playout, little thinking
+FAST = LoadConfig(
+    turns=2,
+    stt_delay=0.02,
+    llm_ttft=0.05,
+    tts_ttfb=0.05,
+    calendar_latency=0.02,
+    user_speech=0.2,
+    think_time=0.05,
+    min_endpointing_delay=0.1,
+    playout_speed=50,
+    ramp=0.2,
+)
+
+
+def test_percentile_nearest_rank() -> None:
+    values = [0.1 * i for i in range(1, 101)]
+
+    assert percentile(values, 50) == pytest.approx(5.0)
+    assert percentile(values, 95) == pytest.approx(9.5)
+    assert percentile([0.3], 99) == 0.3
+    assert percentile([], 50) is None
+
+
+async def test_sessions_run_end_to_end_against_local_stand_ins() -> None:
+    async with offline_stack(FAST) as stack:
+        report = await run_level(stack, 4)
+        histories = [json.loads(_decode(body)) for body in stack.backend.histories]
+
+    assert report.completed == 4, report.errors
+    assert report.greeting["p95"] is not None
+    assert len(histories) == 4
+    # the agent config is fetched once and then served from the config cache
+    assert stack.backend.requests["agents"] == 1
+    # every call asked the calendar through the tool and heard the answer
+    for history in histories:
+        outputs = [
+            output["output"]
+            for item in decode_conversation(history["conversation"])
+            if item["type"] == "function_tools_executed"
+            for output in item["function_call_outputs"]
+        ]
+        assert outputs and "available" in outputs[0]
+    assert report.turn["p50"] is not None
+    assert report.memory_per_session >= 0
+
+
+async def test_concurrency_search_stops_at_the_first_level_over_budget() -> None:
+    reports, max_sustainable = await find_max_concurrency([2, 4], FAST, LoadBudget(turn_p95=0.01))
+
+    assert max_sustainable == 0
+    assert [report.sessions for report in reports] == [2]
+    assert "2" in reports[0].line()
+
+
+def _decode(body: bytes) -> bytes:
+    return gzip.decompress(body) if body[:2] == b"\x1f\x8b" else body
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import threading
+
+from agent_config.log_pipeline import LogPipeline, LogSampler, Redactor, bind_log_context, fingerprint
+
+
+class _Capture(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        record.thread_name = threading.current_thread().name
+        self.records.append(record)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _record(name: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, "message", None, None)
+
+
+def test_redactor_masks_secrets() -> None:
+    redact = Redactor(environ={"API_SECRET_KEY": "backend-secret-value", "HOME": "/home/agent"})
+    redact.add("sk-agent-api-key")
+
+    assert redact("key backend-secret-value used") == "key [REDACTED] used"
+    assert redact("agent key sk-agent-api-key") == "agent key [REDACTED]"
+    assert redact("api_key=abc123 user=1") == "api_key=[REDACTED] user=1"
+    assert redact('{"token": "xyz"}') == '{"token": "[REDACTED]"}'
+    assert redact("Authorization: Bearer abc.def") == "Authorization: [REDACTED]"
+    assert redact("prompt_tokens=12 home /home/agent") == "prompt_tokens=12 home /home/agent"
+
+
+def test_fingerprint_identifies_prompts_without_revealing_them() -> None:
+    prompt = "You are a helpful receptionist."
+
+    assert fingerprint(prompt) == fingerprint(prompt)
+    assert fingerprint(prompt) != fingerprint(prompt + " Be brief.")
+    assert "receptionist" not in fingerprint(prompt)
+    assert fingerprint(None) == "empty"
+
+
+def test_sampler_keeps_a_fraction_of_info_but_every_warning() -> None:
+    sampler = LogSampler(sample_rates={"chatty": 0.25}, rate_limits={})
+
+    kept = [sampler.filter(_record("chatty.sub")) for _ in range(8)]
+    warnings = [sampler.filter(_record("chatty", logging.WARNING)) for _ in range(3)]
+
+    assert kept.count(True) == 2
+    assert all(warnings)
+    assert sampler.stats()["sampled_out"] == 6
+
+
+def test_rate_limit_suppresses_floods_and_reports_the_count() -> None:
+    clock = _Clock()
+    sampler = LogSampler(sample_rates={}, rate_limits={"*": 2}, clock=clock)
+
+    kept = [sampler.filter(_record("flood")) for _ in range(5)]
+    assert kept == [True, True, False, False, False]
+    # errors are never dropped
+    assert sampler.filter(_record("flood", logging.ERROR))
+
+    clock.now = 1.0
+    record = _record("flood")
+    assert sampler.filter(record)
+    assert record.suppressed == 3
+    assert sampler.stats()["by_logger"] == {"flood": 3}
+
+
+async def test_records_are_handled_off_the_loop_with_job_fields() -> None:
+    root = logging.getLogger("log-pipeline-test")
+    root.propagate = False
+    capture = _Capture()
+    root.addHandler(capture)
+    pipeline = LogPipeline(sampler=LogSampler(sample_rates={}, rate_limits={}), redactor=Redactor(environ={}))
+    pipeline.redactor.add("sk-agent-api-key")
+    assert pipeline.install(root)
+
+    async def job() -> None:
+        bind_log_context(room="room-1", session="job-1")
+        bind_log_context(agent="agent-1")
+        root.warning("agent key %s", "sk-agent-api-key")
+
+    try:
+        await asyncio.create_task(job())
+        assert pipeline.flush(1.0)
+    finally:
+        pipeline.stop()
+        root.removeHandler(capture)
+
+    record = capture.records[0]
+    assert record.getMessage() == "agent key [REDACTED]"
+    assert (record.room, record.agent, record.session) == ("room-1", "agent-1", "job-1")
+    assert record.thread_name != threading.current_thread().name
+    # stop() puts the original handlers back
+    assert root.handlers == []
+
+
+def test_full_queue_drops_instead_of_blocking() -> None:
+    root = logging.getLogger("log-pipeline-full")
+    root.propagate = False
+    blocker = threading.Event()
+
+    class _Slow(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            blocker.wait(1)
+
+    slow = _Slow()
+    root.addHandler(slow)
+    pipeline = LogPipeline(queue_size=2, sampler=LogSampler(sample_rates={}, rate_limits={}))
+    pipeline.install(root)
+    try:
+        for _ in range(10):
+            root.warning("busy")
+        assert pipeline.stats()["dropped"] > 0
+    finally:
+        blocker.set()
+        pipeline.stop()
+        root.removeHandler(slow)
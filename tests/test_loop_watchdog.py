@@ -0,0 +1,71 @@
+import asyncio
+import os
+import time
+import traceback
+
+from agent_config import loop_watchdog
+from agent_config.loop_watchdog import LoopWatchdog, culprit_of, start_loop_watchdog
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+
+
+def slow_tool() -> None:
+    # a synchronous client call made straight from a tool
+    time.sleep(0.3)
+
+
+async def test_stall_is_attributed_to_the_blocking_function_and_room() -> None:
+    watchdog = LoopWatchdog(threshold=0.1, interval=0.02, roots=(TESTS,))
+    watchdog.start()
+    watchdog.watch("room-a")
+    try:
+        await asyncio.sleep(0.05)
+        slow_tool()
+        await asyncio.sleep(0.1)
+    finally:
+        await watchdog.aclose()
+
+    assert watchdog.count == 1
+    stall = watchdog.recent[0]
+    assert stall.culprit.startswith("test_loop_watchdog.slow_tool")
+    assert stall.rooms == ("room-a",)
+    assert 0.15 < stall.duration < 1.0
+    stats = watchdog.stats()
+    assert stats["stalls"] == 1
+    assert stats["rooms"] == {"room-a": 1}
+    assert stats["worst_ms"] >= 150
+
+
+async def test_short_callbacks_are_not_reported() -> None:
+    watchdog = LoopWatchdog(threshold=0.2, interval=0.02, roots=(TESTS,))
+    watchdog.start()
+    try:
+        for _ in range(5):
+            time.sleep(0.03)
+            await asyncio.sleep(0.01)
+    finally:
+        await watchdog.aclose()
+
+    assert watchdog.stats()["stalls"] == 0
+
+
+def test_culprit_names_own_code_and_the_library_it_called() -> None:
+    frames = [
+        _frame("/venv/lib/python3.11/site-packages/livekit/agents/llm/tool_context.py", "execute"),
+        _frame(f"{TESTS}/tools/appointment_tool.py", "check_availability"),
+        _frame("/venv/lib/python3.11/site-packages/googleapiclient/http.py", "execute"),
+    ]
+
+    assert culprit_of(frames, (TESTS,)) == "tools.appointment_tool.check_availability -> googleapiclient.http"
+    assert culprit_of(frames[:1], (TESTS,)) == "livekit.agents.llm.tool_context"
+
+
+def test_disabled_by_default(monkeypatch) -> None:
+    monkeypatch.delenv("LOOP_WATCHDOG", raising=False)
+    monkeypatch.setattr(loop_watchdog, "_watchdog", None)
+
+    assert start_loop_watchdog("room") is None
+
+
+def _frame(filename: str, name: str):
+    return traceback.FrameSummary(filename, 1, name, line="")
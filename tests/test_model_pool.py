@@ -0,0 +1,70 @@
+import asyncio
+
+from agent_config.model_pool import ModelPool, ModelSet, PoolKey
+
+
+class Client:
+    def __init__(self) -> None:
+        self.prewarmed = 0
+        self.closed = False
+
+    def prewarm(self) -> None:
+        self.prewarmed += 1
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def _key(name: str) -> PoolKey:
+    return PoolKey("custom", "voice", "", name)
+
+
+async def test_checkout_builds_and_prewarms_once() -> None:
+    pool = ModelPool(max_size=4, idle_ttl=60)
+    builds = []
+
+    def factory() -> ModelSet:
+        builds.append(1)
+        return ModelSet(stt=Client(), llm=Client(), tts=Client())
+
+    first = pool.checkout(_key("m"), factory)
+    second = pool.checkout(_key("m"), factory)
+
+    assert len(builds) == 1
+    assert not first.warm and second.warm
+    assert second.models is first.models
+    assert first.models.tts.prewarmed == 1
+    assert pool.stats() == {"size": 1, "in_use": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+
+async def test_idle_entries_are_evicted_and_closed() -> None:
+    clock = [1000.0]
+    pool = ModelPool(max_size=4, idle_ttl=60, clock=lambda: clock[0])
+
+    busy = pool.checkout(_key("busy"), lambda: ModelSet(llm=Client()))
+    idle = pool.checkout(_key("idle"), lambda: ModelSet(llm=Client()))
+    idle.release()
+    idle.release()  # releasing twice is harmless
+
+    clock[0] += 61
+    pool.checkout(_key("other"), lambda: ModelSet(llm=Client()))
+    await asyncio.sleep(0.01)
+
+    assert pool.stats()["evictions"] == 1
+    assert idle.models.llm.closed
+    assert not busy.models.llm.closed
+
+
+async def test_max_size_evicts_least_recently_used_idle_entry() -> None:
+    pool = ModelPool(max_size=2, idle_ttl=600)
+
+    a = pool.checkout(_key("a"), lambda: ModelSet(llm=Client()))
+    b = pool.checkout(_key("b"), lambda: ModelSet(llm=Client()))
+    a.release()
+    b.release()
+    pool.checkout(_key("a"), lambda: ModelSet(llm=Client()))  # a becomes most recently used
+    pool.checkout(_key("c"), lambda: ModelSet(llm=Client()))
+
+    assert pool.stats()["size"] == 2
+    assert pool.checkout(_key("a"), lambda: ModelSet(llm=Client())).warm
+    assert not pool.checkout(_key("b"), lambda: ModelSet(llm=Client())).warm
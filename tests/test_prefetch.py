@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, time, timedelta
+from types import SimpleNamespace
+
+from test_availability import FakeCalendar
+
+from tools import availability, prefetch
+from tools.date_resolution import get_timezone
+from tools.function_context import FunctionContext
+from tools.prefetch import SessionPrefetcher, record_lookup
+
+
+def _patch(monkeypatch, calendar, schedules) -> None:
+    async def fake_schedule(user_id):
+        schedules.append(user_id)
+
+    monkeypatch.setenv("BUSINESS_HOURS_SCHEDULE", "1")
+    monkeypatch.setattr(availability, "_indexes", {})
+    monkeypatch.setattr(prefetch, "get_calendar_backend", lambda: calendar)
+    monkeypatch.setattr(prefetch, "get_org_schedule", fake_schedule)
+
+
+async def test_prefetch_warms_today_and_tomorrow(monkeypatch) -> None:
+    calendar, schedules = FakeCalendar([]), []
+    _patch(monkeypatch, calendar, schedules)
+
+    prefetcher = SessionPrefetcher(["is_org_open", "check_availability"], user_id="user-1", refresh_interval=0)
+    prefetcher.start()
+    await prefetcher._task
+
+    assert len(calendar.queries) == 1
+    assert schedules == ["user-1"]
+
+    tomorrow = datetime.combine(datetime.now(get_timezone()).date() + timedelta(days=1), time(15), get_timezone())
+    index = availability.get_busy_index(calendar)
+    assert index.is_warm(tomorrow, tomorrow + timedelta(minutes=30))
+    assert not index.is_warm(tomorrow + timedelta(days=2), tomorrow + timedelta(days=2, minutes=30))
+
+
+async def test_only_prefetches_for_registered_tools(monkeypatch) -> None:
+    calendar, schedules = FakeCalendar([]), []
+    _patch(monkeypatch, calendar, schedules)
+
+    prefetcher = SessionPrefetcher(["hangup_call", "is_org_open"], user_id="user-1")
+    assert prefetcher.calendar is None
+    prefetcher.start()
+    await prefetcher._task
+
+    assert calendar.queries == []
+    assert schedules == ["user-1"]
+    assert not SessionPrefetcher(["hangup_call"], user_id="user-1").enabled
+
+    monkeypatch.delenv("BUSINESS_HOURS_SCHEDULE")
+    assert not SessionPrefetcher(["is_org_open"], user_id="user-1").enabled
+
+
+async def test_refresh_keeps_availability_warm(monkeypatch) -> None:
+    calendar, schedules = FakeCalendar([]), []
+    _patch(monkeypatch, calendar, schedules)
+
+    prefetcher = SessionPrefetcher(["find_available_slots"], refresh_interval=0.01)
+    availability.get_busy_index(calendar).ttl = 0  # every pass finds the days expired
+    prefetcher.start()
+    await asyncio.sleep(0.05)
+    await prefetcher.aclose()
+
+    assert len(calendar.queries) > 1
+
+
+def test_hit_rate_reporting() -> None:
+    prefetcher = SessionPrefetcher([])
+    ctx = SimpleNamespace(session=SimpleNamespace(function_context=FunctionContext("", "", None, "", prefetcher=prefetcher)))
+
+    record_lookup(ctx, "availability", True)
+    record_lookup(ctx, "availability", True)
+    record_lookup(ctx, "availability", False)
+    record_lookup(ctx, "schedule", True)
+    # sessions without a prefetcher are ignored
+    record_lookup(SimpleNamespace(session=SimpleNamespace()), "schedule", False)
+
+    stats = prefetcher.stats()
+    assert stats["hit_rate"] == {"availability": 0.667, "schedule": 1.0}
+    assert stats["overall_hit_rate"] == 0.75
@@ -0,0 +1,131 @@
+import asyncio
+import sys
+import textwrap
+
+import pytest
+
+from agent_config.get_agent import Agent, AgentTool
+from tools.registry import BUILTIN_PROVIDERS, ToolProvider, ToolRegistry
+
+PLUGIN = textwrap.dedent(
+    """
+    import time
+
+    built = []
+
+    class SmsTools:
+        def __init__(self):
+            time.sleep(0.05)
+            built.append(self)
+
+        async def send_sms(self, ctx):
+            return "sent"
+
+    def prewarm():
+        return "warm"
+    """
+)
+
+SMS = ToolProvider(
+    name="sms",
+    target="sms_tools_plugin:SmsTools",
+    tools=("send_sms",),
+    config_keys=("agent.tool_id", "tools.sms_tool"),
+    prewarm=("sms_tools_plugin:prewarm",),
+)
+
+
+@pytest.fixture
+def plugin(tmp_path, monkeypatch):
+    (tmp_path / "sms_tools_plugin.py").write_text(PLUGIN)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield
+    sys.modules.pop("sms_tools_plugin", None)
+
+
+def _tool_config(**flags) -> AgentTool:
+    return AgentTool(id="tool-1", name="tools", appointment_tool=flags.pop("appointment_tool", False), user_id="user-1", created_at="", config=flags)
+
+
+def _loader(config, fetched: list):
+    async def load(tool_id: str):
+        fetched.append(tool_id)
+        return config
+
+    return load
+
+
+def _names(tools) -> list:
+    return [tool.__name__ for tool in tools]
+
+
+async def test_builtin_providers_follow_the_agent_config() -> None:
+    registry = ToolRegistry()
+    fetched = []
+
+    tools = await registry.tools_for(Agent(id="a", user_id="user-1", tool_id="tool-1"), _loader(_tool_config(appointment_tool=True), fetched))
+
+    assert _names(tools) == [
+        "is_org_open", "call_forward", "hangup_call", "check_availability", "find_available_slots", "book_appointment",
+    ]
+    assert fetched == ["tool-1"]
+    assert _names(await registry.tools_for(Agent(id="b", user_id="user-1", tool_id="tool-1"), _loader(_tool_config(), []))) == [
+        "is_org_open", "call_forward", "hangup_call",
+    ]
+
+
+async def test_tool_config_is_fetched_only_when_a_provider_needs_it() -> None:
+    registry = ToolRegistry(providers=BUILTIN_PROVIDERS[:1])
+    fetched = []
+
+    tools = await registry.tools_for(Agent(id="a", user_id="user-1", tool_id="tool-1"), _loader(_tool_config(), fetched))
+
+    assert _names(tools) == ["is_org_open", "call_forward", "hangup_call"]
+    assert fetched == []
+
+
+async def test_providers_are_imported_only_when_enabled_and_built_once(plugin) -> None:
+    registry = ToolRegistry(providers=(SMS,))
+    agent = Agent(id="a", tool_id="tool-1")
+
+    assert await registry.tools_for(agent, _loader(_tool_config(), [])) == []
+    assert "sms_tools_plugin" not in sys.modules
+
+    enabled = _loader(_tool_config(sms_tool=True), [])
+    first, second = await asyncio.gather(registry.tools_for(agent, enabled), registry.tools_for(agent, enabled))
+    third = await registry.tools_for(agent, enabled)
+
+    assert _names(first) == _names(second) == _names(third) == ["send_sms"]
+    assert len(sys.modules["sms_tools_plugin"].built) == 1
+    stats = registry.stats()["sms"]
+    assert stats["loaded"] and stats["sessions"] == 3 and stats["load_s"] >= 0.05
+
+
+async def test_failed_tool_config_fetch_keeps_agent_level_tools() -> None:
+    registry = ToolRegistry()
+
+    async def failing(tool_id: str):
+        raise RuntimeError("backend down")
+
+    tools = await registry.tools_for(Agent(id="a", user_id="user-1", tool_id="tool-1"), failing)
+
+    assert _names(tools) == ["is_org_open", "call_forward", "hangup_call"]
+
+
+def test_prewarm_runs_selected_hooks(plugin, monkeypatch) -> None:
+    registry = ToolRegistry(providers=(SMS,))
+
+    monkeypatch.setenv("TOOL_PREWARM", "sms")
+    assert registry.prewarm() == {"sms_tools_plugin:prewarm": "warm"}
+
+    monkeypatch.setenv("TOOL_PREWARM", "")
+    assert registry.prewarm() == {}
+
+
+def test_provider_declarations_are_validated() -> None:
+    with pytest.raises(ValueError):
+        ToolProvider(name="x", target="module.Class", tools=())
+    with pytest.raises(ValueError):
+        ToolProvider(name="x", target="module:Class", tools=(), config_keys=("user_id",))
+    with pytest.raises(ValueError):
+        ToolProvider(name="x", target="module:Class", tools=(), warmup="eager")
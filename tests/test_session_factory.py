@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+
+import pytest
+from livekit import rtc
+from livekit.plugins import openai, silero
+from livekit.plugins.turn_detector import multilingual
+
+from agent_config import session_factory
+from agent_config.get_agent import Agent
+from agent_config.model_registry import ModelRegistry
+from agent_config.tts_cache import CachingTTS
+
+
+@pytest.fixture
+def load_counts(monkeypatch) -> dict:
+    """Replace model loading with counters so tests run without model files."""
+    counts = {"vad": 0, "turn_detector": 0}
+
+    def fake_vad_load(**kwargs):
+        counts["vad"] += 1
+        return object()
+
+    def fake_turn_detector(**kwargs):
+        counts["turn_detector"] += 1
+        return object()
+
+    monkeypatch.setattr(silero.VAD, "load", fake_vad_load)
+    monkeypatch.setattr(multilingual, "MultilingualModel", fake_turn_detector)
+    monkeypatch.setattr(session_factory, "AgentSession", lambda **kwargs: SimpleNamespace(**kwargs))
+    monkeypatch.setattr(openai.realtime, "RealtimeModel", lambda **kwargs: object())
+    monkeypatch.setattr(session_factory.inference, "STT", lambda **kwargs: object())
+    monkeypatch.setattr(session_factory.inference, "LLM", lambda **kwargs: object())
+    monkeypatch.setattr(session_factory.inference, "TTS", lambda **kwargs: SimpleNamespace(sample_rate=24000, num_channels=1))
+    return counts
+
+
+@pytest.mark.parametrize("agent_type", ["realtime", "custom"])
+def test_sessions_share_prewarmed_models(load_counts, agent_type) -> None:
+    """Models are loaded once in prewarm and never again per session."""
+    proc = SimpleNamespace(userdata={})
+    proc.userdata["models"] = ModelRegistry().load()
+    assert load_counts["vad"] == 1
+
+    models = ModelRegistry.from_proc(proc)
+    sessions = [
+        session_factory.getAgentSession(Agent(id=f"agent-{i}", agent_type=agent_type), models)
+        for i in range(3)
+    ]
+
+    assert load_counts["vad"] == 1
+    assert all(s.vad is sessions[0].vad for s in sessions)
+    if agent_type == "custom":
+        assert load_counts["turn_detector"] == 1
+        assert all(s.turn_handling["turn_detection"] is sessions[0].turn_handling["turn_detection"] for s in sessions)
+
+
+def test_noise_cancellation_filters_are_shared(load_counts) -> None:
+    models = ModelRegistry().load()
+    sip = SimpleNamespace(participant=SimpleNamespace(kind=rtc.ParticipantKind.PARTICIPANT_KIND_SIP))
+    web = SimpleNamespace(participant=SimpleNamespace(kind=rtc.ParticipantKind.PARTICIPANT_KIND_STANDARD))
+
+    assert models.noise_cancellation_for(sip) is models.noise_cancellation_for(sip)
+    assert models.noise_cancellation_for(web) is models.bvc
+    assert models.noise_cancellation_for(sip) is models.bvc_telephony
+
+
+def test_sessions_reuse_pooled_model_clients(load_counts) -> None:
+    models = ModelRegistry()
+    first = session_factory.getAgentSession(Agent(id="a", agent_type="realtime", voice="alloy", api_key="sk-1"), models)
+    first.model_lease.release()
+    second = session_factory.getAgentSession(Agent(id="b", agent_type="realtime", voice="alloy", api_key="sk-1"), models)
+    other_key = session_factory.getAgentSession(Agent(id="c", agent_type="realtime", voice="alloy", api_key="sk-2"), models)
+
+    assert second.llm is first.llm
+    assert second.model_lease.warm
+    assert other_key.llm is not first.llm
+    assert "sk-1" not in repr(second.model_lease.key)
+    assert models.pool.stats()["hits"] == 1
+
+
+def test_unknown_agent_type_falls_back_to_realtime(load_counts) -> None:
+    session = session_factory.getAgentSession(Agent(id="a", agent_type="legacy", voice=None, api_key="sk-1"), ModelRegistry())
+
+    assert session.profile.name == "realtime"
+    assert session.model_lease.key.voice == "alloy"
+    assert session.model_lease.key.api_key_hash
+
+
+def test_profile_settings_reach_the_session(load_counts) -> None:
+    models = ModelRegistry()
+    agent = Agent(
+        id="a",
+        agent_type="custom",
+        profile="low_latency",
+        session_settings={"min_interruption_words": 2, "vad_activation_threshold": 0.6},
+    )
+
+    session = session_factory.getAgentSession(agent, models)
+    same = session_factory.getAgentSession(agent, models)
+
+    assert session.turn_handling["endpointing"] == {"min_delay": 0.3, "max_delay": 1.5}
+    assert session.turn_handling["interruption"] == {"min_words": 2}
+    assert session.turn_handling["preemptive_generation"] == {"enabled": True}
+    # tuned VAD is loaded once per distinct setting, next to the shared default
+    assert same.vad is session.vad
+    assert session.vad is not models.vad
+    assert load_counts["vad"] == 2
+
+
+def test_custom_tts_is_wrapped_by_the_phrase_cache(load_counts) -> None:
+    models = ModelRegistry()
+    cached = session_factory.getAgentSession(Agent(id="a", agent_type="custom"), models)
+    uncached = session_factory.getAgentSession(
+        Agent(id="b", agent_type="custom", session_settings={"tts_phrase_cache": False}), models
+    )
+
+    assert isinstance(cached.tts, CachingTTS)
+    assert not isinstance(uncached.tts, CachingTTS)
@@ -0,0 +1,75 @@
+import pytest
+from livekit import rtc
+from livekit.agents import llm
+from livekit.agents.voice.events import (
+    AgentStateChangedEvent,
+    ConversationItemAddedEvent,
+    FunctionToolsExecutedEvent,
+)
+from prometheus_client import REGISTRY
+
+from agent_config.session_metrics import SessionMetrics, prometheus_options
+
+
+def _message(role: str, metrics: dict, interrupted: bool = False) -> ConversationItemAddedEvent:
+    return ConversationItemAddedEvent(item=llm.ChatMessage(role=role, content=["..."], metrics=metrics, interrupted=interrupted))
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_turn_latencies_and_interruptions() -> None:
+    session = rtc.EventEmitter()
+    metrics = SessionMetrics(session, "room-1")
+    metrics.start()
+    exported_before = _sample("voice_agent_eou_to_first_token_seconds_count")
+    interrupts_before = _sample("voice_agent_interruptions_total")
+
+    # the greeting has no user turn in front of it and is not a latency sample
+    session.emit("conversation_item_added", _message("assistant", {"llm_node_ttft": 0.3}))
+    session.emit("conversation_item_added", _message("user", {"end_of_turn_delay": 0.4, "transcription_delay": 0.1}))
+    session.emit("conversation_item_added", _message("assistant", {"llm_node_ttft": 0.5, "tts_node_ttfb": 0.2, "e2e_latency": 1.15}))
+    session.emit("conversation_item_added", _message("user", {"end_of_turn_delay": 0.6}))
+    session.emit("conversation_item_added", _message("assistant", {"llm_node_ttft": 0.4, "tts_node_ttfb": 0.3}, interrupted=True))
+
+    summary = metrics.summary()
+    assert summary["turns"] == 2
+    assert summary["interruptions"] == 1
+    assert summary["eou_to_first_token"]["count"] == 2
+    assert summary["eou_to_first_token"]["max"] == pytest.approx(1.0)
+    # the second reply has no e2e_latency, so it is rebuilt from its parts
+    assert sorted(metrics.eou_to_first_audio.samples) == pytest.approx([1.15, 1.3])
+    assert summary["eou_to_first_audio"]["buckets"]["le_1.5"] == 2
+
+    assert _sample("voice_agent_eou_to_first_token_seconds_count") == exported_before + 2
+    assert _sample("voice_agent_interruptions_total") == interrupts_before + 1
+
+
+def test_tool_durations_and_time_to_greeting() -> None:
+    session = rtc.EventEmitter()
+    metrics = SessionMetrics(session)
+    metrics.start()
+
+    metrics.greeting_requested()
+    session.emit("agent_state_changed", AgentStateChangedEvent(old_state="thinking", new_state="speaking"))
+    assert metrics.time_to_greeting is not None
+
+    call = llm.FunctionCall(call_id="c1", name="check_availability", arguments="{}", created_at=100.0)
+    output = llm.FunctionCallOutput(call_id="c1", name="check_availability", output="ok", is_error=False, created_at=100.25)
+    session.emit("function_tools_executed", FunctionToolsExecutedEvent(function_calls=[call], function_call_outputs=[output]))
+
+    assert metrics.summary()["tools"]["check_availability"]["max"] == pytest.approx(0.25)
+    assert _sample("voice_agent_tool_duration_seconds_count", tool="check_availability") >= 1
+
+    metrics.stop()
+    session.emit("function_tools_executed", FunctionToolsExecutedEvent(function_calls=[call], function_call_outputs=[output]))
+    assert metrics.summary()["tools"]["check_availability"]["count"] == 1
+
+
+def test_prometheus_endpoint_is_opt_in(monkeypatch) -> None:
+    monkeypatch.delenv("PROMETHEUS_PORT", raising=False)
+    assert prometheus_options() == {}
+
+    monkeypatch.setenv("PROMETHEUS_PORT", "9464")
+    assert prometheus_options() == {"prometheus_port": 9464}
@@ -0,0 +1,50 @@
+import pytest
+
+from agent_config import session_profile
+from agent_config.get_agent import Agent
+from agent_config.session_profile import BUILTIN_PROFILES, build_profile, resolve_profile
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    session_profile._cached_profile.cache_clear()
+
+
+def test_profile_defaults_to_agent_type() -> None:
+    assert resolve_profile(Agent(id="a", agent_type="custom")) is BUILTIN_PROFILES["custom"]
+    assert resolve_profile(Agent(id="a", agent_type="realtime")).pipeline == "realtime"
+    assert resolve_profile(Agent(id="a", agent_type="unknown")).name == "realtime"
+
+
+def test_backend_overrides_are_applied_and_cached() -> None:
+    agent = Agent(id="a", agent_type="custom", profile="receptionist", session_settings={"min_endpointing_delay": 0.4})
+
+    profile = resolve_profile(agent)
+    again = resolve_profile(Agent(id="b", agent_type="custom", profile="receptionist", session_settings={"min_endpointing_delay": 0.4}))
+
+    assert profile.llm_model == "openai/gpt-4.1-nano"
+    assert profile.min_endpointing_delay == 0.4
+    assert again is profile
+    assert session_profile.profile_cache_info().hits == 1
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"vad_activation_threshold": 1.5},
+        {"min_endpointing_delay": 2.0, "max_endpointing_delay": 1.0},
+        {"turn_detection": "telepathy"},
+        {"min_interruption_words": -1},
+        {"llm_model": None},
+        {"stt_modle": "typo"},
+    ],
+)
+def test_invalid_settings_are_rejected(overrides) -> None:
+    with pytest.raises(ValueError):
+        build_profile("custom", overrides)
+
+
+def test_invalid_backend_settings_fall_back_to_base_profile() -> None:
+    agent = Agent(id="a", agent_type="custom", session_settings={"max_endpointing_delay": -1})
+
+    assert resolve_profile(agent) is BUILTIN_PROFILES["custom"]
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import os
+import sqlite3
+
+import pytest
+from livekit import rtc
+from livekit.agents import llm
+from livekit.agents.voice.events import ConversationItemAddedEvent, FunctionToolsExecutedEvent
+
+from agent_config.history_spool import HistorySpool
+from agent_config.transcript_recorder import TranscriptRecorder, salvage_orphaned_transcripts
+
+
+@pytest.fixture(autouse=True)
+def spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("HISTORY_SPOOL_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _message(role: str, text: str) -> ConversationItemAddedEvent:
+    return ConversationItemAddedEvent(item=llm.ChatMessage(role=role, content=[text]))
+
+
+def _tool_call() -> FunctionToolsExecutedEvent:
+    call = llm.FunctionCall(call_id="c1", name="check_availability", arguments='{"date": "tomorrow"}')
+    output = llm.FunctionCallOutput(call_id="c1", name="check_availability", output="available", is_error=False)
+    return FunctionToolsExecutedEvent(function_calls=[call], function_call_outputs=[output])
+
+
+async def test_records_events_as_they_happen() -> None:
+    session = rtc.EventEmitter()
+    recorder = TranscriptRecorder(session, "job-1", {"agent_id": "a"}, buffer_size=2, flush_interval=60)
+    recorder.start()
+
+    session.emit("conversation_item_added", _message("assistant", "Hello!"))
+    session.emit("conversation_item_added", _message("user", "Is tomorrow free?"))
+    await recorder._pending_flush
+
+    # the buffer limit was hit, so both records are on disk before the call ends
+    with open(recorder.path) as f:
+        assert len(f.readlines()) == 3
+
+    session.emit("function_tools_executed", _tool_call())
+    conversation = await recorder.finalize()
+
+    assert [item.get("role") for item in conversation[:2]] == ["assistant", "user"]
+    assert conversation[0]["content"] == ["Hello!"]
+    assert conversation[2]["type"] == "function_tools_executed"
+    assert conversation[2]["function_calls"][0]["name"] == "check_availability"
+
+    recorder.discard()
+    assert not os.path.exists(recorder.path)
+
+
+async def test_orphaned_transcript_is_salvaged(spool_dir, monkeypatch) -> None:
+    monkeypatch.setenv("TRANSCRIPT_ORPHAN_AGE", "0")
+    session = rtc.EventEmitter()
+    recorder = TranscriptRecorder(session, "job-crashed", {"agent_id": "a", "started_at": 0}, flush_interval=60)
+    recorder.start()
+    session.emit("conversation_item_added", _message("user", "Hi"))
+    await recorder.flush()
+    # the worker dies here: no finalize(), no discard()
+
+    spool = HistorySpool(directory=str(spool_dir))
+    assert await salvage_orphaned_transcripts(spool) == 1
+
+    with sqlite3.connect(spool.path) as db:
+        [(key, payload)] = db.execute("SELECT idempotency_key, payload FROM pending").fetchall()
+    assert key == "job-crashed"
+    assert json.loads(payload)["conversation"][0]["content"] == ["Hi"]
+    assert not os.path.exists(recorder.path)
+
+
+async def test_active_transcripts_are_not_salvaged(spool_dir, monkeypatch) -> None:
+    monkeypatch.setenv("TRANSCRIPT_ORPHAN_AGE", "0")
+    recorder = TranscriptRecorder(rtc.EventEmitter(), "job-live", {"agent_id": "a"}, flush_interval=60)
+    recorder.start()
+
+    spool = HistorySpool(directory=str(spool_dir))
+    assert await salvage_orphaned_transcripts(spool, {"job-live"}) == 0
+    assert os.path.exists(recorder.path)
+    await recorder.finalize()
+
+
+async def test_concurrent_salvage_claims_each_orphan_once(spool_dir, monkeypatch) -> None:
+    monkeypatch.setenv("TRANSCRIPT_ORPHAN_AGE", "0")
+    for job_id in ("job-a", "job-b"):
+        session = rtc.EventEmitter()
+        recorder = TranscriptRecorder(session, job_id, {"agent_id": "a", "started_at": 0}, flush_interval=60)
+        recorder.start()
+        session.emit("conversation_item_added", _message("user", "Hi"))
+        await recorder.flush()
+
+    spool = HistorySpool(directory=str(spool_dir))
+    counts = await asyncio.gather(salvage_orphaned_transcripts(spool), salvage_orphaned_transcripts(spool))
+
+    assert sum(counts) == 2
+    with sqlite3.connect(spool.path) as db:
+        assert db.execute("SELECT COUNT(*) FROM pending").fetchone() == (2,)
@@ -0,0 +1,114 @@
+import os
+
+import pytest
+from livekit.agents import tts, utils
+
+from agent_config.tts_cache import CachingTTS, PhraseCache
+
+
+class FakeTTS(tts.TTS):
+    """Synthesizes 10ms of a constant sample per character."""
+
+    def __init__(self) -> None:
+        super().__init__(capabilities=tts.TTSCapabilities(streaming=False), sample_rate=16000, num_channels=1)
+        self.requests = []
+
+    @property
+    def model(self) -> str:
+        return "fake-tts"
+
+    def synthesize(self, text, *, conn_options=None):
+        self.requests.append(text)
+        return _FakeStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class _FakeStream(tts.ChunkedStream):
+    async def _run(self, output_emitter) -> None:
+        output_emitter.initialize(request_id=utils.shortuuid(), sample_rate=16000, num_channels=1, mime_type="audio/pcm")
+        for i, _ in enumerate(self.input_text):
+            output_emitter.push(bytes([i % 100, 0]) * 160)
+        output_emitter.flush()
+
+
+async def _say(engine: tts.TTS, text: str) -> bytes:
+    async with engine.synthesize(text) as stream:
+        return b"".join([bytes(ev.frame.data.cast("B")) async for ev in stream])
+
+
+@pytest.fixture
+def cache() -> PhraseCache:
+    return PhraseCache(max_bytes=1_000_000, directory="")
+
+
+async def test_repeated_sentence_is_cached_on_second_sighting(cache) -> None:
+    inner = FakeTTS()
+    engine = CachingTTS(inner, voice="v1", cache=cache)
+
+    audio = [await _say(engine, "Is there anything else?") for _ in range(3)]
+
+    assert audio[0] == audio[1] == audio[2]
+    assert inner.requests == ["Is there anything else?"] * 2
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["bytes_saved"] == stats["memory_bytes"] > 0
+
+
+async def test_registered_templates_are_cached_on_first_use(cache) -> None:
+    cache.register("Yes, {time} on {date} is available.")
+    cache.register("One moment while I check the calendar.")
+    inner = FakeTTS()
+    engine = CachingTTS(inner, voice="v1", cache=cache)
+
+    for _ in range(2):
+        await _say(engine, "Yes, 3 PM on October 20 is available.")
+        await _say(engine, "One  moment while I check the calendar. ")
+    await _say(engine, "Yes, 4 PM on October 20 is available.")
+
+    assert inner.requests == [
+        "Yes, 3 PM on October 20 is available.",
+        "One  moment while I check the calendar. ",
+        "Yes, 4 PM on October 20 is available.",
+    ]
+
+
+async def test_voice_is_part_of_the_key(cache) -> None:
+    cache.register("Goodbye!")
+    inner = FakeTTS()
+
+    await _say(CachingTTS(inner, voice="v1", cache=cache), "Goodbye!")
+    await _say(CachingTTS(inner, voice="v2", cache=cache), "Goodbye!")
+
+    assert inner.requests == ["Goodbye!", "Goodbye!"]
+
+
+def test_lru_is_bounded_by_bytes() -> None:
+    cache = PhraseCache(max_bytes=250, directory="")
+
+    for name in ("a", "b", "c"):
+        cache.put(name, b"x" * 100)
+    cache.put("huge", b"x" * 300)
+
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert cache.get("huge") is None
+    assert cache.stats()["memory_bytes"] == 200
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_tier_survives_a_new_process(tmp_path) -> None:
+    PhraseCache(directory=str(tmp_path)).put("k", b"pcm")
+
+    cache = PhraseCache(directory=str(tmp_path))
+    assert cache.get("k") == b"pcm"
+    assert cache.get("k") == b"pcm"
+    assert cache.stats()["disk_hits"] == 1
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+
+
+def test_long_sentences_are_never_admitted() -> None:
+    cache = PhraseCache(max_chars=20, directory="")
+    cache.register("{anything}")
+
+    assert not cache.admits("This sentence is longer than twenty characters.")
+    assert cache.admits("Short one.")
@@ -0,0 +1,69 @@
+import os
+import time
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agent_config.worker_load import LoopLagProbe, WorkerLoad
+
+
+@pytest.fixture
+def load(tmp_path) -> WorkerLoad:
+    # a huge core count keeps the test process's own CPU out of the picture
+    return WorkerLoad(threshold=0.75, max_sessions=4, lag_limit=0.1, report_dir=str(tmp_path), cpu_count=1e6)
+
+
+def test_admission_closes_at_max_sessions(load) -> None:
+    assert load(SimpleNamespace(active_jobs=[object()] * 2)) == pytest.approx(0.375)
+    assert load.stats()["accepting"]
+
+    assert load(SimpleNamespace(active_jobs=[object()] * 4)) == pytest.approx(0.75)
+    assert not load.stats()["accepting"]
+    assert load.stats()["limiting"] == "sessions"
+
+
+def test_loop_lag_of_a_job_process_closes_admission(load, tmp_path) -> None:
+    (tmp_path / str(os.getpid())).write_text("0.25")
+    (tmp_path / "999999999").write_text("5.0")
+
+    assert load.sample(1) == 1.0
+    assert load.stats()["limiting"] == "loop_lag"
+    assert load.stats()["loop_lag"] == 0.25
+    # reports of processes that have exited are dropped
+    assert sorted(os.listdir(tmp_path)) == [str(os.getpid())]
+
+
+def test_options_keep_admission_open_in_dev_mode(load) -> None:
+    options = load.options()
+
+    assert options["load_fnc"] is load
+    assert options["load_threshold"].prod_default == 0.75
+    assert options["load_threshold"].dev_default == float("inf")
+
+
+def test_lag_probe_reports_the_worst_recent_sample() -> None:
+    now = [0.0]
+    probe = LoopLagProbe(window=5.0, clock=lambda: now[0])
+
+    probe.record(0.3)
+    now[0] = 3.0
+    probe.record(0.01)
+    assert probe.lag == 0.3
+
+    now[0] = 6.0
+    probe.record(0.02)
+    assert probe.lag == 0.02
+    assert probe.max_lag == 0.3
+
+
+async def test_lag_probe_notices_a_blocked_loop(tmp_path) -> None:
+    probe = LoopLagProbe(interval=0.01, report_dir=str(tmp_path))
+    probe.start()
+    await asyncio.sleep(0.03)
+    time.sleep(0.1)
+    await asyncio.sleep(0.03)
+    await probe.aclose()
+
+    assert probe.lag >= 0.05
+    assert float((tmp_path / str(os.getpid())).read_text()) >= 0.05